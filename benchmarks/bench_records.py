@@ -0,0 +1,123 @@
+"""
+Benchmark compact recipient records against per-row dictionaries.
+
+Builds rows for a synthetic batch both ways and reports build time, memory
+held by the rows and CSV write time.
+
+Usage:
+    python benchmarks/bench_records.py --recipients 200000
+"""
+
+import argparse
+import csv
+import gc
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+# Add src to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from projection import DEFAULT_PROJECTION
+from records import FIELDNAMES
+from sinks import CsvSink
+from synthetic import make_batch
+
+
+def dict_rows(batch_data: dict):
+    """Build rows the way extract_recipients did before records: one dict per row."""
+    for recipient in batch_data.get("recipients", []):
+        try:
+            city = recipient["conversation_initiation_client_data"]["dynamic_variables"].get("city", "")
+        except (KeyError, TypeError):
+            city = ""
+        yield {
+            "batch_id": batch_data.get("id"),
+            "batch_name": batch_data.get("name"),
+            "agent_id": batch_data.get("agent_id"),
+            "agent_name": batch_data.get("agent_name"),
+            "created_at_unix": batch_data.get("created_at_unix"),
+            "scheduled_time_unix": batch_data.get("scheduled_time_unix"),
+            "total_calls_dispatched": batch_data.get("total_calls_dispatched"),
+            "total_calls_scheduled": batch_data.get("total_calls_scheduled"),
+            "last_updated_at_unix": batch_data.get("last_updated_at_unix"),
+            "status": batch_data.get("status"),
+            "recipient_id": recipient.get("id"),
+            "phone_number": recipient.get("phone_number"),
+            "recipient_status": recipient.get("status"),
+            "recipient_created_at_unix": recipient.get("created_at_unix"),
+            "recipient_updated_at_unix": recipient.get("updated_at_unix"),
+            "conversation_id": recipient.get("conversation_id"),
+            "city": city
+        }
+
+
+def record_rows(batch_data: dict):
+    """Build rows as recipient records sharing one batch header."""
+    return DEFAULT_PROJECTION.iter_records(batch_data)
+
+
+def measure(name: str, build, output_file: Path, write) -> dict:
+    """Time building and writing the rows and measure the memory they hold."""
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    rows = list(build())
+    build_seconds = time.perf_counter() - start
+    held_bytes = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    
+    start = time.perf_counter()
+    write(rows, output_file)
+    write_seconds = time.perf_counter() - start
+    
+    return {
+        "name": name,
+        "build_seconds": build_seconds,
+        "write_seconds": write_seconds,
+        "bytes_per_row": held_bytes / max(1, len(rows))
+    }
+
+
+def write_dicts(rows, output_file: Path) -> None:
+    """Write dict rows with csv.DictWriter."""
+    with open(output_file, "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=list(FIELDNAMES))
+        writer.writeheader()
+        writer.writerows(rows)
+
+
+def write_records(rows, output_file: Path) -> None:
+    """Write recipient records through CsvSink."""
+    with CsvSink(output_file, list(FIELDNAMES)) as sink:
+        sink.write_rows(rows)
+
+
+def main():
+    """Run the benchmark and print a summary."""
+    parser = argparse.ArgumentParser(description="Benchmark recipient row representations")
+    parser.add_argument("--recipients", type=int, default=200000, help="Recipients in the batch")
+    args = parser.parse_args()
+    
+    batch_data = make_batch(args.recipients)
+    
+    with tempfile.TemporaryDirectory() as temp_dir:
+        results = [
+            measure("dict", lambda: dict_rows(batch_data), Path(temp_dir) / "dict.csv", write_dicts),
+            measure("record", lambda: record_rows(batch_data), Path(temp_dir) / "record.csv", write_records)
+        ]
+        same = (Path(temp_dir) / "dict.csv").read_bytes() == (Path(temp_dir) / "record.csv").read_bytes()
+    
+    print(f"{args.recipients} recipients")
+    print(f"{'rows':<8}{'build s':>10}{'write s':>10}{'bytes/row':>12}")
+    for result in results:
+        print(f"{result['name']:<8}{result['build_seconds']:>10.3f}"
+              f"{result['write_seconds']:>10.3f}{result['bytes_per_row']:>12.0f}")
+    print(f"identical CSV output: {same}")
+    return 0 if same else 1
+
+
+if __name__ == "__main__":
+    exit(main())
@@ -0,0 +1,282 @@
+"""
+Benchmark suite for the batch calling tools.
+
+Measures throughput and peak traced memory of the main pipeline stages on
+synthetic data at several sizes:
+    
+    convert_json        BatchConverter.json_to_csv on one batch file
+    convert_batch_list  BatchListConverter.convert_batch_list on a workspace listing
+    extract_recipients  BatchProcessor.extract_recipients on a decoded batch
+    process_batch_list  BatchProcessor.process_batch_list against a stub API
+
+Results are saved as JSON (by default benchmarks/results/<commit>.json) and
+can be compared with an earlier run to spot regressions between commits.
+
+Usage:
+    python benchmarks/bench_suite.py
+    python benchmarks/bench_suite.py --sizes 10,1000,100000,1000000 --repeat 1
+    python benchmarks/bench_suite.py --compare benchmarks/results/abc1234.json
+"""
+
+import argparse
+import gc
+import json
+import logging
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Callable, Dict, List
+
+# Add src to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+# The stub API needs no key
+os.environ.setdefault("TESTING", "true")
+
+from batch_converter import BatchConverter
+from batch_list_converter import BatchListConverter
+from batch_processor import BatchProcessor
+from synthetic import make_batch, make_batch_summaries, write_batch, write_workspace
+
+RESULTS_DIR = Path(__file__).parent / "results"
+
+# Recipients per batch served by the stub API
+STUB_BATCH_RECIPIENTS = 1000
+
+# Runs shorter than this are too noisy to flag as regressions
+MIN_COMPARED_SECONDS = 0.05
+
+
+class StubResponse:
+    """Successful API response decoding a prepared JSON payload."""
+    
+    status_code = 200
+    headers: Dict = {}
+    
+    def __init__(self, content: bytes):
+        self.content = content
+    
+    def json(self) -> Dict:
+        return json.loads(self.content)
+    
+    def raise_for_status(self) -> None:
+        pass
+
+
+class StubSession:
+    """
+    Stand-in for requests.Session serving synthetic batches.
+    
+    Every batch has the same recipients; only the batch ID differs, so
+    payloads are prepared once and the measurement covers decoding and
+    everything after it.
+    """
+    
+    def __init__(self, recipients: int):
+        template = make_batch(recipients, batch_id="__BATCH_ID__")
+        self._template = json.dumps(template).encode()
+    
+    def get(self, url: str, params=None, timeout=None) -> StubResponse:
+        batch_id = url.rsplit("/", 1)[-1]
+        return StubResponse(self._template.replace(b"__BATCH_ID__", batch_id.encode()))
+
+
+def setup_convert_json(temp_dir: Path, size: int) -> Callable[[], int]:
+    """Convert a batch file with size recipients to CSV."""
+    json_file = temp_dir / f"batch_{size}.json"
+    write_batch(json_file, size)
+    converter = BatchConverter()
+    return lambda: converter.json_to_csv(json_file, temp_dir / "recipients.csv") or size
+
+
+def setup_convert_batch_list(temp_dir: Path, size: int) -> Callable[[], int]:
+    """Convert a workspace listing of size batches to CSV."""
+    json_file = temp_dir / f"workspace_{size}.json"
+    write_workspace(json_file, size)
+    converter = BatchListConverter()
+    return lambda: converter.convert_batch_list(json_file, temp_dir / "batch_list.csv") or size
+
+
+def setup_extract_recipients(temp_dir: Path, size: int) -> Callable[[], int]:
+    """Build the rows of a decoded batch with size recipients."""
+    batch_data = make_batch(size)
+    processor = BatchProcessor(rate_limit_delay=0)
+    
+    def run() -> int:
+        return sum(1 for _ in processor.extract_recipients(batch_data))
+    return run
+
+
+def setup_process_batch_list(temp_dir: Path, size: int, workers: int = 4) -> Callable[[], int]:
+    """Fetch and write size recipients, in batches of up to STUB_BATCH_RECIPIENTS."""
+    per_batch = min(size, STUB_BATCH_RECIPIENTS)
+    batch_list = temp_dir / f"batch_list_{size}.csv"
+    with open(batch_list, 'w', encoding='utf-8') as f:
+        f.write("id\n")
+        for batch in make_batch_summaries(max(1, size // per_batch)):
+            f.write(f"{batch['id']}\n")
+    processor = BatchProcessor(rate_limit_delay=0, max_workers=workers,
+                               session=StubSession(per_batch))
+    
+    def run() -> int:
+        processor.process_batch_list(batch_list, temp_dir / "recipients.csv")
+        return per_batch * max(1, size // per_batch)
+    return run
+
+
+SCENARIOS = {
+    "convert_json": setup_convert_json,
+    "convert_batch_list": setup_convert_batch_list,
+    "extract_recipients": setup_extract_recipients,
+    "process_batch_list": setup_process_batch_list
+}
+
+
+def measure(run: Callable[[], int], repeat: int, memory: bool) -> Dict:
+    """
+    Time a benchmark and measure its peak traced memory.
+    
+    The best of repeat timed runs is reported. Memory is measured in a
+    separate run, since tracing allocations slows the code down.
+    """
+    best = None
+    rows = 0
+    for _ in range(repeat):
+        gc.collect()
+        start = time.perf_counter()
+        rows = run()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    
+    result = {
+        "rows": rows,
+        "seconds": best,
+        "rows_per_second": rows / best if best else None,
+        "peak_bytes": None
+    }
+    if memory:
+        gc.collect()
+        tracemalloc.start()
+        try:
+            run()
+            result["peak_bytes"] = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+    return result
+
+
+def git_commit() -> str:
+    """Get the short hash of the checked out commit, marked if the tree is dirty."""
+    root = Path(__file__).parent.parent
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=root,
+                                capture_output=True, text=True, check=True).stdout.strip()
+        dirty = subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"], cwd=root,
+                               capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+    return commit + ("-dirty" if dirty else "")
+
+
+def compare(results: List[Dict], baseline: Dict, threshold: float) -> bool:
+    """
+    Print throughput changes against a baseline run.
+    
+    Returns:
+        True if any benchmark got slower by more than threshold
+    """
+    previous = {(r["scenario"], r["size"]): r for r in baseline["results"]}
+    regressed = False
+    print(f"\nCompared with {baseline['commit']}:")
+    for result in results:
+        old = previous.get((result["scenario"], result["size"]))
+        if not old or not old["rows_per_second"] or not result["rows_per_second"]:
+            continue
+        change = result["rows_per_second"] / old["rows_per_second"] - 1
+        flag = ""
+        if max(result["seconds"], old["seconds"]) < MIN_COMPARED_SECONDS:
+            flag = "  (too short to compare)"
+        elif change < -threshold:
+            flag = "  REGRESSION"
+            regressed = True
+        print(f"{result['scenario']:<20}{result['size']:>10}{change:>+10.1%}{flag}")
+    return regressed
+
+
+def main():
+    """Run the benchmark suite, print and save the results."""
+    parser = argparse.ArgumentParser(
+        description="Benchmark the batch calling tools on synthetic data",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+    python benchmarks/bench_suite.py
+    python benchmarks/bench_suite.py --scenarios convert_json --sizes 1000000
+    python benchmarks/bench_suite.py --compare benchmarks/results/abc1234.json
+        """
+    )
+    parser.add_argument("--sizes", default="10,1000,100000",
+                        help="Comma-separated recipient (or listed batch) counts "
+                             "(default: 10,1000,100000)")
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS),
+                        help=f"Comma-separated scenarios (default: all of {', '.join(SCENARIOS)})")
+    parser.add_argument("--repeat", type=int, default=3, help="Timed runs per benchmark (default: 3)")
+    parser.add_argument("--no-memory", action="store_true", help="Skip the peak memory runs")
+    parser.add_argument("--output", type=Path,
+                        help="Results file (default: benchmarks/results/<commit>.json)")
+    parser.add_argument("--compare", type=Path, help="Earlier results file to compare with")
+    parser.add_argument("--threshold", type=float, default=0.1,
+                        help="Slowdown reported as a regression (default: 0.1 for 10%%)")
+    args = parser.parse_args()
+    
+    scenarios = [name.strip() for name in args.scenarios.split(",") if name.strip()]
+    unknown = [name for name in scenarios if name not in SCENARIOS]
+    if unknown:
+        parser.error(f"Unknown scenarios: {', '.join(unknown)}")
+    sizes = [int(size) for size in args.sizes.split(",")]
+    
+    # Per-batch progress messages would dominate the output
+    logging.disable(logging.INFO)
+    
+    results = []
+    print(f"{'scenario':<20}{'size':>10}{'seconds':>10}{'rows/s':>12}{'peak MB':>10}")
+    for scenario in scenarios:
+        for size in sizes:
+            with tempfile.TemporaryDirectory() as temp_dir:
+                run = SCENARIOS[scenario](Path(temp_dir), size)
+                result = measure(run, max(1, args.repeat), not args.no_memory)
+            result = dict(scenario=scenario, size=size, **result)
+            results.append(result)
+            peak = f"{result['peak_bytes'] / 1e6:.1f}" if result["peak_bytes"] is not None else "-"
+            print(f"{scenario:<20}{size:>10}{result['seconds']:>10.3f}"
+                  f"{result['rows_per_second'] or 0:>12.0f}{peak:>10}")
+    
+    commit = git_commit()
+    output = args.output or RESULTS_DIR / f"{commit}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump({
+            "commit": commit,
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "results": results
+        }, f, indent=2)
+    print(f"\nResults saved to {output}")
+    
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            baseline = json.load(f)
+        if compare(results, baseline, args.threshold):
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
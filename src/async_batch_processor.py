@@ -0,0 +1,434 @@
+"""
+Asyncio batch processor for ElevenLabs batch calling data.
+
+This module fetches batches with aiohttp so that thousands of requests can
+be in flight on a single core. It shares batch list reading, recipient
+extraction, rate limiting and retry rules with BatchProcessor.
+"""
+
+import asyncio
+import json
+import logging
+import argparse
+import time
+from collections import deque
+from pathlib import Path
+from typing import AsyncGenerator, Dict, Iterable, List, Optional, Tuple
+
+import aiohttp
+
+from config import Config, get_config
+from batch_processor import BaseBatchProcessor
+from metrics import RunMetrics
+from projection import DEFAULT_PROJECTION, Projection
+from rate_limiter import AdaptiveRateLimiter, RateLimiter, parse_retry_after
+from response_cache import ResponseCache
+from retry import RETRYABLE_STATUS_CODES, CircuitBreaker, RetryPolicy
+from sinks import AsyncSink, CsvSink
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncBatchProcessor(BaseBatchProcessor):
+    """
+    Process ElevenLabs batch calling data with asyncio.
+    
+    Use as an async context manager so the HTTP session is opened and closed
+    around the work:
+        
+        async with AsyncBatchProcessor(max_concurrency=500) as processor:
+            await processor.process_batch_list(batch_list_csv, output_csv)
+    """
+    
+    def __init__(self, rate_limit_delay: float = 0.2, max_concurrency: int = 100,
+                 rate_limiter: Optional[RateLimiter] = None,
+                 cache: Optional[ResponseCache] = None,
+                 max_requeues: int = 20,
+                 retry_policy: Optional[RetryPolicy] = None,
+                 circuit_breaker: Optional[CircuitBreaker] = None,
+                 projection: Optional[Projection] = None,
+                 metrics: Optional[RunMetrics] = None,
+                 config: Optional[Config] = None):
+        """
+        Initialize the async batch processor.
+        
+        Args:
+            rate_limit_delay: Average delay between API calls to avoid rate limiting
+            max_concurrency: Maximum number of requests in flight
+            rate_limiter: Shared rate limiter; overrides rate_limit_delay when given
+            cache: On-disk response cache consulted before each API call
+            max_requeues: How many times a rate-limited (429) batch is queued
+                again before it is reported as failed
+            retry_policy: Policy for retrying transient failures
+            circuit_breaker: Circuit breaker pausing all requests while the API is down
+            projection: Columns to extract; the standard columns when omitted
+            metrics: Run metrics to record requests, stage times and rows in
+            config: API key and base URL to use; the shared configuration when omitted
+        """
+        self.rate_limit_delay = rate_limit_delay
+        self.max_concurrency = max(1, max_concurrency)
+        self.rate_limiter = rate_limiter or RateLimiter.from_delay(rate_limit_delay)
+        config = config or get_config()
+        self.api_base = config.api_base
+        self.headers = config.headers
+        self.cache = cache
+        self.max_requeues = max_requeues
+        self.retry_policy = retry_policy or RetryPolicy()
+        self.circuit_breaker = circuit_breaker or CircuitBreaker()
+        self.projection = projection or DEFAULT_PROJECTION
+        self.metrics = metrics or RunMetrics()
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+    
+    async def __aenter__(self) -> "AsyncBatchProcessor":
+        """Open the pooled HTTP session."""
+        connector = aiohttp.TCPConnector(limit=self.max_concurrency)
+        self._session = aiohttp.ClientSession(
+            headers=dict(self.headers, **{"Accept-Encoding": "gzip, deflate"}),
+            connector=connector,
+            timeout=aiohttp.ClientTimeout(total=30)
+        )
+        self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        return self
+    
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        """Close the HTTP session."""
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+    
+    async def fetch_batch(self, batch_id: str) -> Optional[Dict]:
+        """
+        Fetch batch data from ElevenLabs API.
+        
+        Args:
+            batch_id: ID of the batch to fetch
+        
+        Returns:
+            Batch data as dictionary, or None if failed
+        """
+        # Cache reads and writes are file I/O, so keep them off the event loop
+        loop = asyncio.get_running_loop()
+        if self.cache is not None:
+            cached = await loop.run_in_executor(None, self.cache.get, batch_id)
+            if cached is not None:
+                logger.info(f"Using cached batch {batch_id}")
+                self.metrics.increment("cache_hits")
+                return cached
+        
+        async with self._semaphore:
+            logger.info(f"Fetching batch {batch_id}...")
+            try:
+                data = await self._get_json(f"{self.api_base}/{batch_id}")
+            except (aiohttp.ClientError, asyncio.TimeoutError, ValueError) as e:
+                logger.error(f"Failed to fetch batch {batch_id}: {e!r}")
+                return None
+        
+        if self.cache is not None:
+            await loop.run_in_executor(None, self.cache.put, batch_id, data)
+        return data
+    
+    async def iter_batches(self, batch_ids: Iterable[str]) -> AsyncGenerator[Tuple[str, Optional[Dict]], None]:
+        """
+        Fetch batches concurrently, yielding results in input order.
+        
+        Only a bounded window of fetches is scheduled at a time, so batch_ids
+        may be a lazy iterable.
+        
+        Args:
+            batch_ids: Batch IDs to fetch
+        
+        Yields:
+            Tuples of (batch_id, batch data or None if the fetch failed)
+        """
+        window = self.max_concurrency * 2
+        pending = deque()
+        try:
+            for batch_id in batch_ids:
+                pending.append((batch_id, asyncio.ensure_future(self.fetch_batch(batch_id))))
+                if len(pending) >= window:
+                    done_id, task = pending.popleft()
+                    yield done_id, await task
+            
+            while pending:
+                done_id, task = pending.popleft()
+                yield done_id, await task
+        finally:
+            for _, task in pending:
+                task.cancel()
+    
+    async def process_batch_list(self, batch_list_csv: Path, output_csv: Path) -> None:
+        """
+        Process multiple batches and save recipients to CSV.
+        
+        Args:
+            batch_list_csv: Path to CSV file containing batch IDs
+            output_csv: Path to output CSV file for recipients
+        """
+        batch_ids = self.read_batch_ids_from_csv(batch_list_csv)
+        logger.info(f"Read {len(batch_ids)} batch IDs from {batch_list_csv}")
+        
+        failed = []
+        with CsvSink(output_csv, self.projection.fieldnames) as csv_sink:
+            async with AsyncSink(csv_sink) as sink:
+                row_count = await self.process_batch_ids(batch_ids, sink, failed=failed)
+        
+        self.write_retry_list(failed, self.retry_list_path(output_csv))
+        
+        if row_count:
+            logger.info(f"Wrote {row_count} recipient rows to {output_csv}")
+        else:
+            logger.warning("No recipient data found to write.")
+    
+    async def process_batch_ids(self, batch_ids: Iterable[str], sink: AsyncSink,
+                                failed: Optional[List[str]] = None) -> int:
+        """
+        Fetch batches and stream their recipients to an open sink.
+        
+        Args:
+            batch_ids: Batch IDs to process
+            sink: Open async sink receiving recipient rows
+            failed: List collecting the IDs of batches that could not be fetched
+        
+        Returns:
+            Number of recipient rows written
+        """
+        row_count = 0
+        
+        async for batch_id, batch_data in self.iter_batches(batch_ids):
+            if not batch_data:
+                self.metrics.increment("failed_batches")
+                if failed is not None:
+                    failed.append(batch_id)
+                continue
+            
+            rows = await sink.write_rows(self.extract_recipients(batch_data), metrics=self.metrics)
+            self.metrics.increment("batches")
+            row_count += rows
+        
+        return row_count
+    
+    async def _get_json(self, url: str) -> Dict:
+        """
+        GET a JSON document with rate limiting, 429 requeues, retries and circuit breaking.
+        
+        Args:
+            url: Request URL
+        
+        Returns:
+            Decoded JSON response
+        
+        Raises:
+            aiohttp.ClientError: If the request ultimately fails
+            asyncio.TimeoutError: If the last attempt timed out
+        """
+        retries = 0
+        requeues = 0
+        
+        while True:
+            wait = self.circuit_breaker.allow()
+            while wait > 0:
+                await asyncio.sleep(wait)
+                wait = self.circuit_breaker.allow()
+            
+            wait = self.rate_limiter.reserve()
+            self.metrics.add_time("rate_limit", wait)
+            await asyncio.sleep(wait)
+            
+            start = time.perf_counter()
+            try:
+                async with self._session.get(url) as response:
+                    with self.metrics.traced("http"):
+                        body = await response.read()
+                    self.metrics.record_request(response.status, time.perf_counter() - start, len(body))
+                    if response.status != 429:
+                        response.raise_for_status()
+                        self.circuit_breaker.record_success()
+                        with self.metrics.timed("parse"):
+                            data = json.loads(body)
+                        self.rate_limiter.on_success()
+                        return data
+                    retry_after = parse_retry_after(response.headers.get("Retry-After"))
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                if not isinstance(e, aiohttp.ClientResponseError):
+                    self.metrics.record_request(None, time.perf_counter() - start)
+                retryable = self._is_retryable(e)
+                if retryable:
+                    self.circuit_breaker.record_failure()
+                else:
+                    self.circuit_breaker.record_success()
+                if retryable and retries < self.retry_policy.max_retries:
+                    retries += 1
+                    delay = self.retry_policy.backoff(retries)
+                    self.retry_policy.stats.add_retry(delay)
+                    self.metrics.add_time("backoff", delay)
+                    logger.warning(f"Request to {url} failed ({e!r}); "
+                                   f"retry {retries} of {self.retry_policy.max_retries}")
+                    await asyncio.sleep(delay)
+                    continue
+                raise
+            
+            # The API answered, so it is up even if it asks us to slow down
+            self.circuit_breaker.record_success()
+            self.rate_limiter.on_throttled(retry_after)
+            requeues += 1
+            if requeues > self.max_requeues:
+                raise aiohttp.ClientError(f"Still rate limited after {self.max_requeues} requeues")
+            self.retry_policy.stats.add_requeue()
+            logger.warning(f"Rate limited requesting {url}; requeued (attempt {requeues})")
+    
+    def _is_retryable(self, error: Exception) -> bool:
+        """
+        Check whether a failure is worth retrying.
+        
+        Args:
+            error: Exception raised by the request
+        
+        Returns:
+            True for timeouts, connection errors and 5xx responses
+        """
+        if isinstance(error, (asyncio.TimeoutError, aiohttp.ClientConnectionError)):
+            return True
+        if isinstance(error, aiohttp.ClientResponseError):
+            return error.status in RETRYABLE_STATUS_CODES
+        return False
+
+
+def main(argv=None):
+    """Command line interface for async batch processing."""
+    # Configure logging
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    )
+    
+    parser = argparse.ArgumentParser(
+        description="Process ElevenLabs batch calling data with asyncio",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+    python async_batch_processor.py batch_list.csv recipients.csv
+    python async_batch_processor.py --concurrency 1000 --rate-limit 0.01 batch_list.csv recipients.csv
+    python async_batch_processor.py --metrics-out run_metrics.prom batch_list.csv recipients.csv
+    python async_batch_processor.py --profile run.prof batch_list.csv recipients.csv
+        """
+    )
+    
+    parser.add_argument(
+        "batch_list_csv",
+        type=Path,
+        help="CSV file with batch IDs in 'id' column"
+    )
+    parser.add_argument(
+        "output_csv",
+        type=Path,
+        help="Output CSV file for all recipients"
+    )
+    parser.add_argument(
+        "--rate-limit",
+        type=float,
+        default=0.2,
+        help="Average delay between API calls in seconds (default: 0.2)"
+    )
+    parser.add_argument(
+        "--burst",
+        type=int,
+        default=1,
+        help="Number of API calls allowed back to back (default: 1)"
+    )
+    parser.add_argument(
+        "--max-rate",
+        type=float,
+        help="Requests per second to ramp up to while the API does not answer 429 "
+             "(default: the --rate-limit rate)"
+    )
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=100,
+        help="Maximum number of requests in flight (default: 100)"
+    )
+    parser.add_argument(
+        "--max-retries",
+        type=int,
+        default=3,
+        help="Retries for timeouts, connection errors and 5xx responses (default: 3)"
+    )
+    parser.add_argument(
+        "--columns",
+        help="Comma-separated columns to write: standard column names, "
+             "batch.<path>, recipient.<path>, var.<dynamic variable> or name=path "
+             "(default: all standard columns)"
+    )
+    parser.add_argument(
+        "--metrics-out",
+        type=Path,
+        help="Write run metrics to this file: JSON, or Prometheus text format for .prom"
+    )
+    parser.add_argument(
+        "--profile",
+        type=Path,
+        help="Profile the run: write a cProfile file here and a report of hot spots "
+             "and allocations per stage to <file>.txt (slows the run down)"
+    )
+    
+    args = parser.parse_args(argv)
+    
+    if args.rate_limit > 0:
+        rate_limiter = AdaptiveRateLimiter(1.0 / args.rate_limit, burst=args.burst, max_rate=args.max_rate)
+    else:
+        rate_limiter = RateLimiter(None)
+    
+    try:
+        projection = Projection.parse(args.columns)
+    except ValueError as e:
+        logger.error(str(e))
+        return 1
+    
+    profiler = None
+    if args.profile:
+        # Imported only when asked for, as it slows down startup
+        from profiling import Profiler
+        profiler = Profiler(args.profile)
+    metrics = RunMetrics("async_batch_processor", profiler=profiler)
+    
+    async def run():
+        async with AsyncBatchProcessor(
+            max_concurrency=args.concurrency,
+            rate_limiter=rate_limiter,
+            retry_policy=RetryPolicy(max_retries=args.max_retries),
+            projection=projection,
+            metrics=metrics
+        ) as processor:
+            try:
+                await processor.process_batch_list(args.batch_list_csv, args.output_csv)
+            finally:
+                stats = processor.retry_policy.stats
+                metrics.increment("retries", stats.retries)
+                metrics.increment("requeues", stats.requeues)
+                metrics.increment("circuit_opened", processor.circuit_breaker.opened)
+            logger.info(f"Retries: {stats.retries} ({stats.backoff_seconds:.1f}s backing off), "
+                        f"rate-limit requeues: {stats.requeues}, "
+                        f"circuit opened {processor.circuit_breaker.opened} times")
+    
+    if profiler is not None:
+        profiler.start()
+    try:
+        asyncio.run(run())
+    except Exception as e:
+        logger.error(f"Error processing batches: {e}")
+        return 1
+    finally:
+        if profiler is not None:
+            profiler.stop()
+            logger.info(profiler.summary())
+        if args.metrics_out:
+            metrics.write(args.metrics_out)
+    
+    logger.info(metrics.summary())
+    
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
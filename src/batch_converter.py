@@ -4,49 +4,53 @@ Batch data converter for ElevenLabs batch calling data.
 This module provides functionality to convert JSON batch data to CSV format.
 """
 
-import json
 import csv
+import glob
 import argparse
 import logging
-from typing import List, Dict
+import os
+from collections import deque
+from itertools import chain
+from typing import List, Dict, Generator, Optional, Tuple, Union
 from pathlib import Path
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-)
+from compression import open_file, strip_compression_suffix
+from json_stream import iter_object, is_stream
+from metrics import RunMetrics
+from projection import DEFAULT_PROJECTION, Projection
+from records import FIELDNAMES, BatchHeader, RecipientRecord
+from sinks import CsvSink
+
 logger = logging.getLogger(__name__)
 
+# Most files sent to a worker process at once; bounds the rows held per task
+MAX_FILES_PER_TASK = 16
+
 
 class BatchConverter:
     """Convert ElevenLabs batch data between formats."""
     
     # Standard field names for batch data CSV
-    BATCH_FIELDNAMES = [
-        "batch_id",
-        "batch_name",
-        "agent_id",
-        "agent_name",
-        "created_at_unix",
-        "scheduled_time_unix",
-        "total_calls_dispatched",
-        "total_calls_scheduled",
-        "last_updated_at_unix",
-        "status",
-        "recipient_id",
-        "phone_number",
-        "recipient_status",
-        "recipient_created_at_unix",
-        "recipient_updated_at_unix",
-        "conversation_id",
-        "city"
-    ]
+    BATCH_FIELDNAMES = list(FIELDNAMES)
+    
+    def __init__(self, projection: Optional[Projection] = None, metrics: Optional[RunMetrics] = None):
+        """
+        Initialize the batch converter.
+        
+        Args:
+            projection: Columns to write; the standard BATCH_FIELDNAMES when omitted
+            metrics: Run metrics to record rows and stage times in
+        """
+        self.projection = projection or DEFAULT_PROJECTION
+        self.metrics = metrics or RunMetrics()
     
     def json_to_csv(self, json_file: Path, csv_file: Path) -> None:
         """
         Convert single batch JSON data to CSV format.
         
+        The file is parsed incrementally: recipients are read and written one
+        at a time, so memory use does not grow with the size of the batch.
+        
         Args:
             json_file: Path to input JSON file
             csv_file: Path to output CSV file
@@ -58,76 +62,148 @@ class BatchConverter:
         if not json_file.exists():
             raise FileNotFoundError(f"JSON file not found: {json_file}")
         
+        rows = self.iter_recipient_rows(json_file)
         try:
-            with open(json_file, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-        except json.JSONDecodeError as e:
+            first_row = next(rows, None)
+            if first_row is None:
+                logger.warning(f"No recipients found in {json_file}")
+                return
+            
+            with CsvSink(csv_file, self.projection.fieldnames) as sink:
+                # Parsing is incremental, so it happens while the rows are written
+                self.metrics.write_rows(sink, chain((first_row,), rows), stage="convert")
+            self.metrics.increment("input_bytes", json_file.stat().st_size)
+        except ValueError as e:
             raise ValueError(f"Invalid JSON format in {json_file}: {e}")
         
-        # Extract recipients data
-        recipients = data.get("recipients", [])
-        if not recipients:
-            logger.warning(f"No recipients found in {json_file}")
-            return
+        logger.info(f"Converted {sink.rows_written} recipients from {json_file} to {csv_file}")
+    
+    def iter_recipient_rows(self, json_file: Path) -> Generator[RecipientRecord, None, None]:
+        """
+        Stream CSV rows for the recipients of a batch JSON file.
+        
+        Batch-level fields used by the projection are collected once. They
+        normally precede the recipients array; if some only appear after it,
+        the file is read a second time once they are known.
         
-        # Convert to CSV rows
-        rows = []
-        for recipient in recipients:
-            row = self._create_recipient_row(data, recipient)
-            rows.append(row)
+        Args:
+            json_file: Path to input JSON file
+            
+        Yields:
+            Recipient records sharing one batch header
+            
+        Raises:
+            ValueError: If JSON format is invalid
+        """
+        batch_keys = self.projection.batch_keys
+        batch_data = {}
+        deferred = False
         
-        # Write to CSV
-        self._write_to_csv(rows, csv_file, self.BATCH_FIELDNAMES)
-        logger.info(f"Converted {len(rows)} recipients from {json_file} to {csv_file}")
+        with open_file(json_file) as f:
+            for key, value in iter_object(f, stream_keys=("recipients",)):
+                if key != "recipients":
+                    if key in batch_keys:
+                        batch_data[key] = value
+                    continue
+                if not is_stream(value):
+                    continue
+                
+                if all(batch_key in batch_data for batch_key in batch_keys):
+                    header = self.projection.header(batch_data)
+                    for recipient in value:
+                        yield self._create_recipient_row(header, recipient)
+                else:
+                    deferred = True
+        
+        if not deferred:
+            return
+        
+        header = self.projection.header(batch_data)
+        with open_file(json_file) as f:
+            for key, value in iter_object(f, stream_keys=("recipients",)):
+                if key == "recipients" and is_stream(value):
+                    for recipient in value:
+                        yield self._create_recipient_row(header, recipient)
     
-    def _create_recipient_row(self, batch_data: Dict, recipient: Dict) -> Dict:
+    def _create_recipient_row(self, batch: Union[BatchHeader, Dict], recipient: Dict) -> RecipientRecord:
         """
         Create a CSV row for a recipient.
         
         Args:
-            batch_data: Batch data dictionary
+            batch: Shared batch header, or the batch data dictionary
             recipient: Recipient data dictionary
             
         Returns:
-            Dictionary containing recipient row data
+            Recipient record referencing the batch header
         """
-        # Extract city from dynamic variables
-        city = self._extract_city(recipient)
-        
-        return {
-            "batch_id": batch_data.get("id"),
-            "batch_name": batch_data.get("name"),
-            "agent_id": batch_data.get("agent_id"),
-            "agent_name": batch_data.get("agent_name"),
-            "created_at_unix": batch_data.get("created_at_unix"),
-            "scheduled_time_unix": batch_data.get("scheduled_time_unix"),
-            "total_calls_dispatched": batch_data.get("total_calls_dispatched"),
-            "total_calls_scheduled": batch_data.get("total_calls_scheduled"),
-            "last_updated_at_unix": batch_data.get("last_updated_at_unix"),
-            "status": batch_data.get("status"),
-            "recipient_id": recipient.get("id"),
-            "phone_number": recipient.get("phone_number"),
-            "recipient_status": recipient.get("status"),
-            "recipient_created_at_unix": recipient.get("created_at_unix"),
-            "recipient_updated_at_unix": recipient.get("updated_at_unix"),
-            "conversation_id": recipient.get("conversation_id"),
-            "city": city
-        }
-    
-    def _extract_city(self, recipient: Dict) -> str:
+        if not isinstance(batch, BatchHeader):
+            batch = self.projection.header(batch)
+        return self.projection.record(batch, recipient)
+    
+    def convert_many(self, json_files: List[Path], output: Path, jobs: Optional[int] = None,
+                     per_file: bool = False) -> Tuple[int, List[Path]]:
         """
-        Extract city from recipient data.
+        Convert many batch JSON files using a pool of worker processes.
+        
+        Files are parsed in parallel, but output always follows the order of
+        json_files. Only a bounded window of files is in flight, so memory use
+        does not grow with the number of files. Files that fail to convert
+        are logged and skipped.
         
         Args:
-            recipient: Recipient data dictionary
+            json_files: Input JSON files
+            output: Merged output CSV file, or the output directory when per_file is set
+            jobs: Number of worker processes (default: number of CPUs)
+            per_file: Write one CSV per input, named after the input file and
+                keeping its path relative to the common directory of the inputs
             
         Returns:
-            City name or empty string if not found
+            Tuple of (number of rows written, list of files that failed)
+        
+        Raises:
+            ValueError: If two inputs would be written to the same per-file CSV
         """
-        try:
-            return recipient["conversation_initiation_client_data"]["dynamic_variables"].get("city", "")
-        except (KeyError, TypeError):
-            return ""
+        # Imported here, as starting worker processes pulls in multiprocessing
+        from concurrent.futures import ProcessPoolExecutor
+        
+        jobs = jobs or os.cpu_count() or 1
+        window = jobs * 2
+        # Amortizes the cost of a pool round trip over several small files
+        chunksize = max(1, min(MAX_FILES_PER_TASK, len(json_files) // (jobs * 4)))
+        row_count = 0
+        failed = []
+        
+        if per_file:
+            tasks = [(json_file, csv_file, self.projection)
+                     for json_file, csv_file in zip(json_files, _per_file_outputs(json_files, output))]
+            for directory in {csv_file.parent for _, csv_file, _ in tasks}:
+                directory.mkdir(parents=True, exist_ok=True)
+            with ProcessPoolExecutor(max_workers=jobs) as executor:
+                results = _map_in_order(executor, _convert_file, tasks, window, chunksize)
+                for json_file, (count, error) in zip(json_files, results):
+                    if error:
+                        logger.error(f"Error converting {json_file}: {error}")
+                        failed.append(json_file)
+                    row_count += count
+        else:
+            with CsvSink(output, self.projection.fieldnames) as sink:
+                with ProcessPoolExecutor(max_workers=jobs) as executor:
+                    tasks = [(json_file, self.projection) for json_file in json_files]
+                    results = _map_in_order(executor, _parse_file, tasks, window, chunksize)
+                    for json_file, (rows, error) in zip(json_files, results):
+                        if error:
+                            logger.error(f"Error converting {json_file}: {error}")
+                            failed.append(json_file)
+                            continue
+                        with self.metrics.timed("write"):
+                            row_count += sink.write_values(rows)
+        
+        self.metrics.add_rows(row_count)
+        self.metrics.increment("files", len(json_files) - len(failed))
+        self.metrics.increment("failed_files", len(failed))
+        logger.info(f"Converted {row_count} recipients from {len(json_files) - len(failed)} "
+                    f"of {len(json_files)} files to {output}")
+        return row_count, failed
     
     def _write_to_csv(self, rows: List[Dict], output_file: Path, fieldnames: List[str]) -> None:
         """
@@ -139,7 +215,7 @@ class BatchConverter:
             fieldnames: List of field names for CSV headers
         """
         try:
-            with open(output_file, 'w', newline='', encoding='utf-8') as f:
+            with open_file(output_file, 'w', newline='') as f:
                 writer = csv.DictWriter(f, fieldnames=fieldnames)
                 writer.writeheader()
                 writer.writerows(rows)
@@ -148,8 +224,143 @@ class BatchConverter:
             raise
 
 
-def main():
+def _map_in_order(executor, function, tasks: List[Tuple], window: int,
+                  chunksize: int = 1) -> Generator:
+    """
+    Run function(*task) for every task in a pool, yielding results in task order.
+    
+    Tasks are sent to the workers in chunks, and at most window chunks are
+    submitted at a time, so finished results never pile up behind a slow
+    earlier chunk.
+    
+    Args:
+        executor: Pool to run the tasks in
+        function: Picklable function to call
+        tasks: Argument tuples, one per call
+        window: Maximum number of chunks submitted at once
+        chunksize: Number of tasks sent to a worker at once
+        
+    Yields:
+        Results of the calls
+    """
+    pending = deque()
+    try:
+        for start in range(0, len(tasks), chunksize):
+            pending.append(executor.submit(_run_chunk, function, tasks[start:start + chunksize]))
+            if len(pending) >= window:
+                yield from pending.popleft().result()
+        
+        while pending:
+            yield from pending.popleft().result()
+    finally:
+        for future in pending:
+            future.cancel()
+
+
+def _run_chunk(function, tasks: List[Tuple]) -> List:
+    """Run a chunk of tasks in a worker process."""
+    return [function(*task) for task in tasks]
+
+
+def _per_file_outputs(json_files: List[Path], output_dir: Path) -> List[Path]:
+    """
+    Name the CSV of every input in per-file mode.
+    
+    Inputs keep their directory relative to the common directory of all
+    inputs, so same-named files from different directories do not clash.
+    
+    Args:
+        json_files: Input JSON files
+        output_dir: Output directory
+        
+    Returns:
+        Output CSV file of every input
+    
+    Raises:
+        ValueError: If two inputs would be written to the same file
+    """
+    parents = [json_file.absolute().parent for json_file in json_files]
+    base = Path(os.path.commonpath(parents)) if parents else None
+    outputs = {}
+    for json_file, parent in zip(json_files, parents):
+        csv_file = output_dir / parent.relative_to(base) / f"{strip_compression_suffix(json_file).stem}.csv"
+        if csv_file in outputs:
+            raise ValueError(f"{outputs[csv_file]} and {json_file} would both be written to {csv_file}")
+        outputs[csv_file] = json_file
+    return list(outputs)
+
+
+def _parse_file(json_file: Path, projection: Projection) -> Tuple[List[Tuple], Optional[str]]:
+    """
+    Parse one batch file into row tuples in a worker process.
+    
+    Plain tuples in column order are much cheaper to send back to the parent
+    process than records or dictionaries.
+    
+    Args:
+        json_file: Input JSON file
+        projection: Columns to extract
+        
+    Returns:
+        Tuple of (rows, error message or None)
+    """
+    converter = BatchConverter(projection)
+    try:
+        rows = [row.as_tuple() for row in converter.iter_recipient_rows(json_file)]
+    except (OSError, ValueError) as e:
+        return [], str(e)
+    return rows, None
+
+
+def _convert_file(json_file: Path, csv_file: Path, projection: Projection) -> Tuple[int, Optional[str]]:
+    """
+    Convert one batch file to its own CSV in a worker process.
+    
+    Args:
+        json_file: Input JSON file
+        csv_file: Output CSV file
+        projection: Columns to extract
+        
+    Returns:
+        Tuple of (rows written, error message or None)
+    """
+    converter = BatchConverter(projection)
+    try:
+        with CsvSink(csv_file, projection.fieldnames) as sink:
+            sink.write_rows(converter.iter_recipient_rows(json_file))
+    except (OSError, ValueError) as e:
+        return 0, str(e)
+    return sink.rows_written, None
+
+
+def resolve_inputs(pattern: str) -> List[Path]:
+    """
+    Expand an input argument into a sorted list of JSON files.
+    
+    Args:
+        pattern: A file, a directory (all *.json files in it, compressed or
+            not) or a glob pattern
+        
+    Returns:
+        Sorted list of input files
+    """
+    path = Path(pattern)
+    if path.is_dir():
+        return sorted(child for child in path.glob("*.json*")
+                      if strip_compression_suffix(child).suffix == ".json")
+    if glob.has_magic(pattern):
+        return sorted(Path(match) for match in glob.glob(pattern, recursive=True))
+    return [path]
+
+
+def main(argv=None):
     """Command line interface for batch conversion."""
+    # Configure logging
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    )
+    
     parser = argparse.ArgumentParser(
         description="Convert ElevenLabs batch JSON data to CSV format",
         formatter_class=argparse.RawDescriptionHelpFormatter,
@@ -157,28 +368,86 @@ def main():
 Examples:
     python batch_converter.py batch_data.json batch_data.csv
     python batch_converter.py input/batch.json output/batch.csv
+    python batch_converter.py archive/ all_batches.csv
+    python batch_converter.py "archive/2024-*/*.json" all_batches.csv --jobs 8
+    python batch_converter.py archive/ csv_out/ --per-file
+    python batch_converter.py batch.json.zst batch.csv.gz
+    python batch_converter.py --columns batch_id,phone_number,var.customer_name batch.json out.csv
+    python batch_converter.py --metrics-out convert_metrics.json archive/ all_batches.csv
+    python batch_converter.py --profile convert.prof batch.json out.csv
         """
     )
     
     parser.add_argument(
         "input_json",
-        type=Path,
-        help="Input JSON file containing batch data"
+        help="Input JSON file, directory of JSON files, or glob pattern"
     )
     parser.add_argument(
         "output_csv",
         type=Path,
-        help="Output CSV file for converted data"
+        help="Output CSV file, or output directory with --per-file"
+    )
+    parser.add_argument(
+        "-j", "--jobs",
+        type=int,
+        help="Number of worker processes for multiple inputs (default: number of CPUs)"
+    )
+    parser.add_argument(
+        "--per-file",
+        action="store_true",
+        help="Write one CSV per input file instead of a merged CSV, keeping the "
+             "input directories relative to their common directory"
+    )
+    parser.add_argument(
+        "--columns",
+        help="Comma-separated columns to write: standard column names, "
+             "batch.<path>, recipient.<path>, var.<dynamic variable> or name=path "
+             "(default: all standard columns)"
+    )
+    parser.add_argument(
+        "--metrics-out",
+        type=Path,
+        help="Write run metrics to this file: JSON, or Prometheus text format for .prom"
+    )
+    parser.add_argument(
+        "--profile",
+        type=Path,
+        help="Profile the run: write a cProfile file here and a report of hot spots "
+             "and allocations per stage to <file>.txt (slows the run down)"
     )
     
-    args = parser.parse_args()
+    args = parser.parse_args(argv)
     
+    profiler = None
+    if args.profile:
+        # Imported only when asked for, as it slows down startup
+        from profiling import Profiler
+        profiler = Profiler(args.profile).start()
+    metrics = RunMetrics("batch_converter", profiler=profiler)
     try:
-        converter = BatchConverter()
-        converter.json_to_csv(args.input_json, args.output_csv)
+        converter = BatchConverter(Projection.parse(args.columns), metrics=metrics)
+        json_files = resolve_inputs(args.input_json)
+        if len(json_files) == 1 and not args.per_file and not Path(args.input_json).is_dir():
+            converter.json_to_csv(json_files[0], args.output_csv)
+        else:
+            if not json_files:
+                logger.error(f"No JSON files match {args.input_json}")
+                return 1
+            if profiler is not None:
+                logger.warning("Files are parsed in worker processes, which are not profiled")
+            _, failed = converter.convert_many(json_files, args.output_csv, args.jobs, args.per_file)
+            if failed:
+                return 1
+        logger.info(metrics.summary())
     except Exception as e:
         logger.error(f"Error converting batch data: {e}")
         return 1
+    finally:
+        if profiler is not None:
+            profiler.stop()
+            logger.info(profiler.summary())
+        if args.metrics_out:
+            metrics.write(args.metrics_out)
     
     return 0
 
@@ -0,0 +1,285 @@
+"""
+Workspace export for ElevenLabs batch calling data.
+
+This module exports the recipients of every batch in the workspace in one
+pass: listing pages are streamed into batch IDs, the batches are fetched
+concurrently as soon as their IDs arrive, and their recipients are written
+straight to the output. No batch list or listing JSON is written in between.
+"""
+
+import argparse
+import logging
+from pathlib import Path
+from typing import Collection, Dict, Generator, Optional
+
+from batch_history import BatchHistoryFetcher
+from batch_processor import BatchProcessor
+from metrics import RunMetrics
+from projection import Projection
+from rate_limiter import AdaptiveRateLimiter, RateLimiter
+from response_cache import ResponseCache
+from retry import RetryPolicy
+from sinks import open_sink
+
+logger = logging.getLogger(__name__)
+
+
+class BatchExport:
+    """Stream the recipients of all workspace batches into one output."""
+    
+    def __init__(self, processor: BatchProcessor, fetcher: BatchHistoryFetcher,
+                 statuses: Optional[Collection[str]] = None):
+        """
+        Initialize the batch export.
+        
+        Args:
+            processor: Processor used to fetch batches and write recipients
+            fetcher: Fetcher used to list workspace batches
+            statuses: Only export batches with one of these statuses; all when omitted
+        """
+        self.processor = processor
+        self.fetcher = fetcher
+        self.statuses = set(statuses) if statuses else None
+        self.listed = 0
+        self.skipped = 0
+    
+    def iter_batch_ids(self, page_size: int = 100) -> Generator[str, None, None]:
+        """
+        Stream the IDs of the batches to export from the workspace listing.
+        
+        IDs are yielded page by page as the listing arrives, so fetching can
+        start before the last page is listed.
+        
+        Args:
+            page_size: Number of batches requested per page
+        
+        Yields:
+            Batch IDs, each once
+        
+        Raises:
+            requests.exceptions.RequestException: If a listing page cannot be fetched
+        """
+        seen = set()
+        for page in self.fetcher.iter_workspace_pages(page_size):
+            for batch in page.get("batch_calls", []):
+                batch_id = batch.get("id")
+                if not batch_id or batch_id in seen:
+                    continue
+                seen.add(batch_id)
+                self.listed += 1
+                if self.statuses is not None and batch.get("status") not in self.statuses:
+                    self.skipped += 1
+                    continue
+                yield batch_id
+    
+    def export(self, output: Path, page_size: int = 100, partition_by: Optional[str] = None,
+               max_rows: Optional[int] = None, max_bytes: Optional[int] = None) -> Dict[str, int]:
+        """
+        Export the recipients of all workspace batches.
+        
+        IDs that fail to fetch are saved to a retry list next to the output
+        (output with a .retry.csv suffix) that batch_processor.py can process.
+        
+        Args:
+            output: Output CSV file, .db/.sqlite database, or partitioned output path
+            page_size: Number of batches requested per listing page
+            partition_by: Split the output by this column or created_date
+            max_rows: Roll over to a new part file after this many rows
+            max_bytes: Roll over to a new part file after this many uncompressed bytes
+        
+        Returns:
+            Counts of listed, skipped, exported and failed batches and rows written
+        
+        Raises:
+            requests.exceptions.RequestException: If a listing page cannot be fetched
+        """
+        self.listed = 0
+        self.skipped = 0
+        failed = []
+        
+        with open_sink(output, self.processor.projection.fieldnames, partition_by=partition_by,
+                       max_rows=max_rows, max_bytes=max_bytes) as sink:
+            row_count = self.processor.process_batch_ids(self.iter_batch_ids(page_size), sink, failed=failed)
+        
+        self.processor.write_retry_list(failed, self.processor.retry_list_path(output))
+        
+        return {
+            "listed": self.listed,
+            "skipped": self.skipped,
+            "exported": self.listed - self.skipped - len(failed),
+            "failed": len(failed),
+            "rows": row_count
+        }
+
+
+def main(argv=None):
+    """Command line interface for the workspace export."""
+    # Configure logging
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    )
+    
+    parser = argparse.ArgumentParser(
+        description="Export the recipients of all ElevenLabs workspace batches in one pass",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+    python batch_export.py recipients.csv
+    python batch_export.py --workers 8 --rate-limit 0.1 recipients.csv.gz
+    python batch_export.py --status completed --columns batch_id,phone_number,var.customer_name out.csv
+    python batch_export.py --partition-by created_date recipients.csv.gz
+    python batch_export.py recipients.db
+        """
+    )
+    
+    parser.add_argument(
+        "output",
+        type=Path,
+        help="Output CSV file for all recipients, or a .db/.sqlite file for a SQLite database"
+    )
+    parser.add_argument(
+        "--status",
+        help="Comma-separated batch statuses to export, e.g. completed (default: all)"
+    )
+    parser.add_argument(
+        "--page-size",
+        type=int,
+        default=100,
+        help="Number of batches requested per listing page (default: 100)"
+    )
+    parser.add_argument(
+        "--rate-limit",
+        type=float,
+        default=0.2,
+        help="Average delay between API calls in seconds (default: 0.2)"
+    )
+    parser.add_argument(
+        "--burst",
+        type=int,
+        default=1,
+        help="Number of API calls allowed back to back (default: 1)"
+    )
+    parser.add_argument(
+        "--max-rate",
+        type=float,
+        help="Requests per second to ramp up to while the API does not answer 429 "
+             "(default: the --rate-limit rate)"
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Number of batches to fetch concurrently (default: 1)"
+    )
+    parser.add_argument(
+        "--cache-dir",
+        type=Path,
+        default=".batch_cache",
+        help="Directory for cached batch responses (default: .batch_cache)"
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Neither read nor write the response cache"
+    )
+    parser.add_argument(
+        "--max-retries",
+        type=int,
+        default=3,
+        help="Retries for timeouts, connection errors and 5xx responses (default: 3)"
+    )
+    parser.add_argument(
+        "--columns",
+        help="Comma-separated columns to write: standard column names, "
+             "batch.<path>, recipient.<path>, var.<dynamic variable> or name=path "
+             "(default: all standard columns)"
+    )
+    parser.add_argument(
+        "--partition-by",
+        choices=["batch_id", "agent_id", "created_date"],
+        help="Write one directory of part files per value, with a manifest.json "
+             "(created_date is the UTC date of created_at_unix)"
+    )
+    parser.add_argument(
+        "--max-rows",
+        type=int,
+        help="Roll over to a new part file after this many rows"
+    )
+    parser.add_argument(
+        "--max-mb",
+        type=float,
+        help="Roll over to a new part file after this many uncompressed MB"
+    )
+    parser.add_argument(
+        "--metrics-out",
+        type=Path,
+        help="Write run metrics to this file: JSON, or Prometheus text format for .prom"
+    )
+    parser.add_argument(
+        "--profile",
+        type=Path,
+        help="Profile the run: write a cProfile file here and a report of hot spots "
+             "and allocations per stage to <file>.txt (slows the run down)"
+    )
+    
+    args = parser.parse_args(argv)
+    
+    profiler = None
+    if args.profile:
+        # Imported only when asked for, as it slows down startup
+        from profiling import Profiler
+        profiler = Profiler(args.profile).start()
+    metrics = RunMetrics("batch_export", profiler=profiler)
+    try:
+        if args.rate_limit > 0:
+            rate_limiter = AdaptiveRateLimiter(1.0 / args.rate_limit, burst=args.burst, max_rate=args.max_rate)
+        else:
+            rate_limiter = RateLimiter(None)
+        cache = None if args.no_cache else ResponseCache(args.cache_dir)
+        processor = BatchProcessor(
+            rate_limit_delay=args.rate_limit,
+            max_workers=args.workers,
+            rate_limiter=rate_limiter,
+            cache=cache,
+            retry_policy=RetryPolicy(max_retries=args.max_retries),
+            projection=Projection.parse(args.columns),
+            metrics=metrics
+        )
+        fetcher = BatchHistoryFetcher(
+            rate_limiter=rate_limiter,
+            session=processor.session,
+            retry_policy=processor.retry_policy,
+            circuit_breaker=processor.circuit_breaker,
+            metrics=metrics
+        )
+        statuses = [status.strip() for status in args.status.split(",")] if args.status else None
+        stats = BatchExport(processor, fetcher, statuses=statuses).export(
+            args.output,
+            page_size=args.page_size,
+            partition_by=args.partition_by,
+            max_rows=args.max_rows,
+            max_bytes=int(args.max_mb * 1024 * 1024) if args.max_mb else None
+        )
+        logger.info(
+            f"Exported {args.output}: {stats['listed']} batches listed, {stats['exported']} exported, "
+            f"{stats['skipped']} skipped, {stats['failed']} failed, {stats['rows']} rows"
+        )
+        logger.info(metrics.summary())
+        if stats["failed"]:
+            return 1
+    except Exception as e:
+        logger.error(f"Error exporting batches: {e}")
+        return 1
+    finally:
+        if profiler is not None:
+            profiler.stop()
+            logger.info(profiler.summary())
+        if args.metrics_out:
+            metrics.write(args.metrics_out)
+    
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
@@ -5,89 +5,243 @@ This module provides functionality to fetch and save batch history from the Elev
 """
 
 import json
-import requests
 import argparse
 import logging
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Dict, Optional
-import sys
+from typing import TYPE_CHECKING, Dict, Generator, Iterable, Optional
 import os
+import time
 
-# Add current directory to path for imports
-sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from compression import codec_for, open_file
+from config import get_config
+from metrics import RunMetrics
+from rate_limiter import RateLimiter
+from retry import CircuitBreaker, RetryPolicy, send_with_retry
 
-from config import config
+if TYPE_CHECKING:
+    import requests
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-)
 logger = logging.getLogger(__name__)
 
 
 class BatchHistoryFetcher:
     """Fetch batch history from ElevenLabs API."""
     
-    def __init__(self):
-        """Initialize the batch history fetcher."""
+    def __init__(self, rate_limiter: Optional[RateLimiter] = None,
+                 session: Optional["requests.Session"] = None,
+                 retry_policy: Optional[RetryPolicy] = None,
+                 circuit_breaker: Optional[CircuitBreaker] = None,
+                 metrics: Optional[RunMetrics] = None):
+        """
+        Initialize the batch history fetcher.
+        
+        Args:
+            rate_limiter: Rate limiter shared with other fetchers
+            session: HTTP session shared with other fetchers
+            retry_policy: Policy for retrying transient failures
+            circuit_breaker: Circuit breaker shared with other fetchers
+            metrics: Run metrics to record requests and stage times in
+        """
+        self.rate_limiter = rate_limiter or RateLimiter()
+        config = get_config()
         self.api_base = config.api_base
         self.headers = config.headers
+        self.session = session or config.create_session()
+        self.retry_policy = retry_policy or RetryPolicy()
+        self.circuit_breaker = circuit_breaker or CircuitBreaker()
+        self.metrics = metrics or RunMetrics()
     
-    def fetch_workspace_batches(self, output_file: Path = None) -> Optional[Dict]:
+    def fetch_workspace_batches(self, output_file: Optional[Path] = None, *,
+                                page_size: int = 100) -> Optional[Dict]:
         """
         Fetch batch history from workspace.
         
+        All pages of the listing are fetched and kept in memory. When
+        output_file is given, the listing is streamed to it with
+        save_workspace_batches instead and not kept, so the result only
+        holds the number of batches saved.
+        
         Args:
             output_file: Optional path to save the JSON data
+            page_size: Number of batches requested per page
             
         Returns:
-            Dictionary containing batch history data, or None if failed
+            Dictionary containing batch history data (batch_count instead of
+            batch_calls when saved to output_file), or None if failed
         """
+        if output_file is not None:
+            batch_count = self.save_workspace_batches(Path(output_file), page_size=page_size)
+            if batch_count is None:
+                return None
+            return {"batch_count": batch_count, "has_more": False}
+        
+        import requests
+        
         logger.info("Fetching batch history from workspace...")
         
         try:
-            # Remove the specific batch ID from the URL to get workspace batches
-            workspace_url = f"{self.api_base}/workspace"
-            
-            response = requests.get(
-                workspace_url,
-                headers=self.headers,
-                timeout=30
-            )
-            response.raise_for_status()
+            batch_calls = list(self.iter_workspace_batches(page_size))
+            return {"batch_calls": batch_calls, "has_more": False}
             
-            data = response.json()
+        except requests.exceptions.RequestException as e:
+            logger.error(f"Failed to fetch batch history: {e}")
+            return None
+    
+    def save_workspace_batches(self, output_file: Path, page_size: int = 100) -> Optional[int]:
+        """
+        Fetch batch history from workspace and save it to a JSON file.
+        
+        Each page is written as it arrives and not kept afterwards, so memory
+        use does not grow with the size of the workspace.
+        
+        Args:
+            output_file: Path to save the JSON data
+            page_size: Number of batches requested per page
             
-            # Save to file if specified
-            if output_file:
-                self._save_to_file(data, output_file)
-                logger.info(f"Batch history saved to {output_file}")
+        Returns:
+            Number of batches saved, or None if failed
+        """
+        import requests
+        
+        logger.info("Fetching batch history from workspace...")
+        
+        try:
+            batch_count = 0
+            for _ in self._stream_to_file(self.iter_workspace_batches(page_size), output_file):
+                batch_count += 1
             
-            return data
+            logger.info(f"Batch history saved to {output_file}")
+            return batch_count
             
         except requests.exceptions.RequestException as e:
             logger.error(f"Failed to fetch batch history: {e}")
             return None
     
-    def _save_to_file(self, data: Dict, output_file: Path) -> None:
+    def iter_workspace_batches(self, page_size: int = 100) -> Generator[Dict, None, None]:
         """
-        Save data to JSON file.
+        Iterate over all batches in the workspace listing.
+        
+        Args:
+            page_size: Number of batches requested per page
+            
+        Yields:
+            Batch summary dictionaries
+            
+        Raises:
+            requests.exceptions.RequestException: If a page cannot be fetched
+        """
+        for page in self.iter_workspace_pages(page_size):
+            batch_calls = page.get("batch_calls", [])
+            self.metrics.increment("listed_batches", len(batch_calls))
+            yield from batch_calls
+    
+    def iter_workspace_pages(self, page_size: int = 100) -> Generator[Dict, None, None]:
+        """
+        Iterate over the pages of the workspace listing.
+        
+        The next page is requested in the background as soon as the current
+        one arrives, so the network round trip overlaps with the caller's
+        work on the current page.
         
         Args:
-            data: Data to save
+            page_size: Number of batches requested per page
+            
+        Yields:
+            Page dictionaries as returned by the API
+            
+        Raises:
+            requests.exceptions.RequestException: If a page cannot be fetched
+        """
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            future = executor.submit(self._fetch_page, None, page_size)
+            page_count = 0
+            
+            while future is not None:
+                page = future.result()
+                page_count += 1
+                
+                next_doc = page.get("next_doc")
+                future = None
+                if page.get("has_more") and next_doc:
+                    future = executor.submit(self._fetch_page, next_doc, page_size)
+                
+                logger.info(f"Fetched workspace page {page_count} "
+                            f"({len(page.get('batch_calls', []))} batches)")
+                yield page
+    
+    def _fetch_page(self, cursor: Optional[str], page_size: int) -> Dict:
+        """
+        Fetch one page of the workspace listing.
+        
+        Args:
+            cursor: next_doc value of the previous page, or None for the first page
+            page_size: Number of batches requested per page
+            
+        Returns:
+            Page dictionary
+            
+        Raises:
+            requests.exceptions.RequestException: If the request fails
+        """
+        params = {"limit": page_size}
+        if cursor:
+            params["last_doc"] = cursor
+        
+        response = send_with_retry(
+            self.session,
+            f"{self.api_base}/workspace",
+            self.rate_limiter,
+            retry_policy=self.retry_policy,
+            circuit_breaker=self.circuit_breaker,
+            params=params,
+            metrics=self.metrics
+        )
+        self.metrics.increment("pages")
+        with self.metrics.timed("parse"):
+            return response.json()
+    
+    def _stream_to_file(self, batches: Iterable[Dict], output_file: Path) -> Generator[Dict, None, None]:
+        """
+        Write batches to a JSON file as they are produced.
+        
+        The file is written under a temporary name and only moved into place
+        once the listing is complete. Names ending in .gz or .zst are
+        compressed as they are written.
+        
+        Args:
+            batches: Batches to write
             output_file: Output file path
+            
+        Yields:
+            The batches, after they have been written
         """
+        tmp_file = output_file.with_name(output_file.name + ".tmp")
         try:
-            with open(output_file, 'w', encoding='utf-8') as f:
-                json.dump(data, f, indent=2, ensure_ascii=False)
-        except Exception as e:
-            logger.error(f"Error saving to file {output_file}: {e}")
-            raise
+            with open_file(tmp_file, 'w', compression=codec_for(output_file)) as f:
+                f.write('{\n  "batch_calls": [')
+                for index, batch in enumerate(batches):
+                    start = time.perf_counter()
+                    f.write(",\n    " if index else "\n    ")
+                    f.write(json.dumps(batch, ensure_ascii=False))
+                    self.metrics.add_time("write", time.perf_counter() - start)
+                    self.metrics.add_rows(1)
+                    yield batch
+                f.write('\n  ],\n  "has_more": false\n}\n')
+            os.replace(tmp_file, output_file)
+        finally:
+            if tmp_file.exists():
+                tmp_file.unlink()
 
 
-def main():
+def main(argv=None):
     """Command line interface for batch history fetching."""
+    # Configure logging
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    )
+    
     parser = argparse.ArgumentParser(
         description="Fetch ElevenLabs batch history from workspace",
         formatter_class=argparse.RawDescriptionHelpFormatter,
@@ -96,6 +250,9 @@ Examples:
     python batch_history.py
     python batch_history.py --output history.json
     python batch_history.py -o data/batch_history.json
+    python batch_history.py -o data/batch_history.json.zst
+    python batch_history.py --metrics-out history_metrics.json
+    python batch_history.py --profile history.prof
         """
     )
     
@@ -105,16 +262,39 @@ Examples:
         default="batch_history.json",
         help="Output JSON file (default: batch_history.json)"
     )
+    parser.add_argument(
+        "--page-size",
+        type=int,
+        default=100,
+        help="Number of batches requested per page (default: 100)"
+    )
+    parser.add_argument(
+        "--metrics-out",
+        type=Path,
+        help="Write run metrics to this file: JSON, or Prometheus text format for .prom"
+    )
+    parser.add_argument(
+        "--profile",
+        type=Path,
+        help="Profile the run: write a cProfile file here and a report of hot spots "
+             "and allocations per stage to <file>.txt (slows the run down)"
+    )
     
-    args = parser.parse_args()
+    args = parser.parse_args(argv)
     
+    profiler = None
+    if args.profile:
+        # Imported only when asked for, as it slows down startup
+        from profiling import Profiler
+        profiler = Profiler(args.profile).start()
+    metrics = RunMetrics("batch_history", profiler=profiler)
     try:
-        fetcher = BatchHistoryFetcher()
-        data = fetcher.fetch_workspace_batches(args.output)
+        fetcher = BatchHistoryFetcher(metrics=metrics)
+        batch_count = fetcher.save_workspace_batches(args.output, page_size=args.page_size)
         
-        if data:
-            batch_count = len(data.get("batch_calls", []))
+        if batch_count is not None:
             logger.info(f"Successfully fetched {batch_count} batches")
+            logger.info(metrics.summary())
         else:
             logger.error("Failed to fetch batch history")
             return 1
@@ -122,6 +302,12 @@ Examples:
     except Exception as e:
         logger.error(f"Error fetching batch history: {e}")
         return 1
+    finally:
+        if profiler is not None:
+            profiler.stop()
+            logger.info(profiler.summary())
+        if args.metrics_out:
+            metrics.write(args.metrics_out)
     
     return 0
 
@@ -8,14 +8,12 @@ import json
 import csv
 import argparse
 import logging
-from typing import List, Dict
+from typing import List, Dict, Optional
 from pathlib import Path
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-)
+from compression import open_file
+from metrics import RunMetrics
+
 logger = logging.getLogger(__name__)
 
 
@@ -38,6 +36,15 @@ class BatchListConverter:
         "status"
     ]
     
+    def __init__(self, metrics: Optional[RunMetrics] = None):
+        """
+        Initialize the batch list converter.
+        
+        Args:
+            metrics: Run metrics to record rows and stage times in
+        """
+        self.metrics = metrics or RunMetrics()
+    
     def convert_batch_list(self, json_file: Path, csv_file: Path) -> None:
         """
         Convert batch list JSON data to CSV format.
@@ -54,7 +61,7 @@ class BatchListConverter:
             raise FileNotFoundError(f"JSON file not found: {json_file}")
         
         try:
-            with open(json_file, 'r', encoding='utf-8') as f:
+            with self.metrics.timed("parse"), open_file(json_file) as f:
                 data = json.load(f)
         except json.JSONDecodeError as e:
             raise ValueError(f"Invalid JSON format in {json_file}: {e}")
@@ -66,13 +73,17 @@ class BatchListConverter:
             return
         
         # Convert to CSV rows
-        rows = []
-        for batch in batch_calls:
-            row = self._create_batch_row(batch)
-            rows.append(row)
+        with self.metrics.timed("build"):
+            rows = []
+            for batch in batch_calls:
+                row = self._create_batch_row(batch)
+                rows.append(row)
         
         # Write to CSV
-        self._write_to_csv(rows, csv_file, self.BATCH_LIST_FIELDNAMES)
+        with self.metrics.timed("write"):
+            self._write_to_csv(rows, csv_file, self.BATCH_LIST_FIELDNAMES)
+        self.metrics.add_rows(len(rows))
+        self.metrics.increment("input_bytes", json_file.stat().st_size)
         logger.info(f"Converted {len(rows)} batches from {json_file} to {csv_file}")
     
     def _create_batch_row(self, batch: Dict) -> Dict:
@@ -97,7 +108,7 @@ class BatchListConverter:
             fieldnames: List of field names for CSV headers
         """
         try:
-            with open(output_file, 'w', newline='', encoding='utf-8') as f:
+            with open_file(output_file, 'w', newline='') as f:
                 writer = csv.DictWriter(f, fieldnames=fieldnames)
                 writer.writeheader()
                 writer.writerows(rows)
@@ -106,8 +117,14 @@ class BatchListConverter:
             raise
 
 
-def main():
+def main(argv=None):
     """Command line interface for batch list conversion."""
+    # Configure logging
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    )
+    
     parser = argparse.ArgumentParser(
         description="Convert ElevenLabs batch list JSON data to CSV format",
         formatter_class=argparse.RawDescriptionHelpFormatter,
@@ -115,6 +132,9 @@ def main():
 Examples:
     python batch_list_converter.py batch_list.json batch_list.csv
     python batch_list_converter.py input/batches.json output/batches.csv
+    python batch_list_converter.py batch_list.json.gz batch_list.csv.gz
+    python batch_list_converter.py --metrics-out convert_metrics.prom batch_list.json batch_list.csv
+    python batch_list_converter.py --profile convert.prof batch_list.json batch_list.csv
         """
     )
     
@@ -128,15 +148,39 @@ Examples:
         type=Path,
         help="Output CSV file for converted data"
     )
+    parser.add_argument(
+        "--metrics-out",
+        type=Path,
+        help="Write run metrics to this file: JSON, or Prometheus text format for .prom"
+    )
+    parser.add_argument(
+        "--profile",
+        type=Path,
+        help="Profile the run: write a cProfile file here and a report of hot spots "
+             "and allocations per stage to <file>.txt (slows the run down)"
+    )
     
-    args = parser.parse_args()
+    args = parser.parse_args(argv)
     
+    profiler = None
+    if args.profile:
+        # Imported only when asked for, as it slows down startup
+        from profiling import Profiler
+        profiler = Profiler(args.profile).start()
+    metrics = RunMetrics("batch_list_converter", profiler=profiler)
     try:
-        converter = BatchListConverter()
+        converter = BatchListConverter(metrics=metrics)
         converter.convert_batch_list(args.input_json, args.output_csv)
+        logger.info(metrics.summary())
     except Exception as e:
         logger.error(f"Error converting batch list data: {e}")
         return 1
+    finally:
+        if profiler is not None:
+            profiler.stop()
+            logger.info(profiler.summary())
+        if args.metrics_out:
+            metrics.write(args.metrics_out)
     
     return 0
 
@@ -6,41 +6,37 @@ and process recipients data from multiple batches.
 """
 
 import csv
-import requests
-import time
 import logging
 import argparse
-from typing import List, Dict, Generator, Optional
-from pathlib import Path
-import sys
 import os
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING, List, Dict, Generator, Iterable, Optional, Tuple
+from pathlib import Path
 
-# Add current directory to path for imports
-sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from compression import codec_for, copy_prefix, open_file, strip_compression_suffix
+from config import Config, get_config
+from metrics import RunMetrics
+from rate_limiter import AdaptiveRateLimiter, RateLimiter
+from projection import DEFAULT_PROJECTION, Projection
+from records import RecipientRecord
+from response_cache import ResponseCache
+from retry import CircuitBreaker, RetryPolicy, send_with_retry
+from phone_index import PhoneIndex
+from run_journal import RunJournal
+from sinks import CsvSink, is_sqlite_path, open_sink
 
-from config import config
+if TYPE_CHECKING:
+    import requests
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-)
 logger = logging.getLogger(__name__)
 
 
-class BatchProcessor:
-    """Process ElevenLabs batch calling data."""
+class BaseBatchProcessor:
+    """Batch list reading and recipient extraction shared by batch processors."""
     
-    def __init__(self, rate_limit_delay: float = 0.2):
-        """
-        Initialize the batch processor.
-        
-        Args:
-            rate_limit_delay: Delay between API calls to avoid rate limiting
-        """
-        self.rate_limit_delay = rate_limit_delay
-        self.api_base = config.api_base
-        self.headers = config.headers
+    # Columns extracted from each batch
+    projection = DEFAULT_PROJECTION
     
     def read_batch_ids_from_csv(self, csv_file: Path) -> List[str]:
         """
@@ -61,7 +57,7 @@ class BatchProcessor:
         
         batch_ids = []
         try:
-            with open(csv_file, newline='', encoding='utf-8') as f:
+            with open_file(csv_file, newline='') as f:
                 reader = csv.DictReader(f)
                 if 'id' not in reader.fieldnames:
                     raise ValueError("CSV file must contain 'id' column")
@@ -75,6 +71,103 @@ class BatchProcessor:
         
         return batch_ids
     
+    def extract_recipients(self, batch_data: Dict) -> Generator[RecipientRecord, None, None]:
+        """
+        Extract recipient data from batch data.
+        
+        Rows hold the columns of the processor's projection; the batch-level
+        fields are stored once in a shared header rather than copied into
+        every row.
+        
+        Args:
+            batch_data: Batch data dictionary
+            
+        Yields:
+            Recipient records sharing one batch header
+        """
+        return self.projection.iter_records(batch_data)
+    
+    def retry_list_path(self, output_csv: Path) -> Path:
+        """
+        Get the retry list path for an output file.
+        
+        Args:
+            output_csv: Output CSV file path
+            
+        Returns:
+            Path of the retry list CSV
+        """
+        return output_csv.with_name(strip_compression_suffix(output_csv).stem + ".retry.csv")
+    
+    def write_retry_list(self, batch_ids: List[str], retry_csv: Path) -> None:
+        """
+        Save failed batch IDs in the batch list format.
+        
+        Args:
+            batch_ids: IDs of batches that could not be fetched
+            retry_csv: Retry list path; removed when there is nothing to retry
+        """
+        if not batch_ids:
+            if retry_csv.exists():
+                retry_csv.unlink()
+            return
+        
+        with open(retry_csv, "w", newline='', encoding="utf-8") as f:
+            writer = csv.writer(f)
+            writer.writerow(["id"])
+            writer.writerows([batch_id] for batch_id in batch_ids)
+        logger.warning(f"{len(batch_ids)} batches failed; retry list saved to {retry_csv}")
+
+
+class BatchProcessor(BaseBatchProcessor):
+    """Process ElevenLabs batch calling data."""
+    
+    def __init__(self, rate_limit_delay: float = 0.2, max_workers: int = 1,
+                 rate_limiter: Optional[RateLimiter] = None,
+                 session: Optional["requests.Session"] = None,
+                 cache: Optional[ResponseCache] = None,
+                 max_requeues: int = 20,
+                 retry_policy: Optional[RetryPolicy] = None,
+                 circuit_breaker: Optional[CircuitBreaker] = None,
+                 phone_index: Optional[PhoneIndex] = None,
+                 projection: Optional[Projection] = None,
+                 metrics: Optional[RunMetrics] = None,
+                 config: Optional[Config] = None):
+        """
+        Initialize the batch processor.
+        
+        Args:
+            rate_limit_delay: Average delay between API calls to avoid rate limiting,
+                enforced across all worker threads
+            max_workers: Number of batches to fetch concurrently
+            rate_limiter: Shared rate limiter; overrides rate_limit_delay when given
+            session: Shared HTTP session; a pooled session sized for max_workers
+                is created when omitted
+            cache: On-disk response cache consulted before each API call
+            max_requeues: How many times a rate-limited (429) batch is queued
+                again before it is reported as failed
+            retry_policy: Policy for retrying transient failures
+            circuit_breaker: Circuit breaker pausing all workers while the API is down
+            phone_index: Open phone number index updated with every batch written
+            projection: Columns to extract; the standard columns when omitted
+            metrics: Run metrics to record requests, stage times and rows in
+            config: API key and base URL to use; the shared configuration when omitted
+        """
+        self.rate_limit_delay = rate_limit_delay
+        self.max_workers = max(1, max_workers)
+        self.rate_limiter = rate_limiter or RateLimiter.from_delay(rate_limit_delay)
+        config = config or get_config()
+        self.api_base = config.api_base
+        self.headers = config.headers
+        self.session = session or config.create_session(pool_size=self.max_workers)
+        self.cache = cache
+        self.max_requeues = max_requeues
+        self.retry_policy = retry_policy or RetryPolicy()
+        self.circuit_breaker = circuit_breaker or CircuitBreaker()
+        self.phone_index = phone_index
+        self.projection = projection or DEFAULT_PROJECTION
+        self.metrics = metrics or RunMetrics()
+    
     def fetch_batch(self, batch_id: str) -> Optional[Dict]:
         """
         Fetch batch data from ElevenLabs API.
@@ -85,101 +178,218 @@ class BatchProcessor:
         Returns:
             Batch data as dictionary, or None if failed
         """
+        import requests
+        
+        if self.cache is not None:
+            cached = self.cache.get(batch_id)
+            if cached is not None:
+                logger.info(f"Using cached batch {batch_id}")
+                self.metrics.increment("cache_hits")
+                return cached
+        
         logger.info(f"Fetching batch {batch_id}...")
         
         try:
-            response = requests.get(
+            response = send_with_retry(
+                self.session,
                 f"{self.api_base}/{batch_id}",
-                headers=self.headers,
-                timeout=30
+                self.rate_limiter,
+                retry_policy=self.retry_policy,
+                circuit_breaker=self.circuit_breaker,
+                max_requeues=self.max_requeues,
+                metrics=self.metrics
             )
-            response.raise_for_status()
-            
-            return response.json()
+            with self.metrics.timed("parse"):
+                data = response.json()
             
         except requests.exceptions.RequestException as e:
             logger.error(f"Failed to fetch batch {batch_id}: {e}")
             return None
+        
+        if self.cache is not None:
+            self.cache.put(batch_id, data)
+        return data
     
-    def extract_recipients(self, batch_data: Dict) -> Generator[Dict, None, None]:
+    def iter_batches(self, batch_ids: Iterable[str]) -> Generator[Tuple[str, Optional[Dict]], None, None]:
         """
-        Extract recipient data from batch data.
+        Fetch batches, concurrently when max_workers > 1.
         
-        Args:
-            batch_data: Batch data dictionary
-            
-        Yields:
-            Dictionary containing recipient information
-        """
-        recipients = batch_data.get("recipients", [])
-        
-        for recipient in recipients:
-            row = {
-                "batch_id": batch_data.get("id"),
-                "batch_name": batch_data.get("name"),
-                "agent_id": batch_data.get("agent_id"),
-                "agent_name": batch_data.get("agent_name"),
-                "created_at_unix": batch_data.get("created_at_unix"),
-                "scheduled_time_unix": batch_data.get("scheduled_time_unix"),
-                "total_calls_dispatched": batch_data.get("total_calls_dispatched"),
-                "total_calls_scheduled": batch_data.get("total_calls_scheduled"),
-                "last_updated_at_unix": batch_data.get("last_updated_at_unix"),
-                "status": batch_data.get("status"),
-                "recipient_id": recipient.get("id"),
-                "phone_number": recipient.get("phone_number"),
-                "recipient_status": recipient.get("status"),
-                "recipient_created_at_unix": recipient.get("created_at_unix"),
-                "recipient_updated_at_unix": recipient.get("updated_at_unix"),
-                "conversation_id": recipient.get("conversation_id"),
-                "city": self._extract_city(recipient)
-            }
-            yield row
-    
-    def _extract_city(self, recipient: Dict) -> str:
-        """
-        Extract city from recipient data.
+        Results are yielded in the same order as the input IDs. Only a bounded
+        window of requests is kept in flight, so batch_ids may be a lazy iterable.
         
         Args:
-            recipient: Recipient data dictionary
+            batch_ids: Batch IDs to fetch
             
-        Returns:
-            City name or empty string if not found
+        Yields:
+            Tuples of (batch_id, batch data or None if the fetch failed)
         """
-        try:
-            return recipient["conversation_initiation_client_data"]["dynamic_variables"].get("city", "")
-        except (KeyError, TypeError):
-            return ""
+        if self.max_workers == 1:
+            for batch_id in batch_ids:
+                yield batch_id, self.fetch_batch(batch_id)
+            return
+        
+        window = self.max_workers * 2
+        pending = deque()
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            try:
+                for batch_id in batch_ids:
+                    pending.append((batch_id, executor.submit(self.fetch_batch, batch_id)))
+                    if len(pending) >= window:
+                        done_id, future = pending.popleft()
+                        yield done_id, future.result()
+                
+                while pending:
+                    done_id, future = pending.popleft()
+                    yield done_id, future.result()
+            finally:
+                for _, future in pending:
+                    future.cancel()
     
-    def process_batch_list(self, batch_list_csv: Path, output_csv: Path) -> None:
+    def process_batch_list(self, batch_list_csv: Path, output_csv: Path,
+                           journal_file: Optional[Path] = None, resume: bool = False,
+                           partition_by: Optional[str] = None, max_rows: Optional[int] = None,
+                           max_bytes: Optional[int] = None) -> None:
         """
         Process multiple batches and save recipients to CSV.
         
+        Rows are written as each batch finishes, so memory use is bounded by
+        the batches in flight rather than the whole workspace. With a journal,
+        every written batch is recorded so that an interrupted run can resume;
+        the journal is deleted once a run finishes without failed batches.
+        IDs that fail to fetch are saved to a retry list next to the output
+        (output_csv with a .retry.csv suffix) that can be processed on its own.
+        An output path ending in .db, .sqlite or .sqlite3 is written to a
+        SQLite database instead, updating recipients that are already stored.
+        With partitioning, output_csv names a directory of part files plus a
+        manifest.json (recipients.csv.gz becomes recipients/ with .csv.gz parts).
+        
         Args:
             batch_list_csv: Path to CSV file containing batch IDs
             output_csv: Path to output CSV file for recipients
+            journal_file: Run journal recording processed batches
+            resume: Skip batches already written according to the journal and
+                append to the partial output
+            partition_by: Split the output by this column or created_date
+            max_rows: Roll over to a new part file after this many rows
+            max_bytes: Roll over to a new part file after this many uncompressed bytes
+        
+        Raises:
+            ValueError: If resuming partitioned output
         """
+        partitioned = bool(partition_by or max_rows or max_bytes)
+        if resume and partitioned:
+            raise ValueError("Partitioned output cannot be resumed; rerun without --resume")
+        
         batch_ids = self.read_batch_ids_from_csv(batch_list_csv)
         logger.info(f"Read {len(batch_ids)} batch IDs from {batch_list_csv}")
         
-        all_rows = []
+        journal = None
+        if journal_file is not None:
+            journal = RunJournal(journal_file).open(resume=resume)
         
-        for batch_id in batch_ids:
-            batch_data = self.fetch_batch(batch_id)
-            if not batch_data:
-                continue
-                
-            for row in self.extract_recipients(batch_data):
-                all_rows.append(row)
+        try:
+            append = False
+            if journal is not None and resume and journal.completed:
+                # SQLite output upserts, so replayed batches need no truncation
+                if not is_sqlite_path(output_csv):
+                    append = self._prepare_resume(output_csv, journal)
+                batch_ids = [batch_id for batch_id in batch_ids if batch_id not in journal.completed]
+                logger.info(f"Resuming: {len(journal.completed)} batches already written, "
+                            f"{len(batch_ids)} remaining")
             
-            # Rate limiting
-            time.sleep(self.rate_limit_delay)
+            with open_sink(output_csv, self.projection.fieldnames, append=append,
+                           partition_by=partition_by, max_rows=max_rows, max_bytes=max_bytes) as sink:
+                failed = []
+                row_count = self.process_batch_ids(batch_ids, sink, journal=journal, failed=failed)
+        finally:
+            if journal is not None:
+                journal.close()
         
-        if all_rows:
-            self._write_to_csv(all_rows, output_csv)
-            logger.info(f"Wrote {len(all_rows)} recipient rows to {output_csv}")
+        if journal is not None and not failed:
+            # Every batch is written, so there is nothing to resume
+            journal.remove()
+        self.write_retry_list(failed, self.retry_list_path(output_csv))
+        
+        if row_count:
+            logger.info(f"Wrote {row_count} recipient rows to {output_csv}")
         else:
             logger.warning("No recipient data found to write.")
     
+    def process_batch_ids(self, batch_ids: Iterable[str], sink: CsvSink,
+                          journal: Optional[RunJournal] = None,
+                          failed: Optional[List[str]] = None) -> int:
+        """
+        Fetch batches and stream their recipients to an open sink.
+        
+        Args:
+            batch_ids: Batch IDs to process
+            sink: Open sink receiving recipient rows
+            journal: Open run journal to record progress in
+            failed: List collecting the IDs of batches that could not be fetched
+            
+        Returns:
+            Number of recipient rows written
+        """
+        row_count = 0
+        
+        for batch_id, batch_data in self.iter_batches(batch_ids):
+            if not batch_data:
+                self.metrics.increment("failed_batches")
+                if failed is not None:
+                    failed.append(batch_id)
+                if journal is not None:
+                    journal.record_failed(batch_id)
+                continue
+            
+            if self.phone_index is not None:
+                recipients = list(self.extract_recipients(batch_data))
+                # The index needs the standard columns, whatever --columns selected
+                index_rows = recipients
+                if self.projection is not DEFAULT_PROJECTION:
+                    index_rows = DEFAULT_PROJECTION.iter_records(batch_data)
+                with self.metrics.timed("phone_index"):
+                    self.phone_index.write_rows(index_rows)
+                    self.phone_index.commit()
+            else:
+                recipients = self.extract_recipients(batch_data)
+            
+            rows = self.metrics.write_rows(sink, recipients)
+            self.metrics.increment("batches")
+            row_count += rows
+            if journal is not None:
+                journal.record_done(batch_id, rows, sink.tell())
+        
+        return row_count
+    
+    def _prepare_resume(self, output_csv: Path, journal: RunJournal) -> bool:
+        """
+        Cut the partial output back to the last batch recorded in the journal.
+        
+        Rows of a batch that was being written when the run died are removed,
+        so resuming never duplicates them. Compressed output cannot be cut in
+        place, so its intact part is copied into a new compressed file.
+        
+        Args:
+            output_csv: Partial output CSV file
+            journal: Loaded run journal
+            
+        Returns:
+            True if the output should be appended to
+        """
+        if not output_csv.exists() or journal.last_offset is None:
+            logger.warning(f"Partial output {output_csv} not found; starting a new file")
+            journal.completed.clear()
+            return False
+        
+        compression = codec_for(output_csv)
+        if compression:
+            tmp_file = output_csv.with_name(output_csv.name + ".tmp")
+            copy_prefix(output_csv, tmp_file, journal.last_offset, compression=compression)
+            os.replace(tmp_file, output_csv)
+        elif output_csv.stat().st_size > journal.last_offset:
+            os.truncate(output_csv, journal.last_offset)
+        return True
+    
     def _write_to_csv(self, rows: List[Dict], output_file: Path) -> None:
         """
         Write rows to CSV file.
@@ -192,20 +402,18 @@ class BatchProcessor:
             logger.warning("No data to write to CSV")
             return
         
-        fieldnames = list(rows[0].keys())
-        
-        try:
-            with open(output_file, "w", newline='', encoding="utf-8") as f:
-                writer = csv.DictWriter(f, fieldnames=fieldnames)
-                writer.writeheader()
-                writer.writerows(rows)
-        except Exception as e:
-            logger.error(f"Error writing to CSV file {output_file}: {e}")
-            raise
+        with CsvSink(output_file, self.projection.fieldnames) as sink:
+            sink.write_rows(rows)
 
 
-def main():
+def main(argv=None):
     """Command line interface for batch processing."""
+    # Configure logging
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    )
+    
     parser = argparse.ArgumentParser(
         description="Process ElevenLabs batch calling data",
         formatter_class=argparse.RawDescriptionHelpFormatter,
@@ -213,6 +421,21 @@ def main():
 Examples:
     python batch_processor.py batch_list.csv recipients.csv
     python batch_processor.py --rate-limit 0.5 batch_list.csv recipients.csv
+    python batch_processor.py --workers 8 --rate-limit 0.1 batch_list.csv recipients.csv
+    python batch_processor.py --workers 8 --rate-limit 0.1 --burst 5 batch_list.csv recipients.csv
+    python batch_processor.py --refresh batch_list.csv recipients.csv
+    python batch_processor.py --no-cache batch_list.csv recipients.csv
+    python batch_processor.py --workers 16 --rate-limit 0.1 --max-rate 50 batch_list.csv recipients.csv
+    python batch_processor.py --resume batch_list.csv recipients.csv
+    python batch_processor.py recipients.retry.csv recipients_retried.csv
+    python batch_processor.py batch_list.csv recipients.db
+    python batch_processor.py batch_list.csv recipients.csv.gz
+    python batch_processor.py --phone-index phones.idx batch_list.csv recipients.csv
+    python batch_processor.py --partition-by created_date batch_list.csv recipients.csv.gz
+    python batch_processor.py --max-rows 1000000 batch_list.csv recipients.csv
+    python batch_processor.py --metrics-out run_metrics.json batch_list.csv recipients.csv
+    python batch_processor.py --profile run.prof batch_list.csv recipients.csv
+    python batch_processor.py --columns batch_id,phone_number,recipient_status,var.customer_name batch_list.csv recipients.csv
         """
     )
     
@@ -224,20 +447,187 @@ Examples:
     parser.add_argument(
         "output_csv",
         type=Path,
-        help="Output CSV file for all recipients"
+        help="Output CSV file for all recipients, or a .db/.sqlite file for a SQLite database"
     )
     parser.add_argument(
         "--rate-limit",
         type=float,
         default=0.2,
-        help="Delay between API calls in seconds (default: 0.2)"
+        help="Average delay between API calls in seconds (default: 0.2)"
+    )
+    parser.add_argument(
+        "--burst",
+        type=int,
+        default=1,
+        help="Number of API calls allowed back to back (default: 1)"
+    )
+    parser.add_argument(
+        "--max-rate",
+        type=float,
+        help="Requests per second to ramp up to while the API does not answer 429 "
+             "(default: the --rate-limit rate)"
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Number of batches to fetch concurrently (default: 1)"
+    )
+    parser.add_argument(
+        "--cache-dir",
+        type=Path,
+        default=".batch_cache",
+        help="Directory for cached batch responses (default: .batch_cache)"
+    )
+    parser.add_argument(
+        "--cache-ttl",
+        type=float,
+        default=3600,
+        help="Seconds before cached active batches are fetched again; "
+             "completed batches never expire (default: 3600)"
+    )
+    parser.add_argument(
+        "--cache-max-mb",
+        type=int,
+        default=1024,
+        help="Maximum cache size in MB (default: 1024)"
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Neither read nor write the response cache"
+    )
+    parser.add_argument(
+        "--refresh",
+        action="store_true",
+        help="Ignore cached responses but store the fresh ones"
+    )
+    parser.add_argument(
+        "--journal",
+        type=Path,
+        help="Run journal file, deleted when no batch fails (default: output CSV with a .journal suffix)"
+    )
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="Skip batches recorded in the journal and append to the partial output"
+    )
+    parser.add_argument(
+        "--max-retries",
+        type=int,
+        default=3,
+        help="Retries for timeouts, connection errors and 5xx responses (default: 3)"
+    )
+    parser.add_argument(
+        "--columns",
+        help="Comma-separated columns to write: standard column names, "
+             "batch.<path>, recipient.<path>, var.<dynamic variable> or name=path "
+             "(default: all standard columns)"
+    )
+    parser.add_argument(
+        "--phone-index",
+        type=Path,
+        help="Phone number index to update with every recipient written"
+    )
+    parser.add_argument(
+        "--partition-by",
+        choices=["batch_id", "agent_id", "created_date"],
+        help="Write one directory of part files per value, with a manifest.json "
+             "(created_date is the UTC date of created_at_unix)"
+    )
+    parser.add_argument(
+        "--max-rows",
+        type=int,
+        help="Roll over to a new part file after this many rows"
+    )
+    parser.add_argument(
+        "--max-mb",
+        type=float,
+        help="Roll over to a new part file after this many uncompressed MB"
+    )
+    parser.add_argument(
+        "--metrics-out",
+        type=Path,
+        help="Write run metrics to this file: JSON, or Prometheus text format for .prom"
+    )
+    parser.add_argument(
+        "--profile",
+        type=Path,
+        help="Profile the run: write a cProfile file here and a report of hot spots "
+             "and allocations per stage to <file>.txt (slows the run down)"
     )
     
-    args = parser.parse_args()
+    args = parser.parse_args(argv)
     
     try:
-        processor = BatchProcessor(rate_limit_delay=args.rate_limit)
-        processor.process_batch_list(args.batch_list_csv, args.output_csv)
+        if args.rate_limit > 0:
+            rate_limiter = AdaptiveRateLimiter(
+                1.0 / args.rate_limit,
+                burst=args.burst,
+                max_rate=args.max_rate
+            )
+        else:
+            rate_limiter = RateLimiter(None)
+        cache = None
+        if not args.no_cache:
+            cache = ResponseCache(
+                args.cache_dir,
+                ttl=args.cache_ttl,
+                max_bytes=args.cache_max_mb * 1024 * 1024,
+                refresh=args.refresh
+            )
+        projection = Projection.parse(args.columns)
+        phone_index = PhoneIndex(args.phone_index).open() if args.phone_index else None
+        profiler = None
+        if args.profile:
+            # Imported only when asked for, as it slows down startup
+            from profiling import Profiler
+            profiler = Profiler(args.profile)
+        metrics = RunMetrics("batch_processor", profiler=profiler)
+        processor = BatchProcessor(
+            rate_limit_delay=args.rate_limit,
+            max_workers=args.workers,
+            rate_limiter=rate_limiter,
+            cache=cache,
+            retry_policy=RetryPolicy(max_retries=args.max_retries),
+            phone_index=phone_index,
+            projection=projection,
+            metrics=metrics
+        )
+        journal_file = args.journal or args.output_csv.with_name(args.output_csv.name + ".journal")
+        if profiler is not None:
+            profiler.start()
+        try:
+            processor.process_batch_list(
+                args.batch_list_csv,
+                args.output_csv,
+                journal_file=journal_file,
+                resume=args.resume,
+                partition_by=args.partition_by,
+                max_rows=args.max_rows,
+                max_bytes=int(args.max_mb * 1024 * 1024) if args.max_mb else None
+            )
+        finally:
+            if profiler is not None:
+                profiler.stop()
+                logger.info(profiler.summary())
+            if phone_index is not None:
+                phone_index.close()
+            stats = processor.retry_policy.stats
+            metrics.increment("retries", stats.retries)
+            metrics.increment("requeues", stats.requeues)
+            metrics.increment("circuit_opened", processor.circuit_breaker.opened)
+            if args.metrics_out:
+                metrics.write(args.metrics_out)
+        if cache is not None:
+            logger.info(f"Response cache: {cache.hits} hits, {cache.misses} misses")
+        logger.info(f"Retries: {stats.retries} ({stats.backoff_seconds:.1f}s backing off), "
+                    f"rate-limit requeues: {stats.requeues}, "
+                    f"circuit opened {processor.circuit_breaker.opened} times")
+        logger.info(metrics.summary())
+        if isinstance(rate_limiter, AdaptiveRateLimiter):
+            logger.info(f"Rate limited {rate_limiter.throttled} times; "
+                        f"final rate {rate_limiter.rate:.2f} requests/s")
     except Exception as e:
         logger.error(f"Error processing batches: {e}")
         return 1
@@ -0,0 +1,227 @@
+"""
+Delta sync for ElevenLabs batch calling data.
+
+This module keeps a recipients CSV up to date by fetching only the batches
+that are new or changed according to the workspace history.
+"""
+
+import csv
+import json
+import logging
+import argparse
+import os
+from pathlib import Path
+from typing import Dict, Optional
+
+from batch_history import BatchHistoryFetcher
+from compression import codec_for, open_file
+from batch_processor import BatchProcessor
+from metrics import RunMetrics
+from rate_limiter import RateLimiter
+from sinks import CsvSink
+
+logger = logging.getLogger(__name__)
+
+
+class BatchSync:
+    """Incrementally sync workspace recipients into a CSV file."""
+    
+    def __init__(self, processor: BatchProcessor, fetcher: BatchHistoryFetcher):
+        """
+        Initialize the batch sync.
+        
+        Args:
+            processor: Processor used to fetch changed batches
+            fetcher: Fetcher used to list workspace batches
+        """
+        self.processor = processor
+        self.fetcher = fetcher
+    
+    def sync(self, output_csv: Path, state_file: Path) -> Dict[str, int]:
+        """
+        Bring output_csv up to date with the workspace.
+        
+        Batches whose last_updated_at_unix matches the state file keep their
+        rows from the previous output; new and changed batches are fetched.
+        Batches that fail to fetch keep their previous rows and are retried
+        on the next sync. Batches no longer listed are dropped.
+        
+        Args:
+            output_csv: Recipients CSV to update
+            state_file: JSON file recording the synced batch versions
+        
+        Returns:
+            Counts of fetched, unchanged and failed batches and rows written
+        
+        Raises:
+            RuntimeError: If the workspace listing cannot be fetched
+        """
+        history = self.fetcher.fetch_workspace_batches()
+        if history is None:
+            raise RuntimeError("Failed to fetch batch history")
+        
+        listed = {}
+        for batch in history.get("batch_calls", []):
+            if batch.get("id"):
+                listed[batch["id"]] = batch.get("last_updated_at_unix")
+        
+        previous = self._load_state(state_file) if output_csv.exists() else {}
+        changed = [batch_id for batch_id, updated in listed.items()
+                   if batch_id not in previous or previous[batch_id] != updated]
+        logger.info(f"{len(changed)} of {len(listed)} batches are new or changed")
+        
+        state = {batch_id: previous[batch_id] for batch_id in listed if batch_id in previous}
+        failed = set()
+        tmp_csv = output_csv.with_name(output_csv.name + ".tmp")
+        
+        with CsvSink(tmp_csv, self.processor.projection.fieldnames, compression=codec_for(output_csv)) as sink:
+            for batch_id, batch_data in self.processor.iter_batches(changed):
+                if not batch_data:
+                    failed.add(batch_id)
+                    continue
+                self.processor.metrics.write_rows(sink, self.processor.extract_recipients(batch_data))
+                state[batch_id] = listed[batch_id]
+            
+            # Carry over rows of unchanged batches and of changed ones that failed
+            carried = {batch_id for batch_id in previous if batch_id in listed} - (set(changed) - failed)
+            if carried:
+                with open_file(output_csv, newline='') as f:
+                    self.processor.metrics.write_rows(
+                        sink,
+                        (row for row in csv.DictReader(f) if row["batch_id"] in carried),
+                        stage="carry_over"
+                    )
+        
+        os.replace(tmp_csv, output_csv)
+        self._save_state(state_file, state)
+        
+        return {
+            "fetched": len(changed) - len(failed),
+            "unchanged": len(listed) - len(changed),
+            "failed": len(failed),
+            "rows": sink.rows_written
+        }
+    
+    def _load_state(self, state_file: Path) -> Dict[str, Optional[int]]:
+        """
+        Load synced batch versions.
+        
+        Args:
+            state_file: State file path
+        
+        Returns:
+            Mapping of batch ID to last_updated_at_unix, empty if no state exists
+        """
+        if not state_file.exists():
+            return {}
+        
+        try:
+            with open(state_file, 'r', encoding='utf-8') as f:
+                return json.load(f).get("batches", {})
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable sync state {state_file}: {e}")
+            return {}
+    
+    def _save_state(self, state_file: Path, batches: Dict[str, Optional[int]]) -> None:
+        """
+        Save synced batch versions atomically.
+        
+        Args:
+            state_file: State file path
+            batches: Mapping of batch ID to last_updated_at_unix
+        """
+        tmp_file = state_file.with_name(state_file.name + ".tmp")
+        try:
+            with open(tmp_file, 'w', encoding='utf-8') as f:
+                json.dump({"batches": batches}, f, indent=2)
+            os.replace(tmp_file, state_file)
+        except Exception as e:
+            logger.error(f"Error saving sync state {state_file}: {e}")
+            raise
+
+
+def main(argv=None):
+    """Command line interface for delta sync."""
+    # Configure logging
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    )
+    
+    parser = argparse.ArgumentParser(
+        description="Sync recipients of new and changed ElevenLabs batches into a CSV",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+    python batch_sync.py recipients.csv
+    python batch_sync.py --state state/sync.json --workers 8 recipients.csv
+    python batch_sync.py --profile sync.prof recipients.csv
+        """
+    )
+    
+    parser.add_argument(
+        "output_csv",
+        type=Path,
+        help="Recipients CSV to create or update"
+    )
+    parser.add_argument(
+        "--state",
+        type=Path,
+        default="sync_state.json",
+        help="State file recording synced batches (default: sync_state.json)"
+    )
+    parser.add_argument(
+        "--rate-limit",
+        type=float,
+        default=0.2,
+        help="Average delay between API calls in seconds (default: 0.2)"
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Number of batches to fetch concurrently (default: 1)"
+    )
+    parser.add_argument(
+        "--profile",
+        type=Path,
+        help="Profile the run: write a cProfile file here and a report of hot spots "
+             "and allocations per stage to <file>.txt (slows the run down)"
+    )
+    
+    args = parser.parse_args(argv)
+    
+    profiler = None
+    if args.profile:
+        # Imported only when asked for, as it slows down startup
+        from profiling import Profiler
+        profiler = Profiler(args.profile).start()
+    try:
+        rate_limiter = RateLimiter.from_delay(args.rate_limit)
+        metrics = RunMetrics("batch_sync", profiler=profiler)
+        processor = BatchProcessor(max_workers=args.workers, rate_limiter=rate_limiter, metrics=metrics)
+        fetcher = BatchHistoryFetcher(
+            rate_limiter=rate_limiter,
+            session=processor.session,
+            retry_policy=processor.retry_policy,
+            circuit_breaker=processor.circuit_breaker,
+            metrics=metrics
+        )
+        stats = BatchSync(processor, fetcher).sync(args.output_csv, args.state)
+        logger.info(
+            f"Synced {args.output_csv}: {stats['fetched']} fetched, {stats['unchanged']} unchanged, "
+            f"{stats['failed']} failed, {stats['rows']} rows"
+        )
+    except Exception as e:
+        logger.error(f"Error syncing batches: {e}")
+        return 1
+    finally:
+        if profiler is not None:
+            profiler.stop()
+            logger.info(profiler.summary())
+    
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
@@ -0,0 +1,65 @@
+"""
+Single entry point for the ElevenLabs batch calling tools.
+
+Every tool is available as a subcommand, e.g. `python cli.py export
+recipients.csv` runs the workspace export and `python cli.py convert
+batch.json batch.csv` the batch converter. A command's module is only
+imported when the command runs, so startup stays fast.
+"""
+
+import argparse
+import importlib
+import os
+import sys
+
+# Subcommands: module providing main(argv), and a one-line description
+COMMANDS = {
+    "export": ("batch_export", "Stream all workspace batches into recipient rows in one pass"),
+    "history": ("batch_history", "Fetch the workspace batch listing to JSON"),
+    "convert-list": ("batch_list_converter", "Convert a batch listing JSON file to CSV"),
+    "process": ("batch_processor", "Fetch the batches of a batch list CSV into recipient rows"),
+    "process-async": ("async_batch_processor", "Same as process, with the asyncio engine"),
+    "convert": ("batch_converter", "Convert batch JSON files to recipient CSV"),
+    "sync": ("batch_sync", "Update a recipients CSV with new and changed batches"),
+    "phone-index": ("phone_index", "Build and query the phone number index"),
+    "synthetic": ("synthetic", "Generate synthetic batch data"),
+    "mock-api": ("mock_api", "Serve a local mock API or sweep it for load tests")
+}
+
+
+def main(argv=None):
+    """Run a subcommand."""
+    commands = "\n".join(f"    {name:<15}{description}" for name, (_, description) in COMMANDS.items())
+    parser = argparse.ArgumentParser(
+        description="ElevenLabs batch calling tools",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog=f"""
+Commands:
+{commands}
+
+Examples:
+    python cli.py export --workers 8 --rate-limit 0.1 recipients.csv.gz
+    python cli.py export --status completed --partition-by created_date recipients.csv
+    python cli.py convert archive/ all_batches.csv --jobs 8
+    python cli.py process --help
+        """
+    )
+    parser.add_argument("command", choices=COMMANDS, metavar="command",
+                        help="Tool to run, see Commands below")
+    parser.add_argument("args", nargs=argparse.REMAINDER,
+                        help="Arguments of the command; see <command> --help")
+    
+    args = parser.parse_args(argv)
+    
+    module = importlib.import_module(COMMANDS[args.command][0])
+    # Show the subcommand in the usage line of the command's help and errors
+    program = sys.argv[0]
+    sys.argv[0] = f"{os.path.basename(program)} {args.command}"
+    try:
+        return module.main(args.args)
+    finally:
+        sys.argv[0] = program
+
+
+if __name__ == "__main__":
+    exit(main())
@@ -2,31 +2,43 @@
 Configuration management for ElevenLabs Batch Calling Data Processor.
 
 This module handles environment variable loading and configuration settings.
+Nothing is loaded at import time: the .env file is read and the API key is
+checked the first time get_config() is called, so offline tools such as the
+converters work without an API key.
 """
 
 import os
-from dotenv import load_dotenv
-from typing import Optional
+from functools import lru_cache
+from typing import TYPE_CHECKING, Optional
 
-# Load environment variables from .env file
-load_dotenv()
+if TYPE_CHECKING:
+    import requests
 
 
 class Config:
     """Configuration class for managing API settings and environment variables."""
     
-    def __init__(self):
-        """Initialize configuration with environment variables."""
-        try:
-            self.api_key = self._get_required_env("ELEVENLABS_API_KEY")
-        except ValueError:
-            # Allow missing API key during testing
-            if os.getenv("TESTING") == "true":
-                self.api_key = "test_key"
-            else:
-                raise
-        self.api_base = self._get_env("ELEVENLABS_API_BASE", 
-                                     "https://api.elevenlabs.io/v1/convai/batch-calling")
+    def __init__(self, api_key: Optional[str] = None, api_base: Optional[str] = None):
+        """
+        Initialize configuration with environment variables.
+        
+        Args:
+            api_key: API key to use instead of ELEVENLABS_API_KEY
+            api_base: API base URL to use instead of ELEVENLABS_API_BASE
+        """
+        if api_key:
+            self.api_key = api_key
+        else:
+            try:
+                self.api_key = self._get_required_env("ELEVENLABS_API_KEY")
+            except ValueError:
+                # Allow missing API key during testing
+                if os.getenv("TESTING") == "true":
+                    self.api_key = "test_key"
+                else:
+                    raise
+        self.api_base = api_base or self._get_env("ELEVENLABS_API_BASE", 
+                                                  "https://api.elevenlabs.io/v1/convai/batch-calling")
         
     def _get_required_env(self, key: str) -> str:
         """Get a required environment variable or raise an error."""
@@ -44,7 +56,56 @@ class Config:
     def headers(self) -> dict:
         """Get HTTP headers for API requests."""
         return {"xi-api-key": self.api_key}
+    
+    def create_session(self, pool_size: int = 10) -> "requests.Session":
+        """
+        Create a pooled HTTP session for API requests.
+        
+        Connections are kept alive and reused across requests, and gzip
+        responses are accepted. The pool should be at least as large as the
+        number of threads sharing the session.
+        
+        Args:
+            pool_size: Maximum number of connections kept open per host
+            
+        Returns:
+            Configured requests session
+        """
+        import requests
+        from requests.adapters import HTTPAdapter
+        
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        session.headers.update(self.headers)
+        session.headers.update({
+            "Accept-Encoding": "gzip, deflate",
+            "Connection": "keep-alive"
+        })
+        return session
+
+
+@lru_cache(maxsize=None)
+def get_config() -> Config:
+    """
+    Get the configuration, loading the .env file on first use.
+    
+    Returns:
+        Shared configuration instance
+    
+    Raises:
+        ValueError: If ELEVENLABS_API_KEY is not set
+    """
+    from dotenv import load_dotenv
+    
+    # Load environment variables from .env file
+    load_dotenv()
+    return Config()
 
 
-# Global configuration instance
-config = Config()
+def __getattr__(name: str):
+    """Keep `from config import config` working, building the configuration on first access."""
+    if name == "config":
+        return get_config()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
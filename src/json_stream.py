@@ -0,0 +1,198 @@
+"""
+Incremental JSON parsing for large ElevenLabs batch files.
+
+This module walks the top level of a JSON object without loading the whole
+document, and can hand out large arrays one item at a time.
+"""
+
+import json
+from typing import Any, Collection, Generator, Iterator, TextIO, Tuple
+
+# Characters skipped between JSON tokens
+_WHITESPACE = " \t\n\r"
+
+# Characters that may appear inside a JSON number
+_NUMBER_CHARS = "0123456789.eE+-"
+
+
+class _StreamReader:
+    """Buffered reader that decodes JSON values from a text stream."""
+    
+    def __init__(self, fp: TextIO, chunk_size: int = 65536):
+        """
+        Initialize the reader.
+        
+        Args:
+            fp: Text stream to read from
+            chunk_size: Number of characters to read at a time
+        """
+        self._fp = fp
+        self._chunk_size = chunk_size
+        self._decoder = json.JSONDecoder()
+        self._buf = ""
+        self._pos = 0
+        self._offset = 0
+        self._eof = False
+    
+    def _fill(self) -> bool:
+        """
+        Read more data, dropping the consumed part of the buffer.
+        
+        The read size grows with the pending data so that a single large value
+        is decoded in a logarithmic number of attempts.
+        
+        Returns:
+            False if the stream is exhausted
+        """
+        if self._eof:
+            return False
+        
+        pending = self._buf[self._pos:]
+        data = self._fp.read(max(self._chunk_size, len(pending)))
+        self._offset += self._pos
+        self._buf = pending + data
+        self._pos = 0
+        if not data:
+            self._eof = True
+            return False
+        return True
+    
+    def _error(self, message: str) -> ValueError:
+        """Build an error pointing at the current stream offset."""
+        return ValueError(f"{message} at char {self._offset + self._pos}")
+    
+    def peek(self) -> str:
+        """
+        Skip whitespace and return the next character without consuming it.
+        
+        Returns:
+            Next character, or an empty string at the end of the stream
+        """
+        while True:
+            while self._pos < len(self._buf) and self._buf[self._pos] in _WHITESPACE:
+                self._pos += 1
+            if self._pos < len(self._buf) or not self._fill():
+                return self._buf[self._pos:self._pos + 1]
+    
+    def expect(self, chars: str) -> str:
+        """
+        Consume the next character, which must be one of chars.
+        
+        Args:
+            chars: Allowed characters
+        
+        Returns:
+            The consumed character
+        
+        Raises:
+            ValueError: If a different character or the end of stream is found
+        """
+        char = self.peek()
+        if not char or char not in chars:
+            expected = " or ".join(repr(c) for c in chars)
+            raise self._error(f"Expecting {expected}")
+        self._pos += 1
+        return char
+    
+    def decode_value(self) -> Any:
+        """
+        Decode the next complete JSON value.
+        
+        Returns:
+            Decoded value
+        
+        Raises:
+            ValueError: If the value is not valid JSON
+        """
+        self.peek()
+        while True:
+            try:
+                value, end = self._decoder.raw_decode(self._buf, self._pos)
+            except json.JSONDecodeError as e:
+                if self._fill():
+                    continue
+                raise self._error(e.msg)
+            
+            # A number cut at the buffer edge ("1." or "12") may continue in the next chunk
+            if (isinstance(value, (int, float)) and not self._buf[end:].strip(_NUMBER_CHARS)
+                    and self._fill()):
+                continue
+            
+            self._pos = end
+            return value
+    
+    def iter_array(self) -> Generator[Any, None, None]:
+        """
+        Decode a JSON array one item at a time.
+        
+        Yields:
+            Decoded array items
+        """
+        self.expect("[")
+        if self.peek() == "]":
+            self._pos += 1
+            return
+        
+        while True:
+            yield self.decode_value()
+            if self.expect(",]") == "]":
+                return
+
+
+def iter_object(fp: TextIO, stream_keys: Collection[str] = (),
+                chunk_size: int = 65536) -> Generator[Tuple[str, Any], None, None]:
+    """
+    Walk the members of a top-level JSON object.
+    
+    Values of keys listed in stream_keys that hold an array are returned as an
+    iterator over the array items instead of a list. The iterator must be used
+    before advancing to the next member; any items left over are skipped.
+    
+    Args:
+        fp: Text stream containing a JSON object
+        stream_keys: Keys whose array values should be streamed
+        chunk_size: Number of characters to read at a time
+    
+    Yields:
+        Tuples of (key, value)
+    
+    Raises:
+        ValueError: If the stream is not a valid JSON object
+    """
+    reader = _StreamReader(fp, chunk_size)
+    reader.expect("{")
+    if reader.peek() == "}":
+        reader.expect("}")
+    else:
+        while True:
+            if reader.peek() != '"':
+                raise reader._error("Expecting property name enclosed in double quotes")
+            key = reader.decode_value()
+            reader.expect(":")
+            
+            if key in stream_keys and reader.peek() == "[":
+                items = reader.iter_array()
+                yield key, items
+                for _ in items:
+                    pass
+            else:
+                yield key, reader.decode_value()
+            
+            if reader.expect(",}") == "}":
+                break
+    
+    if reader.peek():
+        raise reader._error("Extra data")
+
+
+def is_stream(value: Any) -> bool:
+    """
+    Check whether a value from iter_object is a streamed array.
+    
+    Args:
+        value: Value yielded by iter_object
+    
+    Returns:
+        True if the value is an item iterator
+    """
+    return isinstance(value, Iterator)
@@ -0,0 +1,389 @@
+"""
+Run metrics for ElevenLabs batch calling tools.
+
+This module collects what a run spent its time on: API requests by status
+code, a request latency histogram, bytes downloaded, rows written, time
+per stage (rate-limit waits, HTTP I/O, JSON parsing, writing rows)
+and peak memory. The CLIs write the metrics with --metrics-out as JSON, or
+in the Prometheus text format when the file name ends in .prom.
+"""
+
+import json
+import os
+import sys
+import threading
+import time
+from collections import Counter, defaultdict
+from contextlib import contextmanager, nullcontext
+from pathlib import Path
+from typing import ContextManager, Dict, Iterable, Iterator, List, Optional
+
+try:
+    import resource
+except ImportError:  # pragma: no cover - not available on Windows
+    resource = None
+
+# File suffixes written in the Prometheus text format
+PROMETHEUS_SUFFIXES = {".prom"}
+
+# Prefix of the Prometheus metric names
+METRIC_PREFIX = "elevenlabs_batch"
+
+# Upper bounds of the latency buckets: 1 ms growing by 25% up to about two minutes
+LATENCY_BUCKETS = tuple(0.001 * 1.25 ** exponent for exponent in range(53))
+
+
+class LatencyHistogram:
+    """Bucketed request latencies, with quantiles estimated from the buckets."""
+    
+    def __init__(self, bounds: Iterable[float] = LATENCY_BUCKETS):
+        """
+        Initialize the histogram.
+        
+        Args:
+            bounds: Increasing upper bounds of the buckets in seconds
+        """
+        self.bounds = tuple(bounds)
+        # One count per bound plus the overflow bucket
+        self.counts = [0] * (len(self.bounds) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+    
+    def observe(self, seconds: float) -> None:
+        """
+        Add one latency.
+        
+        Args:
+            seconds: Latency in seconds
+        """
+        low, high = 0, len(self.bounds)
+        while low < high:
+            middle = (low + high) // 2
+            if seconds <= self.bounds[middle]:
+                high = middle
+            else:
+                low = middle + 1
+        self.counts[low] += 1
+        self.count += 1
+        self.sum += seconds
+        self.max = max(self.max, seconds)
+    
+    def quantile(self, q: float) -> Optional[float]:
+        """
+        Estimate a quantile by interpolating within its bucket.
+        
+        Args:
+            q: Quantile between 0 and 1, e.g. 0.95
+        
+        Returns:
+            Latency in seconds, or None without observations
+        """
+        if not self.count:
+            return None
+        rank = q * self.count
+        cumulative = 0
+        for index, count in enumerate(self.counts):
+            if count and cumulative + count >= rank:
+                if index == len(self.bounds):
+                    return self.max
+                lower = self.bounds[index - 1] if index else 0.0
+                upper = min(self.bounds[index], self.max)
+                return lower + (upper - lower) * max(0.0, rank - cumulative) / count
+            cumulative += count
+        return self.max
+
+
+class RunMetrics:
+    """
+    Metrics of one run, safe to update from several threads.
+    
+    Stage times are summed over all threads, so with concurrent workers
+    they can add up to more than the elapsed time.
+    """
+    
+    def __init__(self, tool: str = "", profiler=None):
+        """
+        Initialize the metrics.
+        
+        Args:
+            tool: Name of the tool, added as a label to exported metrics
+            profiler: Optional profiling.Profiler attributing allocations to
+                the timed stages
+        """
+        self.tool = tool
+        self.profiler = profiler
+        # Unix time; formatted only when the metrics are exported
+        self.started_at = time.time()
+        self.latency = LatencyHistogram()
+        self.statuses = Counter()
+        self.bytes_downloaded = 0
+        self.rows = 0
+        self.stage_seconds: Dict[str, float] = defaultdict(float)
+        self.counters = Counter()
+        self._started = time.monotonic()
+        self._lock = threading.Lock()
+    
+    @property
+    def requests(self) -> int:
+        """Number of requests sent, including failed ones."""
+        return sum(self.statuses.values())
+    
+    def record_request(self, status: Optional[int], seconds: float, size: int = 0) -> None:
+        """
+        Record one API request.
+        
+        Args:
+            status: HTTP status code, or None if no response arrived
+            seconds: Time from sending the request to receiving the response
+            size: Size of the response body in bytes
+        """
+        with self._lock:
+            self.statuses[str(status) if status is not None else "error"] += 1
+            self.latency.observe(seconds)
+            self.bytes_downloaded += size
+            self.stage_seconds["http"] += seconds
+    
+    def add_time(self, stage: str, seconds: float) -> None:
+        """
+        Add time spent in a stage.
+        
+        Args:
+            stage: Stage name, e.g. "rate_limit", "parse" or "write"
+            seconds: Seconds spent
+        """
+        if seconds > 0:
+            with self._lock:
+                self.stage_seconds[stage] += seconds
+    
+    def traced(self, stage: str) -> ContextManager:
+        """
+        Attribute the allocations of a block of code to a stage when profiling.
+        
+        Args:
+            stage: Stage name
+        
+        Returns:
+            Context manager, doing nothing unless a profiler is set
+        """
+        if self.profiler is None:
+            return nullcontext()
+        return self.profiler.stage(stage)
+    
+    @contextmanager
+    def timed(self, stage: str) -> Iterator[None]:
+        """Time a block of code as a stage."""
+        start = time.perf_counter()
+        try:
+            with self.traced(stage):
+                yield
+        finally:
+            self.add_time(stage, time.perf_counter() - start)
+    
+    def add_rows(self, rows: int) -> None:
+        """
+        Count rows written.
+        
+        Args:
+            rows: Number of rows
+        """
+        with self._lock:
+            self.rows += rows
+    
+    def increment(self, name: str, amount: int = 1) -> None:
+        """
+        Increase a named counter, e.g. "cache_hits" or "failed_batches".
+        
+        Args:
+            name: Counter name
+            amount: Amount to add
+        """
+        with self._lock:
+            self.counters[name] += amount
+    
+    def write_rows(self, sink, rows: Iterable, stage: str = "write") -> int:
+        """
+        Write rows to a sink, timing it as a stage.
+        
+        Rows produced lazily, like the records of extract_recipients, are
+        built while the sink consumes them, so building them counts as
+        writing; timing the two apart would slow the write down. When
+        profiling, rows for the "write" stage are first collected in a
+        list as the "build" stage, so the profile shows the two apart.
+        
+        Args:
+            sink: Open sink with a write_rows method
+            rows: Rows to write
+            stage: Stage the time is attributed to
+        
+        Returns:
+            Number of rows written
+        """
+        if self.profiler is not None and stage == "write":
+            with self.timed("build"):
+                rows = list(rows)
+        start = time.perf_counter()
+        with self.traced(stage):
+            count = sink.write_rows(rows)
+        self.add_time(stage, time.perf_counter() - start)
+        self.add_rows(count)
+        return count
+    
+    def snapshot(self) -> Dict:
+        """
+        Get the metrics as a dictionary.
+        
+        Returns:
+            Metrics, as written to JSON files
+        """
+        with self._lock:
+            elapsed = time.monotonic() - self._started
+            latency = self.latency
+            return {
+                "tool": self.tool,
+                "started_at": time.strftime("%Y-%m-%dT%H:%M:%S+00:00", time.gmtime(self.started_at)),
+                "elapsed_seconds": round(elapsed, 3),
+                "requests": {
+                    "total": sum(self.statuses.values()),
+                    "by_status": dict(sorted(self.statuses.items())),
+                    "bytes_downloaded": self.bytes_downloaded,
+                    "latency_seconds": {
+                        "p50": _round(latency.quantile(0.5)),
+                        "p95": _round(latency.quantile(0.95)),
+                        "p99": _round(latency.quantile(0.99)),
+                        "mean": _round(latency.sum / latency.count if latency.count else None),
+                        "max": _round(latency.max if latency.count else None)
+                    }
+                },
+                "rows": self.rows,
+                "rows_per_second": round(self.rows / elapsed, 1) if elapsed > 0 else None,
+                "stage_seconds": {stage: round(seconds, 3)
+                                  for stage, seconds in sorted(self.stage_seconds.items())},
+                "counters": dict(sorted(self.counters.items())),
+                "peak_rss_bytes": peak_rss_bytes()
+            }
+    
+    def summary(self) -> str:
+        """
+        Summarize the run in one line for the log.
+        
+        Returns:
+            Requests, latency quantiles, rows per second and the slowest stages
+        """
+        snapshot = self.snapshot()
+        parts = [f"{snapshot['rows']} rows in {snapshot['elapsed_seconds']:.1f}s "
+                 f"({snapshot['rows_per_second'] or 0:.0f} rows/s)"]
+        requests = snapshot["requests"]
+        if requests["total"]:
+            latency = requests["latency_seconds"]
+            parts.append(f"{requests['total']} requests, {requests['bytes_downloaded'] / 1e6:.1f} MB, "
+                         f"latency p50/p95/p99 {latency['p50'] * 1000:.0f}/{latency['p95'] * 1000:.0f}/"
+                         f"{latency['p99'] * 1000:.0f} ms")
+        stages = sorted(snapshot["stage_seconds"].items(), key=lambda item: -item[1])
+        if stages:
+            parts.append("time in " + ", ".join(f"{stage} {seconds:.1f}s" for stage, seconds in stages[:4]))
+        return "Metrics: " + "; ".join(parts)
+    
+    def to_prometheus(self) -> str:
+        """
+        Render the metrics in the Prometheus text exposition format.
+        
+        Returns:
+            Text suitable for the node exporter textfile collector
+        """
+        snapshot = self.snapshot()
+        with self._lock:
+            bounds = self.latency.bounds
+            counts = list(self.latency.counts)
+            latency_sum = self.latency.sum
+            latency_count = self.latency.count
+        
+        labels = f'tool="{self.tool}"'
+        lines: List[str] = []
+        
+        def metric(name: str, kind: str, help_text: str, samples: List) -> None:
+            lines.append(f"# HELP {METRIC_PREFIX}_{name} {help_text}")
+            lines.append(f"# TYPE {METRIC_PREFIX}_{name} {kind}")
+            for suffix, extra_labels, value in samples:
+                all_labels = ",".join(filter(None, [labels, extra_labels]))
+                lines.append(f"{METRIC_PREFIX}_{name}{suffix}{{{all_labels}}} {_format_value(value)}")
+        
+        metric("requests_total", "counter", "API requests sent by response status.",
+               [("", f'status="{status}"', count)
+                for status, count in snapshot["requests"]["by_status"].items()])
+        
+        buckets = []
+        cumulative = 0
+        for bound, count in zip(bounds, counts):
+            cumulative += count
+            buckets.append(("_bucket", f'le="{bound:.6g}"', cumulative))
+        buckets.append(("_bucket", 'le="+Inf"', latency_count))
+        buckets.append(("_sum", "", latency_sum))
+        buckets.append(("_count", "", latency_count))
+        metric("request_duration_seconds", "histogram", "API request latency.", buckets)
+        
+        quantiles = snapshot["requests"]["latency_seconds"]
+        metric("request_latency_seconds", "gauge", "Estimated API request latency quantiles.",
+               [("", f'quantile="{q}"', quantiles[key])
+                for q, key in (("0.5", "p50"), ("0.95", "p95"), ("0.99", "p99"))
+                if quantiles[key] is not None])
+        
+        metric("downloaded_bytes_total", "counter", "Response bytes downloaded.",
+               [("", "", snapshot["requests"]["bytes_downloaded"])])
+        metric("rows_total", "counter", "Rows written.", [("", "", snapshot["rows"])])
+        metric("rows_per_second", "gauge", "Rows written per second of the run.",
+               [("", "", snapshot["rows_per_second"] or 0)])
+        metric("stage_seconds_total", "counter", "Seconds spent per stage, summed over threads.",
+               [("", f'stage="{stage}"', seconds) for stage, seconds in snapshot["stage_seconds"].items()])
+        metric("events_total", "counter", "Run events such as cache hits and failed batches.",
+               [("", f'event="{name}"', count) for name, count in snapshot["counters"].items()])
+        metric("elapsed_seconds", "gauge", "Duration of the run.", [("", "", snapshot["elapsed_seconds"])])
+        if snapshot["peak_rss_bytes"] is not None:
+            metric("peak_rss_bytes", "gauge", "Peak resident set size of the process.",
+                   [("", "", snapshot["peak_rss_bytes"])])
+        
+        return "\n".join(lines) + "\n"
+    
+    def write(self, output_file: Path) -> None:
+        """
+        Write the metrics to a file, replacing it atomically.
+        
+        Args:
+            output_file: JSON file, or a .prom file for the Prometheus text format
+        """
+        output_file = Path(output_file)
+        if output_file.suffix.lower() in PROMETHEUS_SUFFIXES:
+            content = self.to_prometheus()
+        else:
+            content = json.dumps(self.snapshot(), indent=2) + "\n"
+        
+        tmp_file = output_file.with_name(output_file.name + ".tmp")
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            f.write(content)
+        os.replace(tmp_file, output_file)
+
+
+def peak_rss_bytes() -> Optional[int]:
+    """
+    Get the peak resident set size of this process.
+    
+    Returns:
+        Peak RSS in bytes, or None where the platform does not report it
+    """
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def _round(value: Optional[float]) -> Optional[float]:
+    """Round a latency for output."""
+    return round(value, 6) if value is not None else None
+
+
+def _format_value(value) -> str:
+    """Format a sample value for the Prometheus text format."""
+    if isinstance(value, float):
+        return f"{value:.6g}"
+    return str(value)
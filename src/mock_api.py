@@ -0,0 +1,609 @@
+"""
+Local mock of the ElevenLabs batch calling API.
+
+This module serves synthetic data for the workspace listing (/workspace)
+and single batches (/{batch_id}), so the fetchers can be load and soak
+tested offline. Latency, 429 and 5xx responses, Retry-After, pagination and
+payload size are configurable. Point the tools at the server with
+ELEVENLABS_API_BASE, or sweep the processors over a range of concurrency
+levels to see where throughput stops growing.
+"""
+
+import argparse
+import asyncio
+import csv
+import json
+import logging
+import random
+import tempfile
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import TYPE_CHECKING, Callable, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+from synthetic import iter_recipients, make_batch_summaries, make_batch_summary
+
+if TYPE_CHECKING:
+    from config import Config
+
+logger = logging.getLogger(__name__)
+
+# Path the real API serves batch calling under
+DEFAULT_PREFIX = "/v1/convai/batch-calling"
+
+# Status codes returned when an error is injected
+ERROR_STATUS_CODES = [500, 502, 503]
+
+# Replaced by the batch ID in the shared recipients payload
+_BATCH_ID_PLACEHOLDER = b"__BATCH_ID__"
+
+
+def parse_latency(spec: str) -> Callable[[random.Random], float]:
+    """
+    Parse a latency distribution.
+    
+    Args:
+        spec: Fixed number of seconds, or one of uniform:<low>,<high>,
+            normal:<mean>,<stddev>, lognormal:<median>,<sigma> or exp:<mean>
+    
+    Returns:
+        Function drawing a latency in seconds from a random number generator
+    
+    Raises:
+        ValueError: If the spec is not a known distribution
+    """
+    kind, _, params = spec.partition(":")
+    try:
+        if not params:
+            value = max(0.0, float(kind))
+            return lambda rng: value
+        values = [float(value) for value in params.split(",")]
+        if kind == "uniform":
+            low, high = values
+            return lambda rng: rng.uniform(low, high)
+        if kind == "normal":
+            mean, stddev = values
+            return lambda rng: max(0.0, rng.gauss(mean, stddev))
+        if kind == "lognormal":
+            median, sigma = values
+            return lambda rng: median * rng.lognormvariate(0, sigma)
+        if kind == "exp":
+            (mean,) = values
+            return lambda rng: rng.expovariate(1 / mean) if mean > 0 else 0.0
+    except ValueError:
+        pass
+    raise ValueError(
+        f"Invalid latency {spec!r}; use seconds, uniform:<low>,<high>, normal:<mean>,<stddev>, "
+        f"lognormal:<median>,<sigma> or exp:<mean>"
+    )
+
+
+class MockApi:
+    """
+    Synthetic batch calling data and the fault injection applied to it.
+    
+    Every batch has the same number of recipients. Their payload is
+    serialized once with a placeholder for the batch ID, so serving a batch
+    costs little more than copying it and the server does not become the
+    bottleneck of a load test.
+    """
+    
+    def __init__(self, batches: int = 1000, recipients: int = 100, max_page_size: int = 100,
+                 latency: str = "0", error_rate: float = 0.0, throttle_rate: float = 0.0,
+                 retry_after: Optional[str] = "1", max_rps: Optional[float] = None,
+                 api_key: Optional[str] = None, seed: int = 0):
+        """
+        Initialize the mock API.
+        
+        Args:
+            batches: Number of batches in the workspace listing
+            recipients: Number of recipients of every batch
+            max_page_size: Largest page of the listing, whatever limit is requested
+            latency: Latency distribution, see parse_latency
+            error_rate: Fraction of requests answered with a 5xx status
+            throttle_rate: Fraction of requests answered with 429
+            retry_after: Retry-After header sent with 429 responses, or None for none
+            max_rps: Requests per second accepted before answering 429
+            api_key: API key required in the xi-api-key header; any key when omitted
+            seed: Random seed for the data and the injected faults
+        """
+        self.recipients = recipients
+        self.max_page_size = max(1, max_page_size)
+        self.latency = parse_latency(latency)
+        self.error_rate = error_rate
+        self.throttle_rate = throttle_rate
+        self.retry_after = retry_after
+        self.max_rps = max_rps
+        self.api_key = api_key
+        self.seed = seed
+        
+        self.listing = make_batch_summaries(batches, seed, recipients)
+        self._summaries = {batch["id"]: batch for batch in self.listing}
+        self._positions = {batch["id"]: position for position, batch in enumerate(self.listing)}
+        
+        placeholder = _BATCH_ID_PLACEHOLDER.decode()
+        payload = []
+        for recipient in iter_recipients(recipients, seed):
+            recipient["id"] = f"{placeholder}_{recipient['id']}"
+            if recipient["conversation_id"]:
+                recipient["conversation_id"] = f"{placeholder}_{recipient['conversation_id']}"
+            payload.append(recipient)
+        self._recipients_payload = json.dumps(payload).encode()
+        
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._tokens = float(max(1.0, max_rps or 1.0))
+        self._updated = time.monotonic()
+        self.reset_stats()
+    
+    def reset_stats(self) -> None:
+        """Clear the request statistics."""
+        with self._lock:
+            self.requests = 0
+            self.bytes_sent = 0
+            self.statuses = Counter()
+    
+    def draw_latency(self) -> float:
+        """
+        Draw the latency of one response.
+        
+        Returns:
+            Seconds to wait before responding
+        """
+        with self._lock:
+            return self.latency(self._rng)
+    
+    def handle(self, path: str, query: Dict[str, List[str]],
+               api_key: Optional[str] = None) -> Tuple[int, Dict[str, str], bytes]:
+        """
+        Answer a GET request.
+        
+        Args:
+            path: Request path; the last segment is "workspace" or a batch ID
+            query: Parsed query string
+            api_key: Value of the xi-api-key header
+        
+        Returns:
+            Tuple of (status code, extra headers, JSON body)
+        """
+        status, headers, body = self._respond(path, query, api_key)
+        with self._lock:
+            self.requests += 1
+            self.bytes_sent += len(body)
+            self.statuses[status] += 1
+        return status, headers, body
+    
+    def _respond(self, path: str, query: Dict[str, List[str]],
+                 api_key: Optional[str]) -> Tuple[int, Dict[str, str], bytes]:
+        """Route a request and inject faults."""
+        if self.api_key is not None and api_key != self.api_key:
+            return 401, {}, _error("invalid_api_key", "Invalid API key")
+        
+        with self._lock:
+            admitted = self._admit()
+            throttled = self._rng.random() < self.throttle_rate
+            failed = self._rng.random() < self.error_rate
+            error_status = self._rng.choice(ERROR_STATUS_CODES)
+        
+        if not admitted or throttled:
+            headers = {"Retry-After": self.retry_after} if self.retry_after is not None else {}
+            return 429, headers, _error("rate_limited", "Too many requests")
+        if failed:
+            return error_status, {}, _error("server_error", "Injected server error")
+        
+        segment = path.rstrip("/").rsplit("/", 1)[-1]
+        if segment == "workspace":
+            return 200, {}, self.page(query.get("last_doc", [None])[0], query.get("limit", [None])[0])
+        if not segment:
+            return 404, {}, _error("not_found", "Not found")
+        return 200, {}, self.batch(segment)
+    
+    def _admit(self) -> bool:
+        """Take a token from the server-side rate limit; call with the lock held."""
+        if not self.max_rps:
+            return True
+        now = time.monotonic()
+        capacity = max(1.0, self.max_rps)
+        self._tokens = min(capacity, self._tokens + (now - self._updated) * self.max_rps)
+        self._updated = now
+        if self._tokens >= 1:
+            self._tokens -= 1
+            return True
+        return False
+    
+    def page(self, last_doc: Optional[str] = None, limit: Optional[str] = None) -> bytes:
+        """
+        Build one page of the workspace listing.
+        
+        Args:
+            last_doc: ID of the last batch of the previous page
+            limit: Requested page size
+        
+        Returns:
+            JSON page with batch_calls, has_more and next_doc
+        """
+        start = self._positions[last_doc] + 1 if last_doc in self._positions else 0
+        try:
+            size = min(self.max_page_size, max(1, int(limit)))
+        except (TypeError, ValueError):
+            size = self.max_page_size
+        batches = self.listing[start:start + size]
+        has_more = start + size < len(self.listing)
+        return json.dumps({
+            "batch_calls": batches,
+            "has_more": has_more,
+            "next_doc": batches[-1]["id"] if has_more and batches else None
+        }).encode()
+    
+    def batch(self, batch_id: str) -> bytes:
+        """
+        Build a single batch with its recipients.
+        
+        Batches not in the listing are made up on the fly, so any batch ID
+        can be fetched.
+        
+        Args:
+            batch_id: ID of the batch
+        
+        Returns:
+            JSON batch
+        """
+        summary = self._summaries.get(batch_id)
+        if summary is None:
+            summary = make_batch_summary(batch_id, random.Random(batch_id), recipients=self.recipients)
+        head = json.dumps(summary).encode()[:-1]
+        # The placeholder sits inside JSON strings, so the ID is escaped as one
+        escaped_id = json.dumps(batch_id)[1:-1].encode()
+        recipients = self._recipients_payload.replace(_BATCH_ID_PLACEHOLDER, escaped_id)
+        return b"".join([head, b', "recipients": ', recipients, b"}"])
+
+
+def _error(status: str, message: str) -> bytes:
+    """Build an error body in the API's format."""
+    return json.dumps({"detail": {"status": status, "message": message}}).encode()
+
+
+class _MockApiHandler(BaseHTTPRequestHandler):
+    """Serve MockApi responses over HTTP/1.1 with keep-alive."""
+    
+    protocol_version = "HTTP/1.1"
+    # Headers and body are separate writes; with Nagle's algorithm the body
+    # waits for the client's delayed ACK, adding ~40 ms to every response
+    disable_nagle_algorithm = True
+    
+    def do_GET(self) -> None:
+        url = urlsplit(self.path)
+        status, headers, body = self.server.api.handle(
+            url.path, parse_qs(url.query), self.headers.get("xi-api-key")
+        )
+        delay = self.server.api.draw_latency()
+        if delay > 0:
+            time.sleep(delay)
+        
+        try:
+            self.send_response(status)
+            for name, value in headers.items():
+                self.send_header(name, value)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        except (BrokenPipeError, ConnectionResetError):
+            # The client gave up waiting; nothing left to do
+            self.close_connection = True
+    
+    def log_message(self, format: str, *args) -> None:
+        logger.debug(format, *args)
+
+
+class MockApiServer(ThreadingHTTPServer):
+    """
+    HTTP server for a MockApi, run in a background thread.
+    
+    Use as a context manager:
+        
+        with MockApiServer(MockApi(latency="0.05")) as server:
+            processor.api_base = server.url
+    """
+    
+    daemon_threads = True
+    # Load tests open many connections at once
+    request_queue_size = 1024
+    
+    def __init__(self, api: MockApi, host: str = "127.0.0.1", port: int = 0,
+                 prefix: str = DEFAULT_PREFIX):
+        """
+        Initialize the server.
+        
+        Args:
+            api: Mock API to serve
+            host: Interface to listen on
+            port: Port to listen on, or 0 for any free port
+            prefix: Path the API is served under
+        """
+        super().__init__((host, port), _MockApiHandler)
+        self.api = api
+        self.prefix = prefix
+        self._thread: Optional[threading.Thread] = None
+    
+    @property
+    def url(self) -> str:
+        """Base URL to use as ELEVENLABS_API_BASE."""
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}{self.prefix}"
+    
+    def start(self) -> "MockApiServer":
+        """
+        Start serving in a background thread.
+        
+        Returns:
+            The server itself
+        """
+        # A short poll interval lets stop() return promptly
+        self._thread = threading.Thread(target=self.serve_forever, kwargs={"poll_interval": 0.05},
+                                        daemon=True)
+        self._thread.start()
+        return self
+    
+    def stop(self) -> None:
+        """Stop serving and close the socket."""
+        if self._thread is not None:
+            self.shutdown()
+            self._thread.join()
+            self._thread = None
+        self.server_close()
+    
+    def __enter__(self) -> "MockApiServer":
+        return self.start()
+    
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.stop()
+
+
+def run_sweep(api: MockApi, concurrency_levels: List[int], engine: str = "threads") -> List[Dict]:
+    """
+    Fetch every listed batch at each concurrency level and measure throughput.
+    
+    Args:
+        api: Mock API to run against
+        concurrency_levels: Worker counts (threads) or requests in flight (async)
+        engine: "threads" for BatchProcessor, "async" for AsyncBatchProcessor
+    
+    Returns:
+        One result per level with seconds, batches/s, rows/s and response counts
+    """
+    from config import Config
+    from sinks import CsvSink
+    
+    batch_ids = [batch["id"] for batch in api.listing]
+    results = []
+    
+    with MockApiServer(api) as server:
+        # The mock accepts any key unless it was given one
+        config = Config(api_key=api.api_key or "mock", api_base=server.url)
+        for level in concurrency_levels:
+            api.reset_stats()
+            failed = []
+            with tempfile.TemporaryDirectory() as temp_dir:
+                output = Path(temp_dir) / "recipients.csv"
+                # Per-batch progress and requeue messages would drown the results
+                logging.disable(logging.WARNING)
+                try:
+                    start = time.perf_counter()
+                    if engine == "async":
+                        rows = asyncio.run(_sweep_async(config, batch_ids, level, output, failed))
+                    else:
+                        from batch_processor import BatchProcessor
+                        processor = BatchProcessor(rate_limit_delay=0, max_workers=level, config=config)
+                        with CsvSink(output, processor.projection.fieldnames) as sink:
+                            rows = processor.process_batch_ids(batch_ids, sink, failed=failed)
+                    seconds = time.perf_counter() - start
+                finally:
+                    logging.disable(logging.NOTSET)
+            
+            result = {
+                "concurrency": level,
+                "seconds": round(seconds, 3),
+                "batches_per_second": round((len(batch_ids) - len(failed)) / seconds, 2),
+                "rows_per_second": round(rows / seconds, 1),
+                "requests": api.requests,
+                "throttled": api.statuses[429],
+                "errors": sum(count for status, count in api.statuses.items() if status >= 500),
+                "failed_batches": len(failed)
+            }
+            logger.info(f"Concurrency {level}: {result['batches_per_second']} batches/s, "
+                        f"{result['rows_per_second']} rows/s, {result['throttled']} throttled, "
+                        f"{result['errors']} errors")
+            results.append(result)
+    
+    return results
+
+
+async def _sweep_async(config: "Config", batch_ids: List[str], level: int, output: Path,
+                       failed: List[str]) -> int:
+    """Fetch batches with the asyncio engine for one sweep level."""
+    from async_batch_processor import AsyncBatchProcessor
+    from sinks import AsyncSink, CsvSink
+    
+    async with AsyncBatchProcessor(rate_limit_delay=0, max_concurrency=level, config=config) as processor:
+        with CsvSink(output, processor.projection.fieldnames) as csv_sink:
+            async with AsyncSink(csv_sink) as sink:
+                return await processor.process_batch_ids(batch_ids, sink, failed=failed)
+
+
+def format_sweep(results: List[Dict], width: int = 40) -> str:
+    """
+    Render sweep results as a table with a bar chart of throughput.
+    
+    Args:
+        results: Results of run_sweep
+        width: Width of the longest bar
+    
+    Returns:
+        Multi-line text
+    """
+    best = max((result["batches_per_second"] for result in results), default=0) or 1
+    lines = [f"{'concurrency':>11}  {'batches/s':>9}  {'rows/s':>10}  {'429':>5}  {'5xx':>5}"]
+    for result in results:
+        bar = "#" * round(width * result["batches_per_second"] / best)
+        lines.append(f"{result['concurrency']:>11}  {result['batches_per_second']:>9.1f}  "
+                     f"{result['rows_per_second']:>10.0f}  {result['throttled']:>5}  "
+                     f"{result['errors']:>5}  {bar}")
+    return "\n".join(lines)
+
+
+def plot_sweep(results: List[Dict], output_file: Path) -> bool:
+    """
+    Plot throughput against concurrency.
+    
+    Args:
+        results: Results of run_sweep
+        output_file: Image file to write, e.g. sweep.png
+    
+    Returns:
+        True if the plot was written, False if matplotlib is not installed
+    """
+    try:
+        import matplotlib
+        matplotlib.use("Agg")
+        import matplotlib.pyplot as plt
+    except ImportError:
+        logger.warning("matplotlib is not installed; skipping the plot (pip install matplotlib)")
+        return False
+    
+    fig, ax = plt.subplots(figsize=(7, 4))
+    ax.plot([result["concurrency"] for result in results],
+            [result["batches_per_second"] for result in results], marker="o")
+    ax.set_xscale("log", base=2)
+    ax.set_xlabel("Concurrency")
+    ax.set_ylabel("Batches per second")
+    ax.set_title("Throughput against concurrency")
+    ax.grid(True, alpha=0.3)
+    fig.tight_layout()
+    fig.savefig(output_file)
+    plt.close(fig)
+    return True
+
+
+def main(argv=None):
+    """Command line interface for the mock API."""
+    # Configure logging
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    )
+    
+    parser = argparse.ArgumentParser(
+        description="Serve a local mock of the ElevenLabs batch calling API",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+    python mock_api.py serve --port 8800 --batches 5000 --recipients 200
+    python mock_api.py serve --latency lognormal:0.08,0.5 --error-rate 0.02 --throttle-rate 0.05
+    ELEVENLABS_API_BASE=http://127.0.0.1:8800/v1/convai/batch-calling python batch_processor.py batch_list.csv out.csv
+    python mock_api.py sweep --batches 500 --latency 0.05 --concurrency 1,2,4,8,16,32,64 --plot sweep.png
+    python mock_api.py sweep --engine async --concurrency 16,64,256,1024 --max-rps 2000
+    python mock_api.py sweep --batches 200 --concurrency 8 --profile sweep.prof
+        """
+    )
+    
+    data_options = argparse.ArgumentParser(add_help=False)
+    data_options.add_argument("--batches", type=int, default=1000,
+                              help="Batches in the workspace listing (default: 1000)")
+    data_options.add_argument("--recipients", type=int, default=100,
+                              help="Recipients per batch, which sets the payload size (default: 100)")
+    data_options.add_argument("--page-size", type=int, default=100,
+                              help="Largest page of the workspace listing (default: 100)")
+    data_options.add_argument("--latency", default="0",
+                              help="Response latency: seconds, uniform:<low>,<high>, normal:<mean>,<stddev>, "
+                                   "lognormal:<median>,<sigma> or exp:<mean> (default: 0)")
+    data_options.add_argument("--error-rate", type=float, default=0.0,
+                              help="Fraction of requests answered with 500/502/503 (default: 0)")
+    data_options.add_argument("--throttle-rate", type=float, default=0.0,
+                              help="Fraction of requests answered with 429 (default: 0)")
+    data_options.add_argument("--retry-after", default="1",
+                              help="Retry-After header of 429 responses; 'none' to omit (default: 1)")
+    data_options.add_argument("--max-rps", type=float,
+                              help="Requests per second accepted before answering 429")
+    data_options.add_argument("--seed", type=int, default=0, help="Random seed (default: 0)")
+    data_options.add_argument("--profile", type=Path,
+                              help="Profile the run: write a cProfile file here and a report of hot spots "
+                                   "and allocations per stage to <file>.txt (slows the run down)")
+    
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    
+    serve_parser = subparsers.add_parser("serve", parents=[data_options], help="Run the mock API")
+    serve_parser.add_argument("--host", default="127.0.0.1", help="Interface to listen on (default: 127.0.0.1)")
+    serve_parser.add_argument("--port", type=int, default=8800, help="Port to listen on (default: 8800)")
+    serve_parser.add_argument("--api-key", help="Require this xi-api-key; any key is accepted by default")
+    
+    sweep_parser = subparsers.add_parser("sweep", parents=[data_options],
+                                         help="Measure processor throughput at several concurrency levels")
+    sweep_parser.add_argument("--concurrency", default="1,2,4,8,16,32",
+                              help="Comma-separated concurrency levels (default: 1,2,4,8,16,32)")
+    sweep_parser.add_argument("--engine", choices=["threads", "async"], default="threads",
+                              help="batch_processor.py threads or async_batch_processor.py (default: threads)")
+    sweep_parser.add_argument("--output", type=Path, help="CSV file for the results")
+    sweep_parser.add_argument("--plot", type=Path, help="Image file for a throughput plot (needs matplotlib)")
+    
+    args = parser.parse_args(argv)
+    
+    profiler = None
+    if args.profile:
+        # Imported only when asked for, as it slows down startup
+        from profiling import Profiler
+        profiler = Profiler(args.profile).start()
+    try:
+        api = MockApi(
+            batches=args.batches,
+            recipients=args.recipients,
+            max_page_size=args.page_size,
+            latency=args.latency,
+            error_rate=args.error_rate,
+            throttle_rate=args.throttle_rate,
+            retry_after=None if args.retry_after.lower() == "none" else args.retry_after,
+            max_rps=args.max_rps,
+            api_key=getattr(args, "api_key", None),
+            seed=args.seed
+        )
+        
+        if args.command == "serve":
+            server = MockApiServer(api, host=args.host, port=args.port)
+            logger.info(f"Serving mock API at {server.url} (set ELEVENLABS_API_BASE to this URL)")
+            try:
+                server.serve_forever()
+            except KeyboardInterrupt:
+                pass
+            finally:
+                server.server_close()
+            logger.info(f"Served {api.requests} requests ({api.bytes_sent / 1e6:.1f} MB): "
+                        f"{dict(sorted(api.statuses.items()))}")
+            return 0
+        
+        levels = [int(level) for level in args.concurrency.split(",")]
+        results = run_sweep(api, levels, engine=args.engine)
+        print(format_sweep(results))
+        if args.output:
+            with open(args.output, 'w', newline='', encoding='utf-8') as f:
+                writer = csv.DictWriter(f, fieldnames=list(results[0]))
+                writer.writeheader()
+                writer.writerows(results)
+            logger.info(f"Saved sweep results to {args.output}")
+        if args.plot and plot_sweep(results, args.plot):
+            logger.info(f"Saved throughput plot to {args.plot}")
+    except Exception as e:
+        logger.error(f"Error running mock API: {e}")
+        return 1
+    finally:
+        if profiler is not None:
+            profiler.stop()
+            logger.info(profiler.summary())
+    
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
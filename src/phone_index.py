@@ -0,0 +1,275 @@
+"""
+Phone number lookup index for ElevenLabs batch calling data.
+
+This module keeps an on-disk SQLite index from phone number to every
+batch, recipient and conversation the number appeared in, so the question
+"where did this number show up?" no longer requires scanning every batch.
+"""
+
+import csv
+import logging
+import argparse
+import re
+import sqlite3
+import sys
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+from compression import open_file
+
+logger = logging.getLogger(__name__)
+
+# Characters dropped from phone numbers before indexing and lookup
+_PHONE_NOISE = re.compile(r"[\s().-]")
+
+# Columns stored for every (phone_number, recipient_id) entry
+INDEX_COLUMNS = ["phone_number", "recipient_id", "batch_id", "conversation_id",
+                 "recipient_status", "updated_at"]
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS phone_index (
+    phone_number TEXT NOT NULL,
+    recipient_id TEXT NOT NULL,
+    batch_id TEXT,
+    conversation_id TEXT,
+    recipient_status TEXT,
+    updated_at INTEGER,
+    PRIMARY KEY (phone_number, recipient_id)
+) WITHOUT ROWID;
+"""
+
+# Keep the most recently updated version of an entry
+_UPSERT = (
+    "INSERT INTO phone_index (phone_number, recipient_id, batch_id, conversation_id, "
+    "recipient_status, updated_at) VALUES (?, ?, ?, ?, ?, ?) "
+    "ON CONFLICT(phone_number, recipient_id) DO UPDATE SET "
+    "batch_id = excluded.batch_id, conversation_id = excluded.conversation_id, "
+    "recipient_status = excluded.recipient_status, updated_at = excluded.updated_at "
+    "WHERE excluded.updated_at IS NULL OR phone_index.updated_at IS NULL "
+    "OR excluded.updated_at >= phone_index.updated_at"
+)
+
+
+def normalize_phone(phone_number: str) -> str:
+    """
+    Normalize a phone number for indexing and lookup.
+    
+    Args:
+        phone_number: Phone number as written in the batch
+    
+    Returns:
+        Phone number without spaces, dashes, dots or parentheses
+    """
+    return _PHONE_NOISE.sub("", str(phone_number)) if phone_number else ""
+
+
+def _updated_at(value) -> Optional[int]:
+    """Read an update timestamp, or None if it is missing or not an integer."""
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+class PhoneIndex:
+    """
+    Index recipient rows by phone number.
+    
+    The index is a clustered SQLite table keyed by (phone_number,
+    recipient_id), so a lookup is a single B-tree range scan. Adding the same
+    recipient again updates its entry, which makes incremental updates from
+    repeated or resumed runs safe. The index has the same write_rows
+    interface as the output sinks.
+    """
+    
+    def __init__(self, index_file: Path, transaction_rows: int = 50000):
+        """
+        Initialize the phone index.
+        
+        Args:
+            index_file: SQLite file holding the index, created if missing
+            transaction_rows: Rows inserted per transaction
+        """
+        self.index_file = Path(index_file)
+        self.transaction_rows = transaction_rows
+        self.rows_written = 0
+        self._conn = None
+        self._pending = 0
+    
+    def open(self) -> "PhoneIndex":
+        """
+        Open the index and create it if needed.
+        
+        Returns:
+            The index itself
+        """
+        try:
+            self._conn = sqlite3.connect(str(self.index_file))
+            self._conn.execute("PRAGMA journal_mode = WAL")
+            self._conn.execute("PRAGMA synchronous = NORMAL")
+            self._conn.executescript(_SCHEMA)
+        except sqlite3.Error as e:
+            logger.error(f"Error opening phone index {self.index_file}: {e}")
+            raise
+        return self
+    
+    def write_rows(self, rows: Iterable[Dict]) -> int:
+        """
+        Add recipient rows to the index.
+        
+        Rows without a phone number or recipient ID are skipped.
+        
+        Args:
+            rows: Recipient rows as produced by extract_recipients
+        
+        Returns:
+            Number of rows indexed
+        """
+        entries = []
+        count = 0
+        for row in rows:
+            phone_number = normalize_phone(row.get("phone_number"))
+            if not phone_number or not row.get("recipient_id"):
+                continue
+            updated_at = row.get("recipient_updated_at_unix")
+            entries.append((
+                phone_number,
+                row["recipient_id"],
+                row.get("batch_id"),
+                row.get("conversation_id"),
+                row.get("recipient_status"),
+                _updated_at(updated_at)
+            ))
+            if len(entries) >= self.transaction_rows:
+                count += self._insert(entries)
+                entries = []
+        
+        count += self._insert(entries)
+        self.rows_written += count
+        return count
+    
+    def lookup(self, phone_number: str) -> List[Dict]:
+        """
+        Find every recipient entry for a phone number.
+        
+        Args:
+            phone_number: Phone number to look up
+        
+        Returns:
+            Index entries, most recently updated first
+        """
+        cursor = self._conn.execute(
+            f"SELECT {', '.join(INDEX_COLUMNS)} FROM phone_index WHERE phone_number = ? "
+            "ORDER BY updated_at DESC",
+            (normalize_phone(phone_number),)
+        )
+        return [dict(zip(INDEX_COLUMNS, entry)) for entry in cursor]
+    
+    def commit(self) -> None:
+        """Commit pending entries."""
+        if self._pending:
+            self._conn.commit()
+            self._pending = 0
+    
+    def close(self) -> None:
+        """Commit pending entries and close the index."""
+        if self._conn is not None:
+            self.commit()
+            self._conn.close()
+            self._conn = None
+    
+    def _insert(self, entries: List[tuple]) -> int:
+        """Upsert entries, committing once transaction_rows are pending."""
+        self._conn.executemany(_UPSERT, entries)
+        self._pending += len(entries)
+        if self._pending >= self.transaction_rows:
+            self.commit()
+        return len(entries)
+    
+    def __enter__(self) -> "PhoneIndex":
+        return self.open()
+    
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+
+
+def main(argv=None):
+    """Command line interface for the phone number index."""
+    # Configure logging
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    )
+    
+    parser = argparse.ArgumentParser(
+        description="Build and query the phone number lookup index",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+    python phone_index.py build phones.idx recipients.csv
+    python phone_index.py build phones.idx archive/*.csv.gz
+    python phone_index.py lookup phones.idx +6281234567890
+    python phone_index.py build --profile build.prof phones.idx recipients.csv
+    python batch_processor.py --phone-index phones.idx batch_list.csv recipients.csv
+        """
+    )
+    
+    common_options = argparse.ArgumentParser(add_help=False)
+    common_options.add_argument("--profile", type=Path,
+                                help="Profile the run: write a cProfile file here and a report of hot spots "
+                                     "and allocations to <file>.txt (slows the run down)")
+    
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    
+    build_parser = subparsers.add_parser("build", parents=[common_options],
+                                         help="Add recipients CSV files to the index")
+    build_parser.add_argument("index", type=Path, help="Index file to create or update")
+    build_parser.add_argument("recipients_csv", type=Path, nargs="+",
+                              help="Recipients CSV files written by the batch tools; .gz and .zst are decompressed")
+    
+    lookup_parser = subparsers.add_parser("lookup", parents=[common_options],
+                                          help="Show where phone numbers appeared")
+    lookup_parser.add_argument("index", type=Path, help="Index file to query")
+    lookup_parser.add_argument("phone_numbers", nargs="+", help="Phone numbers to look up")
+    
+    args = parser.parse_args(argv)
+    
+    profiler = None
+    if args.profile:
+        # Imported only when asked for, as it slows down startup
+        from profiling import Profiler
+        profiler = Profiler(args.profile).start()
+    try:
+        if args.command == "build":
+            with PhoneIndex(args.index) as index:
+                for recipients_csv in args.recipients_csv:
+                    with open_file(recipients_csv, newline='') as f:
+                        count = index.write_rows(csv.DictReader(f))
+                    logger.info(f"Indexed {count} recipients from {recipients_csv}")
+            return 0
+        
+        if not args.index.exists():
+            logger.error(f"Phone index {args.index} not found")
+            return 1
+        
+        with PhoneIndex(args.index) as index:
+            writer = csv.DictWriter(sys.stdout, fieldnames=INDEX_COLUMNS)
+            writer.writeheader()
+            for phone_number in args.phone_numbers:
+                entries = index.lookup(phone_number)
+                if not entries:
+                    logger.warning(f"No recipients found for {phone_number}")
+                writer.writerows(entries)
+    except Exception as e:
+        logger.error(f"Error using phone index: {e}")
+        return 1
+    finally:
+        if profiler is not None:
+            profiler.stop()
+            logger.info(profiler.summary())
+    
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
@@ -0,0 +1,245 @@
+"""
+Profiling mode for ElevenLabs batch calling tools.
+
+With --profile a tool runs under cProfile, including its worker threads,
+while tracemalloc traces allocations. Allocations are attributed to the
+pipeline stages the run metrics already time: http (fetching), parse
+(JSON decoding), build (building recipient rows) and write (writing
+rows). The CPU profile is saved in pstats format, for pstats, snakeviz
+or gprof2dot, next to a text report with the top functions and the top
+allocation sites of every stage.
+
+Tracing allocations slows a run down several times, so absolute timings
+of a profiled run are not comparable with normal runs.
+"""
+
+import cProfile
+import io
+import logging
+import pstats
+import sys
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Functions and allocation sites listed per table
+PROFILE_TOP = 15
+
+# Frames kept per traced allocation; one frame groups allocations by line
+TRACEBACK_FRAMES = 1
+
+# Allocations of the tracing machinery itself
+IGNORED_ALLOCATIONS = (
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, __file__),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    tracemalloc.Filter(False, "<unknown>")
+)
+
+# Idle worker threads waiting for work, left out of the top functions
+IDLE_FUNCTIONS = {
+    "<method 'get' of '_queue.SimpleQueue' objects>",
+    "<method 'acquire' of '_thread.lock' objects>"
+}
+
+
+class StageProfile:
+    """Allocations of one pipeline stage."""
+    
+    def __init__(self):
+        self.calls = 0
+        self.net_bytes = 0
+        self.max_net_bytes = 0
+        self.top: List[tracemalloc.StatisticDiff] = []
+        self.snapshots: Optional[Tuple[tracemalloc.Snapshot, tracemalloc.Snapshot]] = None
+
+
+class Profiler:
+    """
+    CPU and allocation profiler for one run.
+    
+    Every stage gets a tracemalloc snapshot diff of its first call, which
+    shows where it allocates, and a running total of the memory it leaves
+    allocated. With concurrent workers stages overlap, so these figures
+    include some allocations of other stages.
+    """
+    
+    def __init__(self, output_file: Path, top: int = PROFILE_TOP):
+        """
+        Initialize the profiler.
+        
+        Args:
+            output_file: File receiving the pstats profile; the text report
+                is written next to it with a .txt suffix added
+            top: Number of functions and allocation sites listed
+        """
+        self.output_file = Path(output_file)
+        self.report_file = self.output_file.with_name(self.output_file.name + ".txt")
+        self.top = top
+        self.stages: Dict[str, StageProfile] = {}
+        self.peak_traced_bytes = 0
+        self._profile = cProfile.Profile()
+        self._thread_profiles: List[Tuple[threading.Thread, cProfile.Profile]] = []
+        self._lock = threading.Lock()
+        self._started = None
+        self._elapsed = 0.0
+        self._stats: Optional[pstats.Stats] = None
+    
+    def start(self) -> "Profiler":
+        """
+        Start profiling this thread and every thread started from now on.
+        
+        Returns:
+            The profiler
+        """
+        tracemalloc.start(TRACEBACK_FRAMES)
+        threading.setprofile(self._profile_thread)
+        self._started = time.perf_counter()
+        self._profile.enable()
+        return self
+    
+    def _profile_thread(self, frame, event, arg) -> None:
+        """Start a profile in a new thread on its first profiling event."""
+        profile = cProfile.Profile()
+        try:
+            profile.enable()
+        except ValueError:
+            # Python 3.12+ profiles all threads from the one enabled profile
+            sys.setprofile(None)
+            return
+        with self._lock:
+            self._thread_profiles.append((threading.current_thread(), profile))
+    
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        """
+        Attribute the allocations of a block of code to a stage.
+        
+        Args:
+            name: Stage name, e.g. "parse" or "write"
+        """
+        with self._lock:
+            stage = self.stages.get(name)
+            first = stage is None
+            if first:
+                stage = self.stages[name] = StageProfile()
+        
+        before = tracemalloc.take_snapshot() if first else None
+        size_before = tracemalloc.get_traced_memory()[0]
+        try:
+            yield
+        finally:
+            net = tracemalloc.get_traced_memory()[0] - size_before
+            if first:
+                # Compared after the run, as comparing is slow under the profiler
+                stage.snapshots = (before, tracemalloc.take_snapshot())
+            with self._lock:
+                stage.calls += 1
+                stage.net_bytes += net
+                stage.max_net_bytes = max(stage.max_net_bytes, net)
+    
+    def stop(self) -> None:
+        """Stop profiling and write the profile and the report."""
+        self._profile.disable()
+        threading.setprofile(None)
+        self._elapsed = time.perf_counter() - self._started
+        self.peak_traced_bytes = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        
+        stats = pstats.Stats(self._profile)
+        with self._lock:
+            thread_profiles = list(self._thread_profiles)
+        for thread, profile in thread_profiles:
+            # A thread still running could change its profile while it is read
+            if not thread.is_alive():
+                stats.add(profile)
+        self._stats = stats
+        
+        for stage in self.stages.values():
+            if stage.snapshots is not None:
+                before, after = (snapshot.filter_traces(IGNORED_ALLOCATIONS) for snapshot in stage.snapshots)
+                stage.top = after.compare_to(before, "lineno")[:self.top]
+                stage.snapshots = None
+        
+        stats.dump_stats(str(self.output_file))
+        with open(self.report_file, 'w', encoding='utf-8') as f:
+            f.write(self.report())
+        logger.info(f"Profile written to {self.output_file}, report to {self.report_file}")
+    
+    def top_functions(self, sort: str = "tottime") -> List[Tuple[str, float, float]]:
+        """
+        Get the functions the run spent most time in.
+        
+        Args:
+            sort: "tottime" for time in the function itself, "cumtime" for
+                time including the functions it called
+        
+        Returns:
+            Tuples of (function, own seconds, cumulative seconds), leaving
+            out idle worker threads waiting for work
+        """
+        entries = []
+        for (filename, line, name), (_, _, own, cumulative, _) in self._stats.stats.items():
+            if name in IDLE_FUNCTIONS:
+                continue
+            location = f"{Path(filename).name}:{line}({name})" if line else name
+            entries.append((location, own, cumulative))
+        index = 1 if sort == "tottime" else 2
+        entries.sort(key=lambda entry: -entry[index])
+        return entries[:self.top]
+    
+    def report(self) -> str:
+        """
+        Render the text report.
+        
+        Returns:
+            Top functions by own and cumulative time, then the allocations
+            of every stage
+        """
+        out = io.StringIO()
+        out.write(f"Profiled {self._elapsed:.2f}s; peak traced memory "
+                  f"{self.peak_traced_bytes / 1e6:.1f} MB\n\n")
+        
+        for sort, title in (("tottime", "own time"), ("cumtime", "cumulative time")):
+            out.write(f"Top {self.top} functions by {title}\n")
+            out.write(f"{'own s':>10}{'cum s':>10}  function\n")
+            for location, own, cumulative in self.top_functions(sort):
+                out.write(f"{own:>10.3f}{cumulative:>10.3f}  {location}\n")
+            out.write("\n")
+        
+        out.write("Allocations per stage (net MB left allocated; sites from the first call)\n")
+        for name, stage in sorted(self.stages.items()):
+            out.write(f"\n{name}: {stage.calls} calls, net {stage.net_bytes / 1e6:+.1f} MB, "
+                      f"largest single call {stage.max_net_bytes / 1e6:+.2f} MB\n")
+            for diff in stage.top:
+                frame = diff.traceback[0]
+                out.write(f"    {diff.size_diff / 1e3:>+12.1f} KB {diff.count_diff:>+9} blocks  "
+                          f"{Path(frame.filename).name}:{frame.lineno}\n")
+        
+        out.write("\n")
+        self._stats.stream = out
+        self._stats.sort_stats("cumulative").print_stats(self.top * 2)
+        return out.getvalue()
+    
+    def summary(self, functions: int = 5) -> str:
+        """
+        Summarize the hot spots in a few lines for the log.
+        
+        Args:
+            functions: Number of functions listed
+        
+        Returns:
+            Functions with the most own time and the stages allocating most
+        """
+        lines = [f"Profile: {self._elapsed:.1f}s, peak traced memory {self.peak_traced_bytes / 1e6:.1f} MB"]
+        for location, own, cumulative in self.top_functions()[:functions]:
+            lines.append(f"  {own:8.3f}s own {cumulative:8.3f}s cum  {location}")
+        for name, stage in sorted(self.stages.items(), key=lambda item: -item[1].max_net_bytes):
+            lines.append(f"  stage {name}: {stage.calls} calls, "
+                         f"up to {stage.max_net_bytes / 1e6:.2f} MB per call")
+        return "\n".join(lines)
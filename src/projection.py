@@ -0,0 +1,234 @@
+"""
+Recipient row projection for ElevenLabs batch calling data.
+
+This module turns batch JSON into recipient rows from a single declarative
+column spec. The spec is compiled once into plain Python functions, so rows
+are built without per-field lookups in the spec.
+
+A column is written as a standard column name (see DEFAULT_COLUMNS), a path,
+or name=path:
+    
+    batch.<key>[.<key>...]       field of the batch object
+    recipient.<key>[.<key>...]   field of the recipient object
+    var.<key>                    dynamic variable of the recipient
+
+Numeric path segments index into lists. Missing fields are empty.
+"""
+
+from typing import Callable, Dict, Generator, Optional, Sequence, Tuple
+
+from records import BatchHeader, RecipientRecord, record_type
+
+# Standard columns of the recipients CSV and where they come from
+DEFAULT_COLUMNS = (
+    ("batch_id", "batch.id"),
+    ("batch_name", "batch.name"),
+    ("agent_id", "batch.agent_id"),
+    ("agent_name", "batch.agent_name"),
+    ("created_at_unix", "batch.created_at_unix"),
+    ("scheduled_time_unix", "batch.scheduled_time_unix"),
+    ("total_calls_dispatched", "batch.total_calls_dispatched"),
+    ("total_calls_scheduled", "batch.total_calls_scheduled"),
+    ("last_updated_at_unix", "batch.last_updated_at_unix"),
+    ("status", "batch.status"),
+    ("recipient_id", "recipient.id"),
+    ("phone_number", "recipient.phone_number"),
+    ("recipient_status", "recipient.status"),
+    ("recipient_created_at_unix", "recipient.created_at_unix"),
+    ("recipient_updated_at_unix", "recipient.updated_at_unix"),
+    ("conversation_id", "recipient.conversation_id"),
+    ("city", "var.city")
+)
+
+# Where var.<key> columns are read from in a recipient object
+DYNAMIC_VARIABLES_PATH = ("conversation_initiation_client_data", "dynamic_variables")
+
+_STANDARD_PATHS = dict(DEFAULT_COLUMNS)
+
+
+class Column:
+    """One output column and the path its value is read from."""
+    
+    __slots__ = ("name", "scope", "path", "default")
+    
+    def __init__(self, name: str, scope: str, path: Tuple, default=None):
+        """
+        Initialize the column.
+        
+        Args:
+            name: Output column name
+            scope: "batch" or "recipient"
+            path: Keys leading to the value within the scope object
+            default: Value used when the path is missing
+        """
+        self.name = name
+        self.scope = scope
+        self.path = path
+        self.default = default
+    
+    @classmethod
+    def parse(cls, token: str) -> "Column":
+        """
+        Parse a column from its spec.
+        
+        Args:
+            token: Standard column name, path, or name=path
+        
+        Returns:
+            Parsed column
+        
+        Raises:
+            ValueError: If the spec is not a known column or valid path
+        """
+        token = token.strip()
+        name, _, source = token.rpartition("=")
+        if not name and token in _STANDARD_PATHS:
+            name, source = token, _STANDARD_PATHS[token]
+        
+        scope, _, rest = source.partition(".")
+        keys = tuple(int(key) if key.isdigit() else key for key in rest.split(".")) if rest else ()
+        if scope not in ("batch", "recipient", "var") or not keys or "" in keys:
+            raise ValueError(
+                f"Unknown column {token!r}; use a standard column name or a "
+                f"batch., recipient. or var. path"
+            )
+        
+        if not name:
+            name = source.rsplit(".", 1)[-1]
+        if scope == "var":
+            return cls(name, "recipient", DYNAMIC_VARIABLES_PATH + keys, "")
+        return cls(name, scope, keys)
+
+
+def _compile_extractor(columns: Sequence[Column]) -> Callable[[Dict], Tuple]:
+    """
+    Compile columns into a function returning their values as a tuple.
+    
+    Args:
+        columns: Columns read from the same object
+    
+    Returns:
+        Function taking the batch or recipient object
+    """
+    lines = ["def extract(data):"]
+    for index, column in enumerate(columns):
+        if len(column.path) == 1 and isinstance(column.path[0], str):
+            lines.append(f"    v{index} = data.get({column.path[0]!r}, {column.default!r})")
+        else:
+            access = "".join(f"[{key!r}]" for key in column.path)
+            lines.extend([
+                "    try:",
+                f"        v{index} = data{access}",
+                "    except (KeyError, IndexError, TypeError):",
+                f"        v{index} = {column.default!r}"
+            ])
+    values = "".join(f"v{index}, " for index in range(len(columns)))
+    lines.append(f"    return ({values})")
+    
+    namespace = {}
+    exec(compile("\n".join(lines), "<projection>", "exec"), namespace)
+    return namespace["extract"]
+
+
+class Projection:
+    """
+    Map batch data to recipient records according to a column spec.
+    
+    Batch columns are evaluated once per batch into a shared BatchHeader;
+    recipient columns once per recipient.
+    """
+    
+    def __init__(self, columns: Optional[Sequence[str]] = None):
+        """
+        Initialize the projection.
+        
+        Args:
+            columns: Column specs in output order; the standard columns when omitted
+        
+        Raises:
+            ValueError: If a column spec is invalid or a name is repeated
+        """
+        self.columns = list(columns) if columns else [name for name, _ in DEFAULT_COLUMNS]
+        parsed = [Column.parse(token) for token in self.columns]
+        
+        self.fieldnames = [column.name for column in parsed]
+        duplicates = {name for name in self.fieldnames if self.fieldnames.count(name) > 1}
+        if duplicates:
+            raise ValueError(f"Duplicate column names: {', '.join(sorted(duplicates))}")
+        
+        batch_columns = [column for column in parsed if column.scope == "batch"]
+        recipient_columns = [column for column in parsed if column.scope == "recipient"]
+        # Top-level batch keys that must be known before rows can be built
+        self.batch_keys = tuple(dict.fromkeys(column.path[0] for column in batch_columns))
+        self.record_type = record_type(
+            self.fieldnames,
+            [column.name for column in batch_columns],
+            [column.name for column in recipient_columns]
+        )
+        self._extract_batch = _compile_extractor(batch_columns)
+        self._extract_recipient = _compile_extractor(recipient_columns)
+    
+    @classmethod
+    def parse(cls, spec: Optional[str]) -> "Projection":
+        """
+        Build a projection from a comma-separated column spec.
+        
+        Args:
+            spec: Comma-separated column specs, e.g. from --columns
+        
+        Returns:
+            Projection with those columns, or the standard columns if spec is empty
+        """
+        if not spec:
+            # Projections are immutable, so the standard one is shared
+            return DEFAULT_PROJECTION if cls is Projection else cls()
+        return cls([token for token in spec.split(",") if token.strip()])
+    
+    def header(self, batch_data: Dict) -> BatchHeader:
+        """
+        Evaluate the batch columns for a batch.
+        
+        Args:
+            batch_data: Batch data dictionary
+        
+        Returns:
+            Header shared by the batch's records
+        """
+        return BatchHeader(self._extract_batch(batch_data))
+    
+    def record(self, header: BatchHeader, recipient: Dict) -> RecipientRecord:
+        """
+        Build the record for one recipient.
+        
+        Args:
+            header: Header of the recipient's batch
+            recipient: Recipient data dictionary
+        
+        Returns:
+            Recipient record
+        """
+        return self.record_type(header, self._extract_recipient(recipient))
+    
+    def iter_records(self, batch_data: Dict) -> Generator[RecipientRecord, None, None]:
+        """
+        Build the records for all recipients of a batch.
+        
+        Args:
+            batch_data: Batch data dictionary
+        
+        Yields:
+            Recipient records sharing one batch header
+        """
+        header = self.header(batch_data)
+        make_record = self.record_type
+        extract = self._extract_recipient
+        for recipient in batch_data.get("recipients", []):
+            yield make_record(header, extract(recipient))
+    
+    def __reduce__(self):
+        # The compiled extractors cannot be pickled; rebuild them from the spec
+        return (type(self), (self.columns,))
+
+
+# Projection with the standard columns
+DEFAULT_PROJECTION = Projection()
@@ -0,0 +1,215 @@
+"""
+Rate limiting for ElevenLabs API requests.
+
+This module provides a thread-safe token bucket shared by all API fetchers.
+"""
+
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Optional
+
+# Default request rate, matching the historical 0.2 second delay between calls
+DEFAULT_RATE = 5.0
+
+# Pause applied after a 429 response without a Retry-After header
+DEFAULT_THROTTLE_PAUSE = 1.0
+
+
+class RateLimiter:
+    """Token bucket rate limiter that can be shared across threads."""
+    
+    def __init__(self, rate: Optional[float] = DEFAULT_RATE, burst: int = 1):
+        """
+        Initialize the rate limiter.
+        
+        Args:
+            rate: Sustained requests per second, or None/0 for no limit
+            burst: Maximum number of requests allowed back to back
+        """
+        self.rate = rate if rate and rate > 0 else None
+        self.burst = max(1, burst)
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+    
+    @classmethod
+    def from_delay(cls, delay: float, burst: int = 1) -> "RateLimiter":
+        """
+        Create a rate limiter from a delay between requests.
+        
+        Args:
+            delay: Seconds between requests, or 0 for no limit
+            burst: Maximum number of requests allowed back to back
+        
+        Returns:
+            RateLimiter instance
+        """
+        return cls(1.0 / delay if delay > 0 else None, burst)
+    
+    def reserve(self, tokens: float = 1) -> float:
+        """
+        Take tokens from the bucket without blocking.
+        
+        The tokens are always granted; callers must wait for the returned
+        delay before sending the request. Later callers queue up behind it.
+        
+        Args:
+            tokens: Number of tokens to take
+        
+        Returns:
+            Seconds to wait before the request may be sent
+        """
+        with self._lock:
+            now = time.monotonic()
+            if self.rate is None:
+                return max(0.0, self._paused_until - now)
+            
+            # While paused, _updated lies in the future and no tokens accrue
+            if now > self._updated:
+                self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+            self._tokens -= tokens
+            
+            wait = self._updated - now
+            if self._tokens < 0:
+                wait += -self._tokens / self.rate
+            return max(0.0, wait)
+    
+    def acquire(self, tokens: float = 1) -> float:
+        """
+        Block until tokens are available.
+        
+        Args:
+            tokens: Number of tokens to take
+        
+        Returns:
+            Seconds spent waiting
+        """
+        wait = self.reserve(tokens)
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+    
+    def pause(self, seconds: float) -> None:
+        """
+        Hold back all requests for a while.
+        
+        Requests reserved during the pause are spaced out at the normal rate
+        after it ends instead of being released all at once.
+        
+        Args:
+            seconds: Seconds from now before the next request may be sent
+        """
+        with self._lock:
+            now = time.monotonic()
+            resume_at = now + seconds
+            self._paused_until = max(self._paused_until, resume_at)
+            if self.rate is None or resume_at <= self._updated:
+                return
+            
+            if now > self._updated:
+                self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._tokens = min(self._tokens, 0.0)
+            self._updated = resume_at
+    
+    def on_success(self) -> None:
+        """Report a request that was not rate limited by the API."""
+    
+    def on_throttled(self, retry_after: Optional[float] = None) -> None:
+        """
+        Report a 429 response from the API.
+        
+        Args:
+            retry_after: Seconds the API asked to wait, if it said so
+        """
+        self.pause(retry_after if retry_after is not None else DEFAULT_THROTTLE_PAUSE)
+
+
+class AdaptiveRateLimiter(RateLimiter):
+    """
+    Rate limiter that finds the API quota with AIMD.
+    
+    The rate is cut multiplicatively when the API answers 429 and grows
+    additively, by roughly `increase` requests per second for every second
+    of healthy traffic, up to max_rate. Requests already in flight when the
+    quota is hit tend to be throttled together, so the rate is cut at most
+    once per congestion window of 1/rate seconds after the previous cut.
+    """
+    
+    def __init__(self, rate: float = DEFAULT_RATE, burst: int = 1, max_rate: Optional[float] = None,
+                 min_rate: float = 0.2, increase: float = 0.5, decrease: float = 0.5):
+        """
+        Initialize the adaptive rate limiter.
+        
+        Args:
+            rate: Starting requests per second
+            burst: Maximum number of requests allowed back to back
+            max_rate: Highest rate to ramp up to (default: the starting rate)
+            min_rate: Lowest rate to back off to
+            increase: Requests per second added per second without 429s
+            decrease: Factor applied to the rate on each 429
+        """
+        super().__init__(rate, burst)
+        if self.rate is None:
+            raise ValueError("AdaptiveRateLimiter requires a starting rate")
+        self.max_rate = max(max_rate or self.rate, self.rate)
+        self.min_rate = min(min_rate, self.rate)
+        self.increase = increase
+        self.decrease = decrease
+        self.throttled = 0
+        self._decreased_at = None
+    
+    def on_success(self) -> None:
+        """Ramp the rate up after a healthy request."""
+        with self._lock:
+            self.rate = min(self.max_rate, self.rate + self.increase / self.rate)
+    
+    def on_throttled(self, retry_after: Optional[float] = None) -> None:
+        """
+        Back off after a 429 response.
+        
+        Further 429s within one congestion window of the last cut only pause
+        requests, as they answer requests sent before the rate was cut.
+        
+        Args:
+            retry_after: Seconds the API asked to wait, if it said so
+        """
+        with self._lock:
+            now = time.monotonic()
+            if self._decreased_at is None or now - self._decreased_at >= 1.0 / self.rate:
+                self.rate = max(self.min_rate, self.rate * self.decrease)
+                self._decreased_at = now
+            self.throttled += 1
+        super().on_throttled(retry_after)
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """
+    Parse a Retry-After header.
+    
+    Args:
+        value: Header value, either delay seconds or an HTTP date
+        
+    Returns:
+        Seconds to wait, or None if the header is missing or invalid
+    """
+    if not value:
+        return None
+    
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    
+    # HTTP dates are rare, and the email package is slow to import
+    from email.utils import parsedate_to_datetime
+    
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
@@ -0,0 +1,148 @@
+"""
+Compact recipient records for ElevenLabs batch calling data.
+
+A batch can hold hundreds of thousands of recipients that all share the same
+ten batch-level fields. Instead of copying those fields into a dictionary
+per recipient, each record keeps a reference to one shared BatchHeader and a
+tuple of its own values.
+"""
+
+from collections.abc import Mapping
+from typing import Any, Iterator, Sequence, Tuple
+
+# Batch-level fields of a recipient row
+BATCH_FIELDS = (
+    "batch_id",
+    "batch_name",
+    "agent_id",
+    "agent_name",
+    "created_at_unix",
+    "scheduled_time_unix",
+    "total_calls_dispatched",
+    "total_calls_scheduled",
+    "last_updated_at_unix",
+    "status"
+)
+
+# Recipient-level fields of a recipient row
+RECIPIENT_FIELDS = (
+    "recipient_id",
+    "phone_number",
+    "recipient_status",
+    "recipient_created_at_unix",
+    "recipient_updated_at_unix",
+    "conversation_id",
+    "city"
+)
+
+# All fields of a recipient row, in CSV column order
+FIELDNAMES = BATCH_FIELDS + RECIPIENT_FIELDS
+
+
+class BatchHeader:
+    """Batch-level values shared by every recipient record of a batch."""
+    
+    __slots__ = ("values",)
+    
+    def __init__(self, values: Tuple):
+        """
+        Initialize the batch header.
+        
+        Args:
+            values: Batch-level values in BATCH_FIELDS order
+        """
+        self.values = values
+    
+    @property
+    def batch_id(self) -> Any:
+        """ID of the batch."""
+        return self.values[0]
+
+
+class RecipientRecord(Mapping):
+    """
+    Read-only recipient row backed by a shared batch header.
+    
+    Records behave like the row dictionaries they replace (row["city"],
+    row.get(...), dict(row)), while as_tuple gives the values in CSV column
+    order for writing with a plain csv.writer. This class has the standard
+    columns; record_type creates variants for other column selections.
+    """
+    
+    __slots__ = ("batch", "values")
+    
+    fieldnames = list(FIELDNAMES)
+    # Position of each field in batch values followed by recipient values
+    _positions = {name: position for position, name in enumerate(FIELDNAMES)}
+    _batch_width = len(BATCH_FIELDS)
+    # Positions in fieldnames order, or None if that is the stored order
+    _order = None
+    
+    def __init__(self, batch: BatchHeader, values: Tuple):
+        """
+        Initialize the recipient record.
+        
+        Args:
+            batch: Shared header of the recipient's batch
+            values: Recipient-level values in RECIPIENT_FIELDS order
+        """
+        self.batch = batch
+        self.values = values
+    
+    def as_tuple(self) -> Tuple:
+        """
+        Get all values in CSV column order.
+        
+        Returns:
+            Values of all fields in fieldnames order
+        """
+        values = self.batch.values + self.values
+        if self._order is None:
+            return values
+        return tuple([values[position] for position in self._order])
+    
+    def __getitem__(self, key: str) -> Any:
+        position = self._positions[key]
+        if position < self._batch_width:
+            return self.batch.values[position]
+        return self.values[position - self._batch_width]
+    
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.fieldnames)
+    
+    def __len__(self) -> int:
+        return len(self.fieldnames)
+    
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({dict(self)!r})"
+
+
+def record_type(fieldnames: Sequence[str], batch_fields: Sequence[str],
+                recipient_fields: Sequence[str]) -> type:
+    """
+    Get the record class for a column layout.
+    
+    Args:
+        fieldnames: All fields in output column order
+        batch_fields: Fields stored in the batch header, in header order
+        recipient_fields: Fields stored per record, in record order
+    
+    Returns:
+        RecipientRecord for the standard layout, otherwise a subclass of it
+    """
+    stored = list(batch_fields) + list(recipient_fields)
+    if list(fieldnames) == list(FIELDNAMES) and stored == list(FIELDNAMES):
+        return RecipientRecord
+    
+    positions = {name: position for position, name in enumerate(stored)}
+    order = None
+    if list(fieldnames) != stored:
+        order = tuple(positions[name] for name in fieldnames)
+    
+    return type("RecipientRecord", (RecipientRecord,), {
+        "__slots__": (),
+        "fieldnames": list(fieldnames),
+        "_positions": positions,
+        "_batch_width": len(batch_fields),
+        "_order": order
+    })
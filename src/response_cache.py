@@ -0,0 +1,196 @@
+"""
+On-disk cache for ElevenLabs batch API responses.
+
+This module stores fetched batches keyed by batch ID so repeated exports
+only hit the API for batches that may still change. Entries are kept apart
+per API base URL and API key, so one account never reads another's batches.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import re
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Optional
+
+from config import Config, get_config
+
+logger = logging.getLogger(__name__)
+
+# Batch statuses that will never change again; these entries never expire
+FINAL_STATUSES = ("completed", "cancelled")
+
+# Batch IDs matching this pattern are used as file names directly
+_SAFE_ID = re.compile(r"[A-Za-z0-9_-]{1,128}")
+
+
+def _namespace(config: Config) -> str:
+    """
+    Get the cache subdirectory name for an API base URL and key.
+    
+    Args:
+        config: API configuration
+    
+    Returns:
+        Hex digest of the base URL and key; the key itself is never stored
+    """
+    account = f"{config.api_base}\n{config.api_key}".encode("utf-8")
+    return hashlib.sha256(account).hexdigest()[:32]
+
+
+class ResponseCache:
+    """Cache batch responses as JSON files with TTL and size-based eviction."""
+    
+    def __init__(self, cache_dir: Path, ttl: float = 3600, max_bytes: int = 1024 * 1024 * 1024,
+                 refresh: bool = False, config: Optional[Config] = None):
+        """
+        Initialize the response cache.
+        
+        Args:
+            cache_dir: Directory holding cached responses; each API base URL
+                and key gets its own subdirectory
+            ttl: Seconds before an entry for an active batch goes stale
+            max_bytes: Maximum total size of the cache; least recently used
+                entries are evicted beyond it
+            refresh: Ignore existing entries but still store new responses
+            config: API key and base URL the responses come from; the shared
+                configuration when omitted
+        """
+        config = config or get_config()
+        self.cache_dir = Path(cache_dir) / _namespace(config)
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.refresh = refresh
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self._size = sum(entry.stat().st_size for entry in self._entries())
+    
+    def get(self, batch_id: str) -> Optional[Dict]:
+        """
+        Get a cached batch response.
+        
+        Args:
+            batch_id: ID of the batch
+        
+        Returns:
+            Batch data, or None if missing, stale or refreshing
+        """
+        if self.refresh:
+            return None
+        
+        path = self._path(batch_id)
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                entry = json.load(f)
+        except FileNotFoundError:
+            self.misses += 1
+            return None
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable cache entry {path}: {e}")
+            self.misses += 1
+            return None
+        
+        if isinstance(entry, dict):
+            data, fetched_at = entry.get("data"), entry.get("fetched_at")
+        else:
+            data = fetched_at = None
+        if (not isinstance(data, dict) or isinstance(fetched_at, bool)
+                or not isinstance(fetched_at, (int, float))):
+            logger.warning(f"Ignoring unreadable cache entry {path}: unexpected format")
+            self.misses += 1
+            return None
+        if self._is_stale(fetched_at, data):
+            self.misses += 1
+            return None
+        
+        # Mark as recently used for eviction
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        self.hits += 1
+        return data
+    
+    def put(self, batch_id: str, data: Dict) -> None:
+        """
+        Store a batch response.
+        
+        Args:
+            batch_id: ID of the batch
+            data: Batch data returned by the API
+        """
+        path = self._path(batch_id)
+        entry = {"batch_id": batch_id, "fetched_at": time.time(), "data": data}
+        
+        try:
+            fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(entry, f, ensure_ascii=False)
+            new_size = os.path.getsize(tmp_path)
+            with self._lock:
+                old_size = path.stat().st_size if path.exists() else 0
+                os.replace(tmp_path, path)
+                self._size += new_size - old_size
+        except OSError as e:
+            logger.warning(f"Failed to cache batch {batch_id}: {e}")
+            return
+        
+        if self._size > self.max_bytes:
+            self._evict()
+    
+    def _is_stale(self, fetched_at: float, data: Dict) -> bool:
+        """
+        Check whether a cached entry must be fetched again.
+        
+        Args:
+            fetched_at: Unix time the entry was stored
+            data: Cached batch data
+        
+        Returns:
+            True if the entry is stale
+        """
+        if data.get("status") in FINAL_STATUSES:
+            return False
+        return time.time() - fetched_at > self.ttl
+    
+    def _evict(self) -> None:
+        """Remove least recently used entries until the cache fits max_bytes."""
+        with self._lock:
+            entries = sorted(self._entries(), key=lambda entry: entry.stat().st_mtime)
+            for entry in entries:
+                if self._size <= self.max_bytes:
+                    break
+                try:
+                    size = entry.stat().st_size
+                    os.remove(entry.path)
+                except OSError:
+                    continue
+                self._size -= size
+                logger.debug(f"Evicted cache entry {entry.name}")
+    
+    def _entries(self):
+        """List cache entry files."""
+        return [entry for entry in os.scandir(self.cache_dir)
+                if entry.is_file() and entry.name.endswith(".json")]
+    
+    def _path(self, batch_id: str) -> Path:
+        """
+        Get the cache file path for a batch ID.
+        
+        Args:
+            batch_id: ID of the batch
+        
+        Returns:
+            Path of the cache file
+        """
+        if _SAFE_ID.fullmatch(batch_id):
+            name = batch_id
+        else:
+            name = hashlib.sha256(batch_id.encode("utf-8")).hexdigest()
+        return self.cache_dir / f"{name}.json"
@@ -0,0 +1,293 @@
+"""
+Retry handling for ElevenLabs API requests.
+
+This module provides exponential backoff with jitter for transient
+failures, a circuit breaker that pauses all workers while the API is down,
+and a helper that sends a request through both plus the rate limiter.
+requests is imported on first use, so the asyncio engine, which shares the
+retry policy, starts without it.
+"""
+
+import logging
+import random
+import threading
+import time
+from contextlib import nullcontext
+from typing import TYPE_CHECKING, Dict, Optional
+
+from metrics import RunMetrics
+from rate_limiter import RateLimiter, parse_retry_after
+
+if TYPE_CHECKING:
+    import requests
+
+logger = logging.getLogger(__name__)
+
+# HTTP status codes that indicate a transient server-side problem
+RETRYABLE_STATUS_CODES = (500, 502, 503, 504)
+
+# Seconds between checks while another request probes a failing API
+PROBE_POLL_INTERVAL = 0.25
+
+
+class RetryStats:
+    """Thread-safe counters describing retry activity during a run."""
+    
+    def __init__(self):
+        """Initialize the counters."""
+        self.retries = 0
+        self.backoff_seconds = 0.0
+        self.requeues = 0
+        self._lock = threading.Lock()
+    
+    def add_retry(self, delay: float) -> None:
+        """Count a retry and the time spent backing off before it."""
+        with self._lock:
+            self.retries += 1
+            self.backoff_seconds += delay
+    
+    def add_requeue(self) -> None:
+        """Count a request queued again after a 429 response."""
+        with self._lock:
+            self.requeues += 1
+
+
+class RetryPolicy:
+    """Decide which failures to retry and how long to back off."""
+    
+    def __init__(self, max_retries: int = 3, base_delay: float = 0.5, max_delay: float = 30.0):
+        """
+        Initialize the retry policy.
+        
+        Args:
+            max_retries: Retries allowed per request after the first attempt
+            base_delay: Backoff ceiling for the first retry, doubled on each retry
+            max_delay: Upper bound for any single backoff
+        """
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.stats = RetryStats()
+    
+    def is_retryable(self, error: "requests.exceptions.RequestException") -> bool:
+        """
+        Check whether a failure is worth retrying.
+        
+        Connection errors, timeouts and 5xx responses are transient; other
+        errors such as 404 or malformed responses will not improve on retry.
+        
+        Args:
+            error: Exception raised by the request
+        
+        Returns:
+            True if the request should be retried
+        """
+        import requests
+        
+        if isinstance(error, (requests.exceptions.ConnectionError, requests.exceptions.Timeout)):
+            return True
+        if isinstance(error, requests.exceptions.HTTPError) and error.response is not None:
+            return error.response.status_code in RETRYABLE_STATUS_CODES
+        return False
+    
+    def backoff(self, retry: int) -> float:
+        """
+        Compute the delay before a retry using full jitter.
+        
+        Args:
+            retry: Retry number, starting at 1
+        
+        Returns:
+            Seconds to wait
+        """
+        ceiling = min(self.max_delay, self.base_delay * 2 ** (retry - 1))
+        return random.uniform(0, ceiling)
+    
+    def wait(self, retry: int) -> None:
+        """
+        Sleep before a retry and record it.
+        
+        Args:
+            retry: Retry number, starting at 1
+        """
+        delay = self.backoff(retry)
+        self.stats.add_retry(delay)
+        time.sleep(delay)
+
+
+class CircuitBreaker:
+    """
+    Stop sending requests while the API is failing.
+    
+    After failure_threshold consecutive transient failures the circuit opens
+    and every worker waits for reset_timeout. A single probe request is then
+    let through: success closes the circuit, failure opens it again.
+    """
+    
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        """
+        Initialize the circuit breaker.
+        
+        Args:
+            failure_threshold: Consecutive failures that open the circuit
+            reset_timeout: Seconds to wait before probing the API again
+        """
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.opened = 0
+        self._failures = 0
+        self._open_until = 0.0
+        self._probe_started: Optional[float] = None
+        self._cond = threading.Condition()
+    
+    def before_request(self) -> None:
+        """Block while the circuit is open or another worker is probing."""
+        with self._cond:
+            wait = self._wait_time()
+            while wait > 0:
+                self._cond.wait(wait)
+                wait = self._wait_time()
+    
+    def allow(self) -> float:
+        """
+        Check without blocking whether a request may be sent now.
+        
+        This is the asyncio counterpart of before_request: callers sleep
+        for the returned time and ask again.
+        
+        Returns:
+            0 if the request may be sent, otherwise seconds to wait
+        """
+        with self._cond:
+            return self._wait_time()
+    
+    def _wait_time(self) -> float:
+        """
+        Get the time until a request may be sent, claiming the probe if due.
+        
+        Must be called with the lock held.
+        
+        Returns:
+            0 if the request may be sent, otherwise seconds to wait
+        """
+        if self._failures < self.failure_threshold:
+            return 0.0
+        now = time.monotonic()
+        if now < self._open_until:
+            return self._open_until - now
+        if self._probe_started is None or now - self._probe_started > self.reset_timeout:
+            self._probe_started = now
+            return 0.0
+        return min(PROBE_POLL_INTERVAL, self._probe_started + self.reset_timeout - now + 0.001)
+    
+    def record_success(self) -> None:
+        """Close the circuit after a request reached a healthy API."""
+        with self._cond:
+            if self._failures >= self.failure_threshold:
+                logger.info("API is responding again; circuit closed")
+            self._failures = 0
+            self._probe_started = None
+            self._cond.notify_all()
+    
+    def record_failure(self) -> None:
+        """Count a transient failure, opening the circuit if needed."""
+        with self._cond:
+            self._failures += 1
+            if self._failures >= self.failure_threshold:
+                probing = self._probe_started is not None
+                if probing or self._failures == self.failure_threshold:
+                    self._open_until = time.monotonic() + self.reset_timeout
+                    self._probe_started = None
+                    self.opened += 1
+                    logger.warning(f"API appears to be down; pausing requests for {self.reset_timeout}s")
+                self._cond.notify_all()
+
+
+def send_with_retry(session: "requests.Session", url: str, rate_limiter: RateLimiter,
+                    retry_policy: Optional[RetryPolicy] = None,
+                    circuit_breaker: Optional[CircuitBreaker] = None,
+                    max_requeues: int = 20, params: Optional[Dict] = None,
+                    timeout: float = 30, metrics: Optional[RunMetrics] = None) -> "requests.Response":
+    """
+    Send a GET request with rate limiting, retries and circuit breaking.
+    
+    429 responses are reported to the rate limiter and the request is queued
+    again, up to max_requeues times. Transient failures are retried with
+    backoff according to retry_policy.
+    
+    Args:
+        session: HTTP session to send the request with
+        url: Request URL
+        rate_limiter: Rate limiter consulted before every attempt
+        retry_policy: Policy for transient failures; no retries when omitted
+        circuit_breaker: Circuit breaker shared by all workers
+        max_requeues: Maximum number of 429 responses before giving up
+        params: Query parameters
+        timeout: Request timeout in seconds
+        metrics: Run metrics recording every attempt and rate-limit wait
+    
+    Returns:
+        Successful response
+    
+    Raises:
+        requests.exceptions.RequestException: If the request ultimately fails
+    """
+    import requests
+    
+    retries = 0
+    requeues = 0
+    
+    while True:
+        if circuit_breaker is not None:
+            circuit_breaker.before_request()
+        waited = rate_limiter.acquire()
+        if metrics is not None:
+            metrics.add_time("rate_limit", waited)
+        
+        http_stage = metrics.traced("http") if metrics is not None else nullcontext()
+        start = time.perf_counter()
+        try:
+            with http_stage:
+                response = session.get(url, params=params, timeout=timeout)
+            if metrics is not None:
+                metrics.record_request(response.status_code, time.perf_counter() - start,
+                                       len(response.content))
+            if response.status_code != 429:
+                response.raise_for_status()
+        except requests.exceptions.RequestException as e:
+            if metrics is not None and e.response is None:
+                metrics.record_request(None, time.perf_counter() - start)
+            retryable = retry_policy is not None and retry_policy.is_retryable(e)
+            if circuit_breaker is not None:
+                if retryable:
+                    circuit_breaker.record_failure()
+                else:
+                    circuit_breaker.record_success()
+            if retryable and retries < retry_policy.max_retries:
+                retries += 1
+                logger.warning(f"Request to {url} failed ({e}); retry {retries} of {retry_policy.max_retries}")
+                backoff_start = time.perf_counter()
+                retry_policy.wait(retries)
+                if metrics is not None:
+                    metrics.add_time("backoff", time.perf_counter() - backoff_start)
+                continue
+            raise
+        
+        # The API answered, so it is up even if it asks us to slow down
+        if circuit_breaker is not None:
+            circuit_breaker.record_success()
+        
+        if response.status_code == 429:
+            rate_limiter.on_throttled(parse_retry_after(response.headers.get("Retry-After")))
+            requeues += 1
+            if requeues > max_requeues:
+                raise requests.exceptions.HTTPError(
+                    f"Still rate limited after {max_requeues} requeues", response=response
+                )
+            if retry_policy is not None:
+                retry_policy.stats.add_requeue()
+            logger.warning(f"Rate limited requesting {url}; requeued (attempt {requeues})")
+            continue
+        
+        rate_limiter.on_success()
+        return response
@@ -0,0 +1,135 @@
+"""
+Run journal for resumable batch processing.
+
+This module records which batches have been fetched and written, so an
+interrupted run can pick up where it stopped.
+"""
+
+import json
+import logging
+import os
+from pathlib import Path
+from typing import Dict, Optional, Set
+
+logger = logging.getLogger(__name__)
+
+
+class RunJournal:
+    """Append-only JSON lines log of processed batch IDs."""
+    
+    def __init__(self, journal_file: Path):
+        """
+        Initialize the run journal.
+        
+        Args:
+            journal_file: Path of the journal file
+        """
+        self.journal_file = Path(journal_file)
+        self.completed: Set[str] = set()
+        self.failed: Set[str] = set()
+        self.last_offset: Optional[int] = None
+        self._file = None
+    
+    def load(self) -> "RunJournal":
+        """
+        Read an existing journal.
+        
+        A truncated last line, left by a crash while writing it, is ignored.
+        
+        Returns:
+            The journal itself
+        """
+        if not self.journal_file.exists():
+            return self
+        
+        with open(self.journal_file, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    logger.warning(f"Ignoring incomplete journal line in {self.journal_file}")
+                    continue
+                self._apply(entry)
+        
+        return self
+    
+    def open(self, resume: bool = False) -> "RunJournal":
+        """
+        Open the journal for writing.
+        
+        Args:
+            resume: Keep existing entries instead of starting a new journal
+        
+        Returns:
+            The journal itself
+        """
+        if resume:
+            self.load()
+        else:
+            self.completed.clear()
+            self.failed.clear()
+            self.last_offset = None
+        
+        self._file = open(self.journal_file, 'a' if resume else 'w', encoding='utf-8')
+        if self._file.tell() > 0:
+            # Terminate a line cut short by a crash so new entries stay readable
+            with open(self.journal_file, 'rb') as f:
+                f.seek(-1, os.SEEK_END)
+                if f.read(1) != b"\n":
+                    self._file.write("\n")
+        return self
+    
+    def record_done(self, batch_id: str, rows: int, offset: int) -> None:
+        """
+        Record a batch whose rows are safely written.
+        
+        Args:
+            batch_id: ID of the batch
+            rows: Number of rows written for the batch
+            offset: Output file size after the batch was written
+        """
+        self._write({"batch_id": batch_id, "status": "done", "rows": rows, "offset": offset})
+    
+    def record_failed(self, batch_id: str) -> None:
+        """
+        Record a batch that could not be fetched.
+        
+        Args:
+            batch_id: ID of the batch
+        """
+        self._write({"batch_id": batch_id, "status": "failed"})
+    
+    def close(self) -> None:
+        """Close the journal file."""
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+    
+    def remove(self) -> None:
+        """Close and delete the journal file, once there is nothing left to resume."""
+        self.close()
+        if self.journal_file.exists():
+            self.journal_file.unlink()
+    
+    def _write(self, entry: Dict) -> None:
+        """Append an entry and flush it to disk."""
+        self._file.write(json.dumps(entry) + "\n")
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._apply(entry)
+    
+    def _apply(self, entry: Dict) -> None:
+        """Update the in-memory state from an entry."""
+        batch_id = entry.get("batch_id")
+        if entry.get("status") == "done":
+            self.completed.add(batch_id)
+            self.failed.discard(batch_id)
+            self.last_offset = entry.get("offset")
+        elif entry.get("status") == "failed":
+            self.failed.add(batch_id)
+    
+    def __enter__(self) -> "RunJournal":
+        return self
+    
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
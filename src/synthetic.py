@@ -0,0 +1,255 @@
+"""
+Synthetic batch calling data for ElevenLabs batch calling tools.
+
+This module generates realistic batch JSON and workspace listings at any
+scale, for benchmarks and for the local mock API. Data is deterministic for
+a given seed, and recipients carry a varied set of dynamic variables,
+including values that need CSV quoting.
+"""
+
+import argparse
+import json
+import logging
+import random
+from pathlib import Path
+from typing import Dict, Generator, List, Optional
+
+from compression import open_file
+
+logger = logging.getLogger(__name__)
+
+# Creation time of the first synthetic batch (2023-11-14 UTC)
+BASE_TIME = 1700000000
+
+BATCH_STATUSES = ["completed", "completed", "completed", "in_progress", "pending", "failed", "cancelled"]
+RECIPIENT_STATUSES = ["completed", "completed", "completed", "failed", "voicemail", "in_progress", "pending"]
+CITIES = ["Jakarta", "Surabaya", "Bandung", "Medan", "Semarang", "Makassar", "Denpasar", "Yogyakarta"]
+LANGUAGES = ["id", "en", "jv", "su"]
+NAMES = ["Andi", "Budi", "Citra", "Dewi", "Eko", "Fitri", "Gita", "Hadi", "Indah", "Joko"]
+NOTES = [
+    "Prefers calls after 5pm",
+    "Asked to call back, \"not a good time\"",
+    "Follow up on invoice, partial payment received",
+    "Long note: " + "customer requested details about the plan, pricing and renewal; " * 4
+]
+
+
+def make_recipient(index: int, rng: random.Random, created_at: int = BASE_TIME) -> Dict:
+    """
+    Generate one recipient of a batch.
+    
+    Args:
+        index: Position of the recipient, used for unique IDs and numbers
+        rng: Random number generator
+        created_at: Creation time of the batch
+    
+    Returns:
+        Recipient dictionary as returned by the API
+    """
+    status = rng.choice(RECIPIENT_STATUSES)
+    variables = {"city": rng.choice(CITIES)}
+    if rng.random() < 0.8:
+        variables["customer_name"] = f"{rng.choice(NAMES)} {rng.choice(NAMES)}"
+    if rng.random() < 0.5:
+        variables["amount_due"] = round(rng.uniform(10, 5000), 2)
+    if rng.random() < 0.3:
+        variables["language"] = rng.choice(LANGUAGES)
+    if rng.random() < 0.1:
+        variables["notes"] = rng.choice(NOTES)
+    
+    recipient = {
+        "id": f"rcpt_{index:08d}",
+        "phone_number": f"+6281{index:09d}",
+        "status": status,
+        "created_at_unix": created_at + index % 3600,
+        "updated_at_unix": created_at + index % 3600 + rng.randint(30, 7200),
+        "conversation_id": f"conv_{index:08d}" if status not in ("pending", "in_progress") else None,
+        "conversation_initiation_client_data": {"dynamic_variables": variables}
+    }
+    # A few recipients were uploaded without any dynamic variables
+    if rng.random() < 0.02:
+        recipient["conversation_initiation_client_data"] = None
+    return recipient
+
+
+def make_batch_summary(batch_id: str, rng: random.Random, created_at: int = BASE_TIME,
+                       recipients: Optional[int] = None) -> Dict:
+    """
+    Generate the batch-level fields of a batch.
+    
+    Args:
+        batch_id: ID of the batch
+        rng: Random number generator
+        created_at: Creation time of the batch
+        recipients: Number of recipients; random when omitted
+    
+    Returns:
+        Batch dictionary as listed in the workspace listing
+    """
+    if recipients is None:
+        recipients = rng.randint(10, 5000)
+    status = rng.choice(BATCH_STATUSES)
+    agent = rng.randint(1, 20)
+    return {
+        "id": batch_id,
+        "phone_number_id": f"phnum_{rng.randint(1, 5):04d}",
+        "phone_provider": rng.choice(["twilio", "sip_trunk"]),
+        "name": f"Campaign {batch_id[-6:]}",
+        "agent_id": f"agent_{agent:04d}",
+        "agent_name": f"Agent {agent}",
+        "created_at_unix": created_at,
+        "scheduled_time_unix": created_at + 600,
+        "total_calls_dispatched": recipients if status == "completed" else recipients // 2,
+        "total_calls_scheduled": recipients,
+        "last_updated_at_unix": created_at + rng.randint(600, 86400),
+        "status": status
+    }
+
+
+def iter_recipients(count: int, seed: int = 0, created_at: int = BASE_TIME) -> Generator[Dict, None, None]:
+    """
+    Generate the recipients of a batch one at a time.
+    
+    Args:
+        count: Number of recipients
+        seed: Random seed
+        created_at: Creation time of the batch
+    
+    Yields:
+        Recipient dictionaries
+    """
+    rng = random.Random(seed)
+    for index in range(count):
+        yield make_recipient(index, rng, created_at)
+
+
+def make_batch(recipients: int, batch_id: str = "btcal_000000", seed: int = 0) -> Dict:
+    """
+    Generate a batch with its recipients.
+    
+    Args:
+        recipients: Number of recipients
+        batch_id: ID of the batch
+        seed: Random seed
+    
+    Returns:
+        Batch dictionary as returned by the API for a single batch
+    """
+    rng = random.Random(seed)
+    batch = make_batch_summary(batch_id, rng, recipients=recipients)
+    batch["recipients"] = list(iter_recipients(recipients, seed, batch["created_at_unix"]))
+    return batch
+
+
+def make_batch_summaries(count: int, seed: int = 0, recipients: Optional[int] = None) -> List[Dict]:
+    """
+    Generate the batches of a workspace listing.
+    
+    Batches are spread over the days after BASE_TIME, newest first as the
+    API lists them.
+    
+    Args:
+        count: Number of batches
+        seed: Random seed
+        recipients: Number of recipients of every batch; random when omitted
+    
+    Returns:
+        Batch dictionaries
+    """
+    rng = random.Random(seed)
+    batches = [
+        make_batch_summary(f"btcal_{index:06d}", rng, BASE_TIME + index * 3600, recipients)
+        for index in range(count)
+    ]
+    batches.reverse()
+    return batches
+
+
+def make_workspace(count: int, seed: int = 0) -> Dict:
+    """
+    Generate a complete workspace listing.
+    
+    Args:
+        count: Number of batches
+        seed: Random seed
+    
+    Returns:
+        Listing dictionary in the format written by batch_history.py
+    """
+    return {"batch_calls": make_batch_summaries(count, seed), "has_more": False}
+
+
+def write_batch(output_file: Path, recipients: int, batch_id: str = "btcal_000000", seed: int = 0) -> None:
+    """
+    Write a batch JSON file without holding all recipients in memory.
+    
+    Args:
+        output_file: Output file path; .gz and .zst files are compressed
+        recipients: Number of recipients
+        batch_id: ID of the batch
+        seed: Random seed
+    """
+    batch = make_batch_summary(batch_id, random.Random(seed), recipients=recipients)
+    with open_file(output_file, 'w') as f:
+        f.write(json.dumps(batch)[:-1] + ', "recipients": [')
+        for index, recipient in enumerate(iter_recipients(recipients, seed, batch["created_at_unix"])):
+            f.write(",\n" if index else "\n")
+            f.write(json.dumps(recipient))
+        f.write("\n]}\n")
+
+
+def write_workspace(output_file: Path, batches: int, seed: int = 0) -> None:
+    """
+    Write a workspace listing JSON file.
+    
+    Args:
+        output_file: Output file path; .gz and .zst files are compressed
+        batches: Number of batches
+        seed: Random seed
+    """
+    with open_file(output_file, 'w') as f:
+        json.dump(make_workspace(batches, seed), f)
+
+
+def main(argv=None):
+    """Command line interface for generating synthetic data."""
+    # Configure logging
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    )
+    
+    parser = argparse.ArgumentParser(
+        description="Generate synthetic ElevenLabs batch calling data",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+    python synthetic.py batch 100000 batch_data.json
+    python synthetic.py batch 1000000 big_batch.json.gz --seed 7
+    python synthetic.py workspace 5000 batch_history.json
+        """
+    )
+    parser.add_argument("kind", choices=["batch", "workspace"],
+                        help="Single batch with recipients, or workspace listing of batches")
+    parser.add_argument("count", type=int, help="Number of recipients or batches")
+    parser.add_argument("output_json", type=Path, help="Output JSON file")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed (default: 0)")
+    
+    args = parser.parse_args(argv)
+    
+    try:
+        if args.kind == "batch":
+            write_batch(args.output_json, args.count, seed=args.seed)
+        else:
+            write_workspace(args.output_json, args.count, seed=args.seed)
+        logger.info(f"Wrote {args.count} synthetic {'recipients' if args.kind == 'batch' else 'batches'} "
+                    f"to {args.output_json}")
+    except Exception as e:
+        logger.error(f"Error writing synthetic data: {e}")
+        return 1
+    
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
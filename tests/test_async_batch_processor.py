@@ -0,0 +1,165 @@
+"""
+Tests for the async batch processor module.
+"""
+
+import asyncio
+import csv
+import json
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+import sys
+import os
+
+# Add src to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+# Set testing environment
+os.environ["TESTING"] = "true"
+
+from async_batch_processor import AsyncBatchProcessor
+from rate_limiter import RateLimiter
+from response_cache import ResponseCache
+from retry import CircuitBreaker, RetryPolicy
+
+
+class _StubApiHandler(BaseHTTPRequestHandler):
+    """Serve /{batch_id} with one recipient; some IDs misbehave once."""
+    
+    flaky = {}
+    
+    def do_GET(self):
+        batch_id = self.path.strip("/")
+        failure = self.flaky.pop(batch_id, None)
+        if batch_id == "missing":
+            self._reply(404, {"detail": "not found"})
+        elif failure == 429:
+            self._reply(429, {"detail": "slow down"}, {"Retry-After": "0"})
+        elif failure == 503:
+            self._reply(503, {"detail": "unavailable"})
+        else:
+            self._reply(200, {
+                "id": batch_id,
+                "name": f"Batch {batch_id}",
+                "status": "completed",
+                "recipients": [{"id": f"{batch_id}_r1", "phone_number": "+1234567890"}]
+            })
+    
+    def _reply(self, status, body, headers=None):
+        payload = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(payload)
+    
+    def log_message(self, format, *args):
+        pass
+
+
+class TestAsyncBatchProcessor:
+    """Test cases for the AsyncBatchProcessor class against a stub server."""
+    
+    def setup_method(self):
+        """Start the stub API server."""
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), _StubApiHandler)
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        self.api_base = f"http://127.0.0.1:{self.server.server_address[1]}"
+    
+    def teardown_method(self):
+        """Stop the stub API server."""
+        self.server.shutdown()
+        self.server.server_close()
+        _StubApiHandler.flaky.clear()
+    
+    def _processor(self, **kwargs):
+        processor = AsyncBatchProcessor(
+            rate_limiter=RateLimiter(rate=None),
+            retry_policy=RetryPolicy(base_delay=0),
+            **kwargs
+        )
+        processor.api_base = self.api_base
+        return processor
+    
+    def test_fetch_batch(self):
+        """Test fetching a batch and handling a 404."""
+        async def run():
+            async with self._processor() as processor:
+                return await processor.fetch_batch("batch_1"), await processor.fetch_batch("missing")
+        
+        data, missing = asyncio.run(run())
+        
+        assert data["id"] == "batch_1"
+        assert missing is None
+    
+    def test_circuit_breaker_pauses_requests(self):
+        """Test that a failing API opens the shared circuit breaker."""
+        _StubApiHandler.flaky["batch_1"] = 503
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0.2)
+        
+        async def run():
+            async with self._processor(circuit_breaker=breaker) as processor:
+                return await processor.fetch_batch("batch_1")
+        
+        start = time.monotonic()
+        data = asyncio.run(run())
+        
+        assert data["id"] == "batch_1"
+        assert breaker.opened == 1
+        assert time.monotonic() - start >= 0.15
+        assert breaker.allow() == 0
+    
+    def test_cache_is_used_off_the_event_loop(self):
+        """Test that cache file I/O runs outside the event loop thread."""
+        cache_threads = []
+        
+        class RecordingCache(ResponseCache):
+            def get(self, batch_id):
+                cache_threads.append(threading.current_thread())
+                return super().get(batch_id)
+            
+            def put(self, batch_id, data):
+                cache_threads.append(threading.current_thread())
+                super().put(batch_id, data)
+        
+        with tempfile.TemporaryDirectory() as temp_dir:
+            async def run():
+                async with self._processor(cache=RecordingCache(Path(temp_dir))) as processor:
+                    return await processor.fetch_batch("batch_1"), await processor.fetch_batch("batch_1")
+            
+            fetched, cached = asyncio.run(run())
+        
+        assert fetched == cached
+        assert len(cache_threads) == 3
+        assert threading.current_thread() not in cache_threads
+    
+    def test_process_batch_list_in_order_with_recovery(self):
+        """Test that rows keep input order and 429/503 batches are not lost."""
+        _StubApiHandler.flaky.update({"batch_3": 429, "batch_7": 503})
+        batch_ids = [f"batch_{i}" for i in range(20)] + ["missing"]
+        
+        with tempfile.TemporaryDirectory() as temp_dir:
+            batch_list = Path(temp_dir) / "batches.csv"
+            output = Path(temp_dir) / "recipients.csv"
+            batch_list.write_text("id\n" + "\n".join(batch_ids) + "\n")
+            
+            async def run():
+                async with self._processor(max_concurrency=8) as processor:
+                    await processor.process_batch_list(batch_list, output)
+                    return processor
+            
+            processor = asyncio.run(run())
+            
+            with open(output, newline='') as f:
+                rows = list(csv.DictReader(f))
+            
+            assert [row["batch_id"] for row in rows] == batch_ids[:-1]
+            assert processor.retry_policy.stats.requeues == 1
+            assert processor.retry_policy.stats.retries == 1
+            retry_list = Path(temp_dir) / "recipients.retry.csv"
+            assert processor.read_batch_ids_from_csv(retry_list) == ["missing"]
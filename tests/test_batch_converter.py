@@ -17,7 +17,7 @@ sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
 # Set testing environment
 os.environ["TESTING"] = "true"
 
-from batch_converter import BatchConverter
+from batch_converter import BatchConverter, resolve_inputs
 
 
 class TestBatchConverter:
@@ -111,8 +111,8 @@ class TestBatchConverter:
             with pytest.raises(ValueError, match="Invalid JSON format"):
                 self.converter.json_to_csv(json_file, csv_file)
     
-    def test_extract_city_success(self):
-        """Test city extraction from recipient data."""
+    def test_city_from_dynamic_variables(self):
+        """Test that the city column is read from the recipient's dynamic variables."""
         recipient = {
             "conversation_initiation_client_data": {
                 "dynamic_variables": {
@@ -121,15 +121,14 @@ class TestBatchConverter:
             }
         }
         
-        city = self.converter._extract_city(recipient)
-        assert city == "Los Angeles"
+        row = self.converter._create_recipient_row(self.sample_batch_data, recipient)
+        assert row["city"] == "Los Angeles"
     
-    def test_extract_city_missing_data(self):
-        """Test city extraction with missing data."""
-        recipient = {}
-        
-        city = self.converter._extract_city(recipient)
-        assert city == ""
+    def test_city_missing_data(self):
+        """Test that the city column is empty without dynamic variables."""
+        for recipient in ({}, {"conversation_initiation_client_data": None}):
+            row = self.converter._create_recipient_row(self.sample_batch_data, recipient)
+            assert row["city"] == ""
     
     def test_create_recipient_row(self):
         """Test recipient row creation."""
@@ -142,3 +141,116 @@ class TestBatchConverter:
         assert row["recipient_id"] == "recipient_1"
         assert row["phone_number"] == "+1234567890"
         assert row["city"] == "New York"
+    
+    def test_json_to_csv_recipients_before_batch_fields(self):
+        """Test conversion when batch fields follow the recipients array."""
+        reordered = {"recipients": self.sample_batch_data["recipients"]}
+        reordered.update({k: v for k, v in self.sample_batch_data.items() if k != "recipients"})
+        
+        with tempfile.TemporaryDirectory() as temp_dir:
+            json_file = Path(temp_dir) / "test.json"
+            csv_file = Path(temp_dir) / "test.csv"
+            
+            with open(json_file, 'w') as f:
+                json.dump(reordered, f)
+            
+            self.converter.json_to_csv(json_file, csv_file)
+            
+            with open(csv_file, 'r') as f:
+                rows = list(csv.DictReader(f))
+            
+            assert len(rows) == 2
+            assert rows[0]["batch_id"] == "batch_123"
+            assert rows[1]["status"] == "completed"
+    
+    def test_json_to_csv_no_recipients(self):
+        """Test that no CSV is written when the batch has no recipients."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            json_file = Path(temp_dir) / "test.json"
+            csv_file = Path(temp_dir) / "test.csv"
+            
+            with open(json_file, 'w') as f:
+                json.dump(dict(self.sample_batch_data, recipients=[]), f)
+            
+            self.converter.json_to_csv(json_file, csv_file)
+            
+            assert not csv_file.exists()
+    
+    def test_convert_many_merged_in_input_order(self):
+        """Test that a directory of batches is merged into one CSV in file order."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            input_dir = Path(temp_dir) / "batches"
+            input_dir.mkdir()
+            for index in range(3):
+                with open(input_dir / f"batch_{index}.json", 'w') as f:
+                    json.dump(dict(self.sample_batch_data, id=f"batch_{index}"), f)
+            (input_dir / "broken.json").write_text("{not json")
+            csv_file = Path(temp_dir) / "all.csv"
+            
+            json_files = resolve_inputs(str(input_dir))
+            row_count, failed = self.converter.convert_many(json_files, csv_file, jobs=2)
+            
+            with open(csv_file, 'r') as f:
+                rows = list(csv.DictReader(f))
+            
+            assert row_count == 6
+            assert failed == [input_dir / "broken.json"]
+            assert [row["batch_id"] for row in rows] == ["batch_0"] * 2 + ["batch_1"] * 2 + ["batch_2"] * 2
+            assert rows[0]["phone_number"] == "+1234567890"
+    
+    def test_convert_many_per_file(self):
+        """Test writing one CSV per input file."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            for index in range(2):
+                with open(Path(temp_dir) / f"batch_{index}.json", 'w') as f:
+                    json.dump(dict(self.sample_batch_data, id=f"batch_{index}"), f)
+            output_dir = Path(temp_dir) / "out"
+            
+            json_files = resolve_inputs(str(Path(temp_dir) / "batch_*.json"))
+            row_count, failed = self.converter.convert_many(json_files, output_dir, jobs=2, per_file=True)
+            
+            assert row_count == 4
+            assert failed == []
+            with open(output_dir / "batch_1.csv", 'r') as f:
+                rows = list(csv.DictReader(f))
+            assert [row["batch_id"] for row in rows] == ["batch_1", "batch_1"]
+    
+    def test_convert_many_per_file_keeps_directories(self):
+        """Test that same-named inputs from different directories get separate CSVs."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            for month in ("2024-01", "2024-02"):
+                (Path(temp_dir) / month).mkdir()
+                with open(Path(temp_dir) / month / "batch.json", 'w') as f:
+                    json.dump(dict(self.sample_batch_data, id=f"batch_{month}"), f)
+            output_dir = Path(temp_dir) / "out"
+            
+            json_files = resolve_inputs(str(Path(temp_dir) / "**" / "*.json"))
+            row_count, failed = self.converter.convert_many(json_files, output_dir, jobs=2, per_file=True)
+            
+            assert row_count == 4
+            with open(output_dir / "2024-02" / "batch.csv", 'r') as f:
+                assert [row["batch_id"] for row in csv.DictReader(f)] == ["batch_2024-02"] * 2
+            
+            (Path(temp_dir) / "2024-01" / "batch.json.gz").write_bytes(b"")
+            with pytest.raises(ValueError):
+                self.converter.convert_many(resolve_inputs(str(Path(temp_dir) / "2024-01")),
+                                            output_dir, per_file=True)
+    
+    def test_json_to_csv_compressed(self):
+        """Test converting a gzip JSON file to a gzip CSV file."""
+        import gzip
+        
+        with tempfile.TemporaryDirectory() as temp_dir:
+            json_file = Path(temp_dir) / "test.json.gz"
+            csv_file = Path(temp_dir) / "test.csv.gz"
+            
+            with gzip.open(json_file, 'wt') as f:
+                json.dump(self.sample_batch_data, f)
+            
+            self.converter.json_to_csv(json_file, csv_file)
+            
+            with gzip.open(csv_file, 'rt', newline='') as f:
+                rows = list(csv.DictReader(f))
+            
+            assert [row["recipient_id"] for row in rows] == ["recipient_1", "recipient_2"]
+            assert resolve_inputs(temp_dir) == [json_file]
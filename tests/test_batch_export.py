@@ -0,0 +1,102 @@
+"""
+Tests for the batch export module.
+"""
+
+import csv
+import os
+import tempfile
+import threading
+from pathlib import Path
+import sys
+
+# Add src to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+# Set testing environment
+os.environ["TESTING"] = "true"
+
+from batch_export import BatchExport
+from batch_history import BatchHistoryFetcher
+from batch_processor import BatchProcessor
+from mock_api import MockApi, MockApiServer
+from rate_limiter import RateLimiter
+from retry import RetryPolicy
+
+
+class RecordingMockApi(MockApi):
+    """Mock API remembering the order in which paths were requested."""
+    
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.paths = []
+        self._paths_lock = threading.Lock()
+    
+    def handle(self, path, query, api_key=None):
+        with self._paths_lock:
+            self.paths.append(path.rsplit("/", 1)[-1])
+        return super().handle(path, query, api_key)
+
+
+class TestBatchExport:
+    """Test cases for the BatchExport class."""
+    
+    def setup_method(self):
+        """Set up test fixtures."""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.output = Path(self.temp_dir.name) / "recipients.csv"
+        self.api = RecordingMockApi(batches=30, recipients=3, max_page_size=5)
+        self.server = MockApiServer(self.api).start()
+        
+        self.processor = BatchProcessor(rate_limit_delay=0, max_workers=2,
+                                        retry_policy=RetryPolicy(base_delay=0))
+        self.processor.api_base = self.server.url
+        self.fetcher = BatchHistoryFetcher(rate_limiter=RateLimiter(None), session=self.processor.session,
+                                           retry_policy=self.processor.retry_policy)
+        self.fetcher.api_base = self.server.url
+    
+    def teardown_method(self):
+        """Clean up test fixtures."""
+        self.server.stop()
+        self.temp_dir.cleanup()
+    
+    def _exported_batch_ids(self):
+        with open(self.output, newline='', encoding='utf-8') as f:
+            return [row["batch_id"] for row in csv.DictReader(f)]
+    
+    def test_export_streams_listing_into_rows(self):
+        """Test that every listed batch is exported, fetching while the listing is paged."""
+        stats = BatchExport(self.processor, self.fetcher).export(self.output, page_size=5)
+        
+        listed = [batch["id"] for batch in self.api.listing]
+        assert stats == {"listed": 30, "skipped": 0, "exported": 30, "failed": 0, "rows": 90}
+        assert sorted(set(self._exported_batch_ids())) == sorted(listed)
+        
+        # Batches of the first page are fetched before the last page is listed
+        first_batch = self.api.paths.index(listed[0])
+        last_page = len(self.api.paths) - 1 - self.api.paths[::-1].index("workspace")
+        assert first_batch < last_page
+        assert not self.processor.retry_list_path(self.output).exists()
+    
+    def test_export_filters_statuses(self):
+        """Test that only batches with the requested statuses are fetched."""
+        completed = [batch["id"] for batch in self.api.listing if batch["status"] == "completed"]
+        
+        stats = BatchExport(self.processor, self.fetcher, statuses=["completed"]).export(self.output)
+        
+        assert stats["exported"] == len(completed)
+        assert stats["skipped"] == 30 - len(completed)
+        assert sorted(set(self._exported_batch_ids())) == sorted(completed)
+    
+    def test_failed_batches_go_to_retry_list(self):
+        """Test that batches failing to fetch are saved for a later run."""
+        pages = [next(self.fetcher.iter_workspace_pages(100))]
+        self.fetcher.iter_workspace_pages = lambda page_size: iter(pages)
+        self.processor.retry_policy = RetryPolicy(max_retries=0)
+        self.api.error_rate = 1.0
+        
+        stats = BatchExport(self.processor, self.fetcher).export(self.output)
+        
+        assert stats["failed"] == stats["listed"] > 0
+        retry_list = self.processor.retry_list_path(self.output)
+        with open(retry_list, newline='', encoding='utf-8') as f:
+            assert len(list(csv.DictReader(f))) == stats["failed"]
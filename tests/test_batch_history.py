@@ -0,0 +1,107 @@
+"""
+Tests for the batch history module.
+"""
+
+import json
+import tempfile
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+import sys
+import os
+
+import requests
+
+# Add src to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+# Set testing environment
+os.environ["TESTING"] = "true"
+
+from batch_history import BatchHistoryFetcher
+from rate_limiter import RateLimiter
+
+
+def _page_response(batch_ids, next_doc=None):
+    """Build a mocked workspace page response."""
+    response = MagicMock()
+    response.json.return_value = {
+        "batch_calls": [{"id": batch_id} for batch_id in batch_ids],
+        "next_doc": next_doc,
+        "has_more": next_doc is not None
+    }
+    return response
+
+
+class TestBatchHistoryFetcher:
+    """Test cases for the BatchHistoryFetcher class."""
+    
+    def setup_method(self):
+        """Set up test fixtures."""
+        self.fetcher = BatchHistoryFetcher(rate_limiter=RateLimiter(rate=None))
+        self.pages = {
+            None: _page_response(["batch_1", "batch_2"], next_doc="doc_2"),
+            "doc_2": _page_response(["batch_3"], next_doc="doc_3"),
+            "doc_3": _page_response(["batch_4"])
+        }
+    
+    def _get(self, url, params=None, timeout=None):
+        return self.pages[params.get("last_doc")]
+    
+    def test_iter_workspace_batches_walks_all_pages(self):
+        """Test that every page is requested with the previous cursor."""
+        with patch.object(self.fetcher.session, 'get', side_effect=self._get) as mock_get:
+            batch_ids = [batch["id"] for batch in self.fetcher.iter_workspace_batches(page_size=2)]
+        
+        assert batch_ids == ["batch_1", "batch_2", "batch_3", "batch_4"]
+        assert [call.kwargs["params"] for call in mock_get.call_args_list] == [
+            {"limit": 2},
+            {"limit": 2, "last_doc": "doc_2"},
+            {"limit": 2, "last_doc": "doc_3"}
+        ]
+    
+    def test_save_workspace_batches_writes_file(self):
+        """Test that the combined listing is saved as valid JSON."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            output = Path(temp_dir) / "history.json"
+            
+            with patch.object(self.fetcher.session, 'get', side_effect=self._get):
+                batch_count = self.fetcher.save_workspace_batches(output)
+                data = self.fetcher.fetch_workspace_batches()
+            
+            with open(output) as f:
+                saved = json.load(f)
+            
+            assert batch_count == 4
+            assert saved == data
+            assert self.fetcher.metrics.counters["listed_batches"] == 8
+            assert self.fetcher.metrics.rows == 4
+    
+    def test_fetch_workspace_batches_to_file(self):
+        """Test that a positional output file is saved instead of being taken as the page size."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            output = Path(temp_dir) / "history.json"
+            
+            with patch.object(self.fetcher.session, 'get', side_effect=self._get) as mock_get:
+                data = self.fetcher.fetch_workspace_batches(output)
+            
+            with open(output) as f:
+                saved = json.load(f)
+            
+            assert data == {"batch_count": 4, "has_more": False}
+            assert len(saved["batch_calls"]) == 4
+            assert mock_get.call_args_list[0].kwargs["params"] == {"limit": 100}
+    
+    def test_save_workspace_batches_failure(self):
+        """Test that a failed page returns None and leaves no partial file."""
+        self.pages["doc_3"].raise_for_status.side_effect = requests.exceptions.HTTPError("500")
+        
+        with tempfile.TemporaryDirectory() as temp_dir:
+            output = Path(temp_dir) / "history.json"
+            
+            with patch.object(self.fetcher.session, 'get', side_effect=self._get):
+                batch_count = self.fetcher.save_workspace_batches(output)
+                data = self.fetcher.fetch_workspace_batches()
+            
+            assert batch_count is None
+            assert data is None
+            assert list(Path(temp_dir).iterdir()) == []
@@ -5,6 +5,7 @@ Tests for the batch processor module.
 import pytest
 import csv
 import tempfile
+import time
 from pathlib import Path
 from unittest.mock import patch, MagicMock
 import sys
@@ -17,6 +18,7 @@ sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
 os.environ["TESTING"] = "true"
 
 from batch_processor import BatchProcessor
+from batch_converter import BatchConverter
 
 
 class TestBatchProcessor:
@@ -91,29 +93,35 @@ class TestBatchProcessor:
             with pytest.raises(ValueError, match="CSV file must contain 'id' column"):
                 self.processor.read_batch_ids_from_csv(csv_file)
     
-    @patch('batch_processor.requests.get')
-    def test_fetch_batch_success(self, mock_get):
+    def test_fetch_batch_success(self):
         """Test successful batch fetching."""
         mock_response = MagicMock()
         mock_response.status_code = 200
         mock_response.json.return_value = self.sample_batch_data
-        mock_get.return_value = mock_response
         
-        result = self.processor.fetch_batch("batch_123")
+        with patch.object(self.processor.session, 'get', return_value=mock_response) as mock_get:
+            result = self.processor.fetch_batch("batch_123")
         
         assert result == self.sample_batch_data
         mock_get.assert_called_once()
     
-    @patch('batch_processor.requests.get')
-    def test_fetch_batch_http_error(self, mock_get):
+    def test_fetch_batch_http_error(self):
         """Test batch fetching with HTTP error."""
         import requests
-        mock_get.side_effect = requests.exceptions.RequestException("HTTP Error")
+        error = requests.exceptions.RequestException("HTTP Error")
         
-        result = self.processor.fetch_batch("batch_123")
+        with patch.object(self.processor.session, 'get', side_effect=error):
+            result = self.processor.fetch_batch("batch_123")
         
         assert result is None
     
+    def test_session_pool_sized_for_workers(self):
+        """Test that the default session pool matches the worker count."""
+        processor = BatchProcessor(max_workers=16)
+        adapter = processor.session.get_adapter("https://api.elevenlabs.io")
+        
+        assert adapter._pool_maxsize == 16
+    
     def test_extract_recipients(self):
         """Test recipient extraction from batch data."""
         recipients = list(self.processor.extract_recipients(self.sample_batch_data))
@@ -127,8 +135,8 @@ class TestBatchProcessor:
         assert recipient["phone_number"] == "+1234567890"
         assert recipient["city"] == "New York"
     
-    def test_extract_city_success(self):
-        """Test city extraction from recipient data."""
+    def test_city_from_dynamic_variables(self):
+        """Test that the city column is read from the recipient's dynamic variables."""
         recipient = {
             "conversation_initiation_client_data": {
                 "dynamic_variables": {
@@ -137,12 +145,295 @@ class TestBatchProcessor:
             }
         }
         
-        city = self.processor._extract_city(recipient)
-        assert city == "Boston"
+        rows = list(self.processor.extract_recipients({"id": "batch_1", "recipients": [recipient]}))
+        assert rows[0]["city"] == "Boston"
+    
+    def test_city_missing_data(self):
+        """Test that the city column is empty without dynamic variables."""
+        recipients = [{}, {"conversation_initiation_client_data": None}]
+        
+        rows = list(self.processor.extract_recipients({"id": "batch_1", "recipients": recipients}))
+        assert [row["city"] for row in rows] == ["", ""]
+    
+    def test_iter_batches_concurrent_preserves_order(self):
+        """Test concurrent fetching yields batches in input order."""
+        processor = BatchProcessor(rate_limit_delay=0, max_workers=4)
+        batch_ids = [f"batch_{i}" for i in range(10)]
+        
+        def fake_fetch(batch_id):
+            # Later batches finish first
+            time.sleep(0.001 * (10 - int(batch_id.split("_")[1])))
+            return {"id": batch_id}
+        
+        with patch.object(processor, 'fetch_batch', side_effect=fake_fetch):
+            results = list(processor.iter_batches(batch_ids))
+        
+        assert [batch_id for batch_id, _ in results] == batch_ids
+        assert [data["id"] for _, data in results] == batch_ids
+    
+    def test_process_batch_list_concurrent(self):
+        """Test concurrent batch list processing writes rows in input order."""
+        processor = BatchProcessor(rate_limit_delay=0, max_workers=3)
+        
+        def fake_fetch(batch_id):
+            if batch_id == "batch_2":
+                return None
+            data = dict(self.sample_batch_data, id=batch_id)
+            return data
+        
+        with tempfile.TemporaryDirectory() as temp_dir:
+            batch_list = Path(temp_dir) / "batches.csv"
+            output = Path(temp_dir) / "recipients.csv"
+            
+            with open(batch_list, 'w', newline='') as f:
+                writer = csv.writer(f)
+                writer.writerow(['id'])
+                for i in range(5):
+                    writer.writerow([f'batch_{i}'])
+            
+            with patch.object(processor, 'fetch_batch', side_effect=fake_fetch):
+                processor.process_batch_list(batch_list, output)
+            
+            with open(output, newline='') as f:
+                rows = list(csv.DictReader(f))
+            
+            assert [row["batch_id"] for row in rows] == ['batch_0', 'batch_1', 'batch_3', 'batch_4']
+    
+    def test_process_batch_list_streams_rows(self):
+        """Test rows are on disk before later batches are fetched."""
+        processor = BatchProcessor(rate_limit_delay=0)
+        lines_seen = []
+        
+        with tempfile.TemporaryDirectory() as temp_dir:
+            batch_list = Path(temp_dir) / "batches.csv"
+            output = Path(temp_dir) / "recipients.csv"
+            
+            with open(batch_list, 'w', newline='') as f:
+                f.write("id\nbatch_0\nbatch_1\n")
+            
+            def fake_fetch(batch_id):
+                lines_seen.append(len(output.read_text().splitlines()))
+                return dict(self.sample_batch_data, id=batch_id)
+            
+            with patch.object(processor, 'fetch_batch', side_effect=fake_fetch):
+                processor.process_batch_list(batch_list, output)
+            
+            with open(output, newline='') as f:
+                reader = csv.DictReader(f)
+                rows = list(reader)
+            
+            # Header only before the first batch, header + one row before the second
+            assert lines_seen == [1, 2]
+            assert reader.fieldnames == BatchConverter.BATCH_FIELDNAMES
+            assert len(rows) == 2
+    
+    def test_process_batch_list_sqlite_resume(self):
+        """Test that resuming into a SQLite database does not duplicate rows."""
+        import sqlite3
+        
+        processor = BatchProcessor(rate_limit_delay=0)
+        
+        with tempfile.TemporaryDirectory() as temp_dir:
+            batch_list = Path(temp_dir) / "batches.csv"
+            output = Path(temp_dir) / "recipients.db"
+            journal = Path(temp_dir) / "run.journal"
+            
+            with open(batch_list, 'w', newline='') as f:
+                f.write("id\nbatch_0\nbatch_1\n")
+            
+            def fake_fetch(batch_id):
+                return dict(self.sample_batch_data, id=batch_id,
+                            recipients=[dict(r, id=f"{batch_id}_{r['id']}")
+                                        for r in self.sample_batch_data["recipients"]])
+            
+            with patch.object(processor, 'fetch_batch', side_effect=fake_fetch):
+                processor.process_batch_list(batch_list, output, journal_file=journal)
+                processor.process_batch_list(batch_list, output, journal_file=journal, resume=True)
+            
+            conn = sqlite3.connect(str(output))
+            try:
+                count = conn.execute("SELECT COUNT(*) FROM batch_recipients").fetchone()[0]
+            finally:
+                conn.close()
+            
+            assert count == 2 * len(self.sample_batch_data["recipients"])
+    
+    def test_fetch_batch_uses_cache(self):
+        """Test that cached batches skip the API call."""
+        from response_cache import ResponseCache
+        
+        with tempfile.TemporaryDirectory() as temp_dir:
+            processor = BatchProcessor(rate_limit_delay=0, cache=ResponseCache(Path(temp_dir)))
+            mock_response = MagicMock()
+            mock_response.json.return_value = self.sample_batch_data
+            
+            with patch.object(processor.session, 'get', return_value=mock_response) as mock_get:
+                first = processor.fetch_batch("batch_123")
+                second = processor.fetch_batch("batch_123")
+            
+            assert first == second == self.sample_batch_data
+            mock_get.assert_called_once()
     
-    def test_extract_city_missing_data(self):
-        """Test city extraction with missing data."""
-        recipient = {}
+    def test_process_batch_list_resume(self):
+        """Test resuming skips written batches and drops a half-written one."""
+        processor = BatchProcessor(rate_limit_delay=0)
         
-        city = self.processor._extract_city(recipient)
-        assert city == ""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            batch_list = Path(temp_dir) / "batches.csv"
+            output = Path(temp_dir) / "recipients.csv"
+            journal = Path(temp_dir) / "recipients.csv.journal"
+            batch_list.write_text("id\nbatch_0\nbatch_1\nbatch_2\n")
+            
+            def crashing_fetch(batch_id):
+                if batch_id == "batch_2":
+                    raise KeyboardInterrupt
+                return dict(self.sample_batch_data, id=batch_id)
+            
+            with patch.object(processor, 'fetch_batch', side_effect=crashing_fetch):
+                with pytest.raises(KeyboardInterrupt):
+                    processor.process_batch_list(batch_list, output, journal_file=journal)
+            
+            # Simulate a batch that was half written when the run died
+            with open(output, 'a') as f:
+                f.write("batch_x,partial")
+            
+            fetched = []
+            
+            def fetch(batch_id):
+                fetched.append(batch_id)
+                return None if batch_id == "batch_2" else dict(self.sample_batch_data, id=batch_id)
+            
+            with patch.object(processor, 'fetch_batch', side_effect=fetch):
+                processor.process_batch_list(batch_list, output, journal_file=journal, resume=True)
+            
+            with open(output, newline='') as f:
+                rows = list(csv.DictReader(f))
+            
+            assert fetched == ["batch_2"]
+            assert [row["batch_id"] for row in rows] == ["batch_0", "batch_1"]
+            retry_list = Path(temp_dir) / "recipients.retry.csv"
+            assert processor.read_batch_ids_from_csv(retry_list) == ["batch_2"]
+    
+    def test_phone_index_with_selected_columns(self):
+        """Test that the phone index is filled even when --columns leaves out its columns."""
+        from phone_index import PhoneIndex
+        from projection import Projection
+        from sinks import CsvSink
+        
+        with tempfile.TemporaryDirectory() as temp_dir:
+            with PhoneIndex(Path(temp_dir) / "phones.idx") as index:
+                projection = Projection(["batch_id", "updated_at_unix=recipient.status"])
+                processor = BatchProcessor(rate_limit_delay=0, phone_index=index, projection=projection)
+                
+                with patch.object(processor, 'fetch_batch', return_value=self.sample_batch_data):
+                    with CsvSink(Path(temp_dir) / "out.csv", projection.fieldnames) as sink:
+                        processor.process_batch_ids(["batch_123"], sink)
+                
+                entries = index.lookup("+1234567890")
+        
+        assert [entry["recipient_id"] for entry in entries] == ["recipient_1"]
+        assert entries[0]["updated_at"] == 1609466400
+    
+    def test_process_batch_list_removes_journal(self):
+        """Test that the journal is kept after failures and deleted after a clean run."""
+        processor = BatchProcessor(rate_limit_delay=0)
+        
+        with tempfile.TemporaryDirectory() as temp_dir:
+            batch_list = Path(temp_dir) / "batches.csv"
+            output = Path(temp_dir) / "recipients.csv"
+            journal = Path(temp_dir) / "recipients.csv.journal"
+            batch_list.write_text("id\nbatch_0\nbatch_1\n")
+            
+            with patch.object(processor, 'fetch_batch',
+                              side_effect=lambda batch_id: None if batch_id == "batch_1" else self.sample_batch_data):
+                processor.process_batch_list(batch_list, output, journal_file=journal)
+            assert journal.exists()
+            
+            with patch.object(processor, 'fetch_batch', return_value=self.sample_batch_data):
+                processor.process_batch_list(batch_list, output, journal_file=journal, resume=True)
+            assert not journal.exists()
+    
+    def test_process_batch_list_resume_compressed(self):
+        """Test resuming a gzip-compressed output drops a half-written batch."""
+        import gzip
+        
+        processor = BatchProcessor(rate_limit_delay=0)
+        
+        with tempfile.TemporaryDirectory() as temp_dir:
+            batch_list = Path(temp_dir) / "batches.csv.gz"
+            output = Path(temp_dir) / "recipients.csv.gz"
+            journal = Path(temp_dir) / "recipients.csv.gz.journal"
+            with gzip.open(batch_list, 'wt') as f:
+                f.write("id\nbatch_0\nbatch_1\nbatch_2\n")
+            
+            def crashing_fetch(batch_id):
+                if batch_id == "batch_1":
+                    raise KeyboardInterrupt
+                return dict(self.sample_batch_data, id=batch_id)
+            
+            with patch.object(processor, 'fetch_batch', side_effect=crashing_fetch):
+                with pytest.raises(KeyboardInterrupt):
+                    processor.process_batch_list(batch_list, output, journal_file=journal)
+            
+            with gzip.open(output, 'at') as f:
+                f.write("batch_x,partial")
+            
+            with patch.object(processor, 'fetch_batch',
+                              side_effect=lambda batch_id: dict(self.sample_batch_data, id=batch_id)):
+                processor.process_batch_list(batch_list, output, journal_file=journal, resume=True)
+            
+            with gzip.open(output, 'rt', newline='') as f:
+                rows = list(csv.DictReader(f))
+            
+            assert [row["batch_id"] for row in rows] == ["batch_0", "batch_1", "batch_2"]
+    
+    def test_process_batch_list_partitioned(self):
+        """Test writing one part per batch with a manifest, and refusing to resume it."""
+        import json
+        
+        processor = BatchProcessor(rate_limit_delay=0)
+        
+        with tempfile.TemporaryDirectory() as temp_dir:
+            batch_list = Path(temp_dir) / "batches.csv"
+            output = Path(temp_dir) / "recipients.csv"
+            batch_list.write_text("id\nbatch_0\nbatch_1\n")
+            
+            with patch.object(processor, 'fetch_batch',
+                              side_effect=lambda batch_id: dict(self.sample_batch_data, id=batch_id)):
+                processor.process_batch_list(batch_list, output, partition_by="batch_id")
+            
+            with open(Path(temp_dir) / "recipients" / "manifest.json") as f:
+                manifest = json.load(f)
+            
+            assert [(part["path"], part["rows"]) for part in manifest["parts"]] == [
+                ("batch_id=batch_0/part-00000.csv", len(self.sample_batch_data["recipients"])),
+                ("batch_id=batch_1/part-00000.csv", len(self.sample_batch_data["recipients"]))
+            ]
+            with pytest.raises(ValueError):
+                processor.process_batch_list(batch_list, output, resume=True, max_rows=10)
+    
+    def test_fetch_batch_requeues_rate_limited(self):
+        """Test that a 429 response is retried after backing off, not dropped."""
+        processor = BatchProcessor(rate_limit_delay=0)
+        throttled = MagicMock(status_code=429, headers={"Retry-After": "0"})
+        ok = MagicMock(status_code=200)
+        ok.json.return_value = self.sample_batch_data
+        
+        with patch.object(processor.session, 'get', side_effect=[throttled, throttled, ok]):
+            with patch.object(processor.rate_limiter, 'on_throttled') as on_throttled:
+                result = processor.fetch_batch("batch_123")
+        
+        assert result == self.sample_batch_data
+        assert on_throttled.call_count == 2
+        on_throttled.assert_called_with(0.0)
+    
+    def test_fetch_batch_gives_up_after_max_requeues(self):
+        """Test that a batch that stays rate limited is reported as failed."""
+        processor = BatchProcessor(rate_limit_delay=0, max_requeues=2)
+        throttled = MagicMock(status_code=429, headers={"Retry-After": "0"})
+        
+        with patch.object(processor.session, 'get', return_value=throttled) as mock_get:
+            result = processor.fetch_batch("batch_123")
+        
+        assert result is None
+        assert mock_get.call_count == 3
@@ -0,0 +1,101 @@
+"""
+Tests for the batch sync module.
+"""
+
+import csv
+import tempfile
+from pathlib import Path
+from unittest.mock import MagicMock
+import sys
+import os
+
+# Add src to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+# Set testing environment
+os.environ["TESTING"] = "true"
+
+from batch_processor import BatchProcessor
+from batch_sync import BatchSync
+
+
+def _batch(batch_id, updated, recipients=1):
+    """Build batch data with the given number of recipients."""
+    return {
+        "id": batch_id,
+        "last_updated_at_unix": updated,
+        "status": "completed",
+        "recipients": [{"id": f"{batch_id}_r{i}"} for i in range(recipients)]
+    }
+
+
+class TestBatchSync:
+    """Test cases for the BatchSync class."""
+    
+    def setup_method(self):
+        """Set up test fixtures."""
+        self.remote = {"batch_1": _batch("batch_1", 100), "batch_2": _batch("batch_2", 200)}
+        self.fetched = []
+        
+        self.processor = BatchProcessor(rate_limit_delay=0)
+        self.processor.fetch_batch = self._fetch
+        self.fetcher = MagicMock()
+        self.fetcher.fetch_workspace_batches.side_effect = lambda: {
+            "batch_calls": [
+                {"id": batch_id, "last_updated_at_unix": data["last_updated_at_unix"]}
+                for batch_id, data in self.remote.items()
+            ]
+        }
+        self.sync = BatchSync(self.processor, self.fetcher)
+    
+    def _fetch(self, batch_id):
+        self.fetched.append(batch_id)
+        return self.remote.get(batch_id)
+    
+    def _recipient_ids(self, output):
+        with open(output, newline='') as f:
+            return sorted(row["recipient_id"] for row in csv.DictReader(f))
+    
+    def test_only_changed_batches_fetched(self):
+        """Test that a second sync fetches only new and changed batches."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            output = Path(temp_dir) / "recipients.csv"
+            state = Path(temp_dir) / "state.json"
+            
+            stats = self.sync.sync(output, state)
+            assert stats["fetched"] == 2
+            
+            self.remote["batch_2"] = _batch("batch_2", 250, recipients=2)
+            self.remote["batch_3"] = _batch("batch_3", 300)
+            self.fetched.clear()
+            self.processor.metrics.rows = 0
+            
+            stats = self.sync.sync(output, state)
+            
+            assert self.fetched == ["batch_2", "batch_3"]
+            assert self.processor.metrics.rows == stats["rows"]
+            assert stats == {"fetched": 2, "unchanged": 1, "failed": 0, "rows": 4}
+            assert self._recipient_ids(output) == [
+                "batch_1_r0", "batch_2_r0", "batch_2_r1", "batch_3_r0"
+            ]
+    
+    def test_failed_batch_keeps_previous_rows(self):
+        """Test that a failed fetch keeps old rows and is retried next time."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            output = Path(temp_dir) / "recipients.csv"
+            state = Path(temp_dir) / "state.json"
+            
+            self.sync.sync(output, state)
+            
+            self.processor.fetch_batch = lambda batch_id: None
+            self.remote["batch_1"] = _batch("batch_1", 150)
+            stats = self.sync.sync(output, state)
+            
+            assert stats["failed"] == 1
+            assert self._recipient_ids(output) == ["batch_1_r0", "batch_2_r0"]
+            
+            self.processor.fetch_batch = self._fetch
+            self.fetched.clear()
+            self.sync.sync(output, state)
+            
+            assert self.fetched == ["batch_1"]
@@ -0,0 +1,50 @@
+"""
+Tests for the cli module.
+"""
+
+import csv
+import importlib
+import os
+from pathlib import Path
+import sys
+
+import pytest
+
+# Add src to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+# Set testing environment
+os.environ["TESTING"] = "true"
+
+from cli import COMMANDS, main
+from synthetic import write_workspace
+
+
+class TestCli:
+    """Test cases for the unified command line."""
+    
+    def test_dispatches_to_command(self, tmp_path):
+        """Test that a subcommand runs its tool with the remaining arguments."""
+        listing = tmp_path / "batch_history.json"
+        output = tmp_path / "batch_list.csv"
+        write_workspace(listing, 3)
+        
+        assert main(["convert-list", str(listing), str(output)]) == 0
+        
+        with open(output, newline='', encoding='utf-8') as f:
+            assert len(list(csv.DictReader(f))) == 3
+    
+    def test_command_help_names_subcommand(self, capsys):
+        """Test that a command's usage line shows the subcommand."""
+        program = sys.argv[0]
+        
+        with pytest.raises(SystemExit):
+            main(["export", "--help"])
+        
+        assert f"{os.path.basename(program)} export" in capsys.readouterr().out
+        assert sys.argv[0] == program
+    
+    def test_every_command_has_a_main(self):
+        """Test that every subcommand module provides main()."""
+        for module_name, _ in COMMANDS.values():
+            assert callable(importlib.import_module(module_name).main)
@@ -0,0 +1,83 @@
+"""
+Tests for the compression module.
+"""
+
+import importlib.util
+import shutil
+import tempfile
+from pathlib import Path
+import sys
+
+import pytest
+
+# Add src to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from compression import codec_for, copy_prefix, open_file, strip_compression_suffix, uncompressed_size
+from sinks import CsvSink
+
+CODEC_SUFFIXES = [
+    ".gz",
+    pytest.param(".zst", marks=pytest.mark.skipif(importlib.util.find_spec("zstandard") is None,
+                                                  reason="zstandard is not installed"))
+]
+
+
+class TestCompression:
+    """Test cases for compressed file handling."""
+    
+    def setup_method(self):
+        """Set up test fixtures."""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.dir = Path(self.temp_dir.name)
+    
+    def teardown_method(self):
+        """Clean up test fixtures."""
+        self.temp_dir.cleanup()
+    
+    def test_codec_for(self):
+        """Test codecs are picked from the file suffix."""
+        assert codec_for(Path("a.csv.gz")) == "gzip"
+        assert codec_for(Path("a.json.ZST")) == "zstd"
+        assert codec_for(Path("a.csv")) is None
+        assert strip_compression_suffix(Path("a.csv.gz")) == Path("a.csv")
+    
+    @pytest.mark.parametrize("suffix", CODEC_SUFFIXES)
+    def test_round_trip_and_append(self, suffix):
+        """Test text written and appended in two sessions reads back whole."""
+        path = self.dir / f"data.txt{suffix}"
+        
+        with open_file(path, "w") as f:
+            f.write("héllo\n")
+        with open_file(path, "a") as f:
+            f.write("world\n")
+        
+        with open_file(path) as f:
+            assert f.read() == "héllo\nworld\n"
+        assert path.read_bytes()[:6] != b"h\xc3\xa9llo"
+        assert uncompressed_size(path) == len("héllo\nworld\n".encode("utf-8"))
+    
+    @pytest.mark.parametrize("suffix", CODEC_SUFFIXES)
+    def test_sink_offsets_and_crash_recovery(self, suffix):
+        """Test sink offsets count uncompressed bytes and survive a crash."""
+        path = self.dir / f"out.csv{suffix}"
+        
+        sink = CsvSink(path, ["a", "b"]).open()
+        sink.write_rows([{"a": 1, "b": 2}])
+        offset = sink.tell()
+        sink.write_rows([{"a": 3, "b": 4}])
+        sink.tell()
+        # Simulate a crash: keep the flushed bytes, never close the stream
+        shutil.copy(path, self.dir / "crashed")
+        sink.close()
+        
+        assert offset == len("a,b\r\n1,2\r\n")
+        
+        recovered = self.dir / f"recovered.csv{suffix}"
+        copy_prefix(self.dir / "crashed", recovered, offset, compression=codec_for(path))
+        with CsvSink(recovered, ["a", "b"], append=True) as sink:
+            assert sink.tell() == offset
+            sink.write_rows([{"a": 5, "b": 6}])
+        
+        with open_file(recovered, newline="") as f:
+            assert f.read() == "a,b\r\n1,2\r\n5,6\r\n"
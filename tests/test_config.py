@@ -4,6 +4,7 @@ Tests for the configuration module.
 
 import pytest
 import os
+import subprocess
 from unittest.mock import patch, MagicMock
 from pathlib import Path
 import sys
@@ -14,7 +15,8 @@ sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
 # Set testing environment
 os.environ["TESTING"] = "true"
 
-from config import Config
+import config as config_module
+from config import Config, get_config
 
 
 class TestConfig:
@@ -64,3 +66,38 @@ class TestConfig:
             config = Config()
             assert config.api_key == 'test_key'
             assert config.api_base == 'https://test.com'
+    
+    def test_create_session(self):
+        """Test pooled session creation."""
+        with patch.dict(os.environ, {
+            'ELEVENLABS_API_KEY': 'test_key'
+        }):
+            config = Config()
+            session = config.create_session(pool_size=4)
+            
+            assert session.headers["xi-api-key"] == "test_key"
+            assert "gzip" in session.headers["Accept-Encoding"]
+            assert session.get_adapter("https://example.com")._pool_maxsize == 4
+    
+    def test_get_config_is_lazy_and_shared(self):
+        """Test that the configuration is built on first use and then reused."""
+        get_config.cache_clear()
+        try:
+            with patch.dict(os.environ, {'ELEVENLABS_API_KEY': 'lazy_key'}):
+                config = get_config()
+                assert config.api_key == 'lazy_key'
+                assert get_config() is config
+                assert config_module.config is config
+        finally:
+            get_config.cache_clear()
+    
+    def test_import_without_api_key(self):
+        """Test that importing the tools needs no API key and configures nothing."""
+        env = {key: value for key, value in os.environ.items()
+               if key not in ("ELEVENLABS_API_KEY", "TESTING")}
+        code = ("import logging, sys, batch_converter, batch_processor, batch_history; "
+                "assert not logging.getLogger().handlers; "
+                "assert 'requests' not in sys.modules")
+        result = subprocess.run([sys.executable, "-c", code], env=env, capture_output=True, text=True,
+                                cwd=Path(__file__).parent.parent / "src")
+        assert result.returncode == 0, result.stderr
@@ -0,0 +1,77 @@
+"""
+Tests for the incremental JSON parsing module.
+"""
+
+import io
+import json
+import pytest
+from pathlib import Path
+import sys
+
+# Add src to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from json_stream import iter_object, is_stream
+
+
+def _members(text, stream_keys=(), chunk_size=4):
+    """Materialize iter_object output, expanding streamed arrays."""
+    members = []
+    for key, value in iter_object(io.StringIO(text), stream_keys, chunk_size=chunk_size):
+        members.append((key, list(value) if is_stream(value) else value))
+    return members
+
+
+class TestIterObject:
+    """Test cases for iter_object."""
+    
+    def test_matches_json_load(self):
+        """Test that members match json.loads across tiny chunk boundaries."""
+        data = {
+            "id": "batch_1",
+            "count": 12345,
+            "ratio": 1.5e-3,
+            "flag": True,
+            "missing": None,
+            "recipients": [{"id": "r1", "n": [1, 2]}, {"id": "r2", "s": 'a "b" ,}'}],
+            "status": "completed"
+        }
+        text = json.dumps(data, indent=2)
+        
+        for chunk_size in (1, 3, 7, 64):
+            members = _members(text, ("recipients",), chunk_size)
+            assert dict(members) == data
+    
+    def test_streamed_array_is_iterator(self):
+        """Test that only requested keys are streamed."""
+        text = '{"a": [1, 2], "b": [3]}'
+        
+        values = dict(iter_object(io.StringIO(text), ("a",)))
+        
+        assert is_stream(values["a"])
+        assert values["b"] == [3]
+    
+    def test_unconsumed_stream_is_skipped(self):
+        """Test that members after an unread streamed array are still parsed."""
+        text = '{"items": [1, 2, 3], "after": "x"}'
+        
+        keys = [key for key, _ in iter_object(io.StringIO(text), ("items",))]
+        
+        assert keys == ["items", "after"]
+    
+    def test_empty_object_and_array(self):
+        """Test empty containers."""
+        assert _members("{}") == []
+        assert _members('{"items": []}', ("items",)) == [("items", [])]
+    
+    @pytest.mark.parametrize("text", [
+        "invalid json content",
+        '{"a": 1',
+        '{"a": [1, 2}',
+        '{"a": 1} trailing',
+        '{a: 1}'
+    ])
+    def test_invalid_json(self, text):
+        """Test that malformed documents raise ValueError."""
+        with pytest.raises(ValueError):
+            _members(text, ("a",))
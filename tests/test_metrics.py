@@ -0,0 +1,108 @@
+"""
+Tests for the metrics module.
+"""
+
+import json
+from pathlib import Path
+from unittest.mock import MagicMock
+import sys
+
+import pytest
+import requests
+
+# Add src to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from metrics import LatencyHistogram, RunMetrics
+from rate_limiter import RateLimiter
+from retry import RetryPolicy, send_with_retry
+from sinks import CsvSink
+
+
+class TestLatencyHistogram:
+    """Test cases for the LatencyHistogram class."""
+    
+    def test_quantiles(self):
+        """Test that quantiles land within a bucket of the true value."""
+        histogram = LatencyHistogram()
+        for millis in range(1, 1001):
+            histogram.observe(millis / 1000)
+        
+        assert histogram.count == 1000
+        assert histogram.max == 1.0
+        assert histogram.quantile(0.5) == pytest.approx(0.5, rel=0.25)
+        assert histogram.quantile(0.99) == pytest.approx(0.99, rel=0.25)
+        assert histogram.quantile(1.0) <= 1.0
+        assert LatencyHistogram().quantile(0.5) is None
+    
+    def test_overflow_bucket(self):
+        """Test latencies beyond the last bucket."""
+        histogram = LatencyHistogram(bounds=[0.1, 1])
+        histogram.observe(5)
+        
+        assert histogram.counts == [0, 0, 1]
+        assert histogram.quantile(0.5) == 5
+
+
+class TestRunMetrics:
+    """Test cases for the RunMetrics class."""
+    
+    def test_write_json(self, tmp_path):
+        """Test the JSON snapshot."""
+        metrics = RunMetrics("test")
+        metrics.record_request(200, 0.1, size=100)
+        metrics.record_request(429, 0.2)
+        metrics.record_request(None, 0.3)
+        metrics.increment("cache_hits", 2)
+        with CsvSink(tmp_path / "out.csv", ["a"]) as sink:
+            metrics.write_rows(sink, [{"a": "1"}, {"a": "2"}])
+        
+        metrics.write(tmp_path / "metrics.json")
+        
+        with open(tmp_path / "metrics.json", encoding='utf-8') as f:
+            data = json.load(f)
+        assert data["tool"] == "test"
+        assert data["requests"]["total"] == 3
+        assert data["requests"]["by_status"] == {"200": 1, "429": 1, "error": 1}
+        assert data["requests"]["bytes_downloaded"] == 100
+        assert data["requests"]["latency_seconds"]["max"] == pytest.approx(0.3)
+        assert data["rows"] == 2
+        assert set(data["stage_seconds"]) == {"http", "write"}
+        assert data["counters"] == {"cache_hits": 2}
+        assert "Metrics: 2 rows" in metrics.summary()
+    
+    def test_write_prometheus(self, tmp_path):
+        """Test the Prometheus text format for .prom files."""
+        metrics = RunMetrics("test")
+        metrics.record_request(200, 0.05)
+        metrics.record_request(200, 0.5)
+        
+        metrics.write(tmp_path / "metrics.prom")
+        
+        text = (tmp_path / "metrics.prom").read_text(encoding='utf-8')
+        assert '# TYPE elevenlabs_batch_request_duration_seconds histogram' in text
+        assert 'elevenlabs_batch_requests_total{tool="test",status="200"} 2' in text
+        assert 'elevenlabs_batch_request_duration_seconds_bucket{tool="test",le="+Inf"} 2' in text
+        assert 'elevenlabs_batch_request_duration_seconds_count{tool="test"} 2' in text
+
+
+class TestSendWithRetryMetrics:
+    """Test that send_with_retry records every attempt."""
+    
+    def test_records_statuses(self):
+        """Test that retried, failed and successful requests are recorded."""
+        throttled = MagicMock(status_code=429, headers={}, content=b"")
+        throttled.raise_for_status.side_effect = requests.exceptions.HTTPError(
+            "429", response=throttled
+        )
+        ok = MagicMock(status_code=200, headers={}, content=b'{"id": "b1"}')
+        session = MagicMock()
+        session.get.side_effect = [throttled, requests.exceptions.ConnectionError(), ok]
+        metrics = RunMetrics()
+        
+        send_with_retry(session, "http://api/batch", RateLimiter(rate=None),
+                        RetryPolicy(max_retries=2, base_delay=0), metrics=metrics)
+        
+        assert metrics.statuses == {"429": 1, "error": 1, "200": 1}
+        assert metrics.bytes_downloaded == len(ok.content)
+        assert metrics.latency.count == 3
@@ -0,0 +1,140 @@
+"""
+Tests for the mock_api module.
+"""
+
+import csv
+import json
+import os
+import random
+import tempfile
+import time
+from pathlib import Path
+import sys
+
+import pytest
+import requests
+
+# Add src to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+# Set testing environment
+os.environ["TESTING"] = "true"
+
+from batch_processor import BatchProcessor
+from mock_api import MockApi, MockApiServer, parse_latency
+from rate_limiter import RateLimiter
+from retry import CircuitBreaker, RetryPolicy
+
+
+class TestMockApi:
+    """Test cases for the mock API."""
+    
+    def test_parse_latency(self):
+        """Test the latency distribution specs."""
+        rng = random.Random(0)
+        
+        assert parse_latency("0.25")(rng) == 0.25
+        assert all(0.1 <= parse_latency("uniform:0.1,0.2")(rng) <= 0.2 for _ in range(100))
+        assert parse_latency("lognormal:0.05,0.5")(rng) > 0
+        with pytest.raises(ValueError):
+            parse_latency("gamma:1,2")
+    
+    def test_workspace_pagination(self):
+        """Test that following next_doc walks the whole listing once."""
+        api = MockApi(batches=25, recipients=2, max_page_size=10)
+        
+        with MockApiServer(api) as server:
+            ids = []
+            params = {"limit": 100}
+            while True:
+                page = requests.get(f"{server.url}/workspace", params=params).json()
+                ids.extend(batch["id"] for batch in page["batch_calls"])
+                if not page["has_more"]:
+                    break
+                params["last_doc"] = page["next_doc"]
+        
+        assert ids == [batch["id"] for batch in api.listing]
+        assert api.requests == 3
+    
+    def test_batch_payload(self):
+        """Test that batches carry unique recipients of the configured count."""
+        api = MockApi(batches=2, recipients=5)
+        
+        with MockApiServer(api) as server:
+            first = requests.get(f"{server.url}/{api.listing[0]['id']}").json()
+            unlisted = requests.get(f"{server.url}/btcal_unlisted").json()
+        
+        assert first["id"] == api.listing[0]["id"]
+        assert len(first["recipients"]) == 5
+        assert first["recipients"][0]["id"].startswith(api.listing[0]["id"])
+        assert unlisted["id"] == "btcal_unlisted"
+        assert {r["id"] for r in first["recipients"]}.isdisjoint(r["id"] for r in unlisted["recipients"])
+    
+    def test_keep_alive_latency(self):
+        """Test that kept-alive connections are reused and responses are not stalled."""
+        api = MockApi(batches=1, recipients=5)
+        
+        with MockApiServer(api) as server, requests.Session() as session:
+            url = f"{server.url}/{api.listing[0]['id']}"
+            # The first response on a new connection is never delayed
+            session.get(url)
+            timings = []
+            for _ in range(20):
+                start = time.perf_counter()
+                session.get(url).raise_for_status()
+                timings.append(time.perf_counter() - start)
+            pools = session.get_adapter(url).poolmanager.pools
+            connections = [pools[key].num_connections for key in pools.keys()]
+        
+        assert connections == [1]
+        # A Nagle/delayed ACK stall would add about 40 ms to every response,
+        # so even the fastest one would be slow
+        assert min(timings) < 0.035
+    
+    def test_batch_id_escaped(self):
+        """Test that batch IDs are escaped inside the recipients payload."""
+        api = MockApi(batches=1, recipients=2)
+        
+        body = api.batch('btcal_"quoted"\\id')
+        
+        assert json.loads(body)["recipients"][0]["id"].startswith('btcal_"quoted"\\id_')
+    
+    def test_fault_injection(self):
+        """Test 429 responses with Retry-After, 5xx responses and the API key check."""
+        with MockApiServer(MockApi(batches=1, throttle_rate=1.0, retry_after="3")) as server:
+            throttled = requests.get(f"{server.url}/btcal_x")
+        with MockApiServer(MockApi(batches=1, error_rate=1.0)) as server:
+            failed = requests.get(f"{server.url}/btcal_x")
+        with MockApiServer(MockApi(batches=1, api_key="secret")) as server:
+            unauthorized = requests.get(f"{server.url}/btcal_x", headers={"xi-api-key": "wrong"})
+        
+        assert throttled.status_code == 429
+        assert throttled.headers["Retry-After"] == "3"
+        assert failed.status_code in (500, 502, 503)
+        assert unauthorized.status_code == 401
+    
+    def test_processor_against_mock(self):
+        """Test that the processor fetches every batch despite injected faults."""
+        api = MockApi(batches=20, recipients=3, throttle_rate=0.2, error_rate=0.1, retry_after="0")
+        processor = BatchProcessor(
+            rate_limit_delay=0,
+            max_workers=4,
+            rate_limiter=RateLimiter(None),
+            retry_policy=RetryPolicy(max_retries=10, base_delay=0, max_delay=0),
+            circuit_breaker=CircuitBreaker(reset_timeout=0)
+        )
+        
+        with tempfile.TemporaryDirectory() as temp_dir:
+            batch_list = Path(temp_dir) / "batches.csv"
+            output = Path(temp_dir) / "recipients.csv"
+            batch_list.write_text("id\n" + "\n".join(batch["id"] for batch in api.listing) + "\n")
+            
+            with MockApiServer(api) as server:
+                processor.api_base = server.url
+                processor.process_batch_list(batch_list, output)
+            
+            with open(output, newline='') as f:
+                rows = list(csv.DictReader(f))
+        
+        assert len(rows) == 20 * 3
+        assert api.statuses[429] > 0
@@ -0,0 +1,113 @@
+"""
+Tests for the phone index module.
+"""
+
+import csv
+import gzip
+import tempfile
+from pathlib import Path
+import sys
+
+# Add src to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from phone_index import PhoneIndex, main, normalize_phone
+
+
+def _row(batch_id, recipient_id, phone, status="completed", updated_at=100):
+    """Build a recipient row with the fields the index uses."""
+    return {
+        "batch_id": batch_id,
+        "recipient_id": recipient_id,
+        "phone_number": phone,
+        "recipient_status": status,
+        "recipient_updated_at_unix": updated_at,
+        "conversation_id": f"conv_{recipient_id}"
+    }
+
+
+class TestPhoneIndex:
+    """Test cases for the PhoneIndex class."""
+    
+    def setup_method(self):
+        """Set up test fixtures."""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.index_file = Path(self.temp_dir.name) / "phones.idx"
+    
+    def teardown_method(self):
+        """Clean up test fixtures."""
+        self.temp_dir.cleanup()
+    
+    def test_lookup_across_batches(self):
+        """Test that a number is found in every batch it appeared in."""
+        with PhoneIndex(self.index_file, transaction_rows=2) as index:
+            assert index.write_rows([
+                _row("b1", "r1", "+62 812-345", updated_at=100),
+                _row("b1", "r2", "+62999"),
+                _row("b2", "r3", "+62812345", updated_at=200),
+                _row("b2", "r4", "")
+            ]) == 3
+        
+        with PhoneIndex(self.index_file) as index:
+            entries = index.lookup("+62 (812) 345")
+        
+        assert [entry["batch_id"] for entry in entries] == ["b2", "b1"]
+        assert entries[0] == {
+            "phone_number": "+62812345",
+            "recipient_id": "r3",
+            "batch_id": "b2",
+            "conversation_id": "conv_r3",
+            "recipient_status": "completed",
+            "updated_at": 200
+        }
+    
+    def test_incremental_update_keeps_latest(self):
+        """Test that re-indexing a recipient updates it but never with older data."""
+        with PhoneIndex(self.index_file) as index:
+            index.write_rows([_row("b1", "r1", "+1555", status="pending", updated_at=100)])
+            index.write_rows([_row("b1", "r1", "+1555", status="completed", updated_at=300)])
+            index.write_rows([_row("b1", "r1", "+1555", status="pending", updated_at=200)])
+            entries = index.lookup("+1555")
+        
+        assert len(entries) == 1
+        assert entries[0]["recipient_status"] == "completed"
+    
+    def test_build_from_compressed_csv(self):
+        """Test that the build command reads gzip-compressed recipients CSVs."""
+        recipients_csv = Path(self.temp_dir.name) / "recipients.csv.gz"
+        with gzip.open(recipients_csv, 'wt', newline='') as f:
+            writer = csv.DictWriter(f, fieldnames=list(_row("b1", "r1", "+1555")))
+            writer.writeheader()
+            writer.writerow(_row("b1", "r1", "+1555"))
+        
+        assert main(["build", str(self.index_file), str(recipients_csv)]) == 0
+        
+        with PhoneIndex(self.index_file) as index:
+            assert [entry["recipient_id"] for entry in index.lookup("+1555")] == ["r1"]
+    
+    def test_build_with_profile(self):
+        """Test that --profile writes the profile and its report."""
+        recipients_csv = Path(self.temp_dir.name) / "recipients.csv"
+        profile = Path(self.temp_dir.name) / "build.prof"
+        with open(recipients_csv, 'w', newline='') as f:
+            writer = csv.DictWriter(f, fieldnames=list(_row("b1", "r1", "+1555")))
+            writer.writeheader()
+            writer.writerow(_row("b1", "r1", "+1555"))
+        
+        assert main(["build", "--profile", str(profile), str(self.index_file), str(recipients_csv)]) == 0
+        
+        assert profile.exists()
+        assert Path(str(profile) + ".txt").exists()
+    
+    def test_non_integer_update_time(self):
+        """Test that an update time that is not an integer is stored as unknown."""
+        with PhoneIndex(self.index_file) as index:
+            assert index.write_rows([_row("b1", "r1", 15551234, updated_at="called")]) == 1
+            entries = index.lookup("15551234")
+        
+        assert entries[0]["updated_at"] is None
+    
+    def test_normalize_phone(self):
+        """Test phone number normalization."""
+        assert normalize_phone(" +1 (555) 010-99.1 ") == "+1555010991"
+        assert normalize_phone(None) == ""
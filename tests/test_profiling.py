@@ -0,0 +1,74 @@
+"""
+Tests for the profiling module.
+"""
+
+import pstats
+import threading
+from pathlib import Path
+import sys
+
+# Add src to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from metrics import RunMetrics
+from profiling import Profiler
+from sinks import CsvSink
+
+
+def _build_rows(count):
+    """Build rows lazily, standing in for extract_recipients."""
+    for index in range(count):
+        yield {"id": f"row_{index}", "payload": "x" * 100}
+
+
+def _worker_task():
+    """Do some work on a worker thread."""
+    return sum(len(str(number)) for number in range(20000))
+
+
+class TestProfiler:
+    """Test cases for the Profiler class."""
+    
+    def test_profiles_stages_and_threads(self, tmp_path):
+        """Test that stages, worker threads and both output files are recorded."""
+        profiler = Profiler(tmp_path / "run.prof", top=5)
+        metrics = RunMetrics("test", profiler=profiler)
+        
+        profiler.start()
+        try:
+            with metrics.timed("parse"):
+                data = [{"n": n} for n in range(1000)]
+            thread = threading.Thread(target=_worker_task)
+            thread.start()
+            thread.join()
+            with CsvSink(tmp_path / "out.csv", ["id", "payload"]) as sink:
+                metrics.write_rows(sink, _build_rows(500))
+                metrics.write_rows(sink, _build_rows(500))
+        finally:
+            profiler.stop()
+        
+        assert data
+        assert set(profiler.stages) == {"parse", "build", "write"}
+        assert profiler.stages["build"].calls == 2
+        assert profiler.stages["parse"].top
+        assert metrics.rows == 1000
+        assert "build" in metrics.stage_seconds
+        
+        functions = {name for _, _, name in pstats.Stats(str(tmp_path / "run.prof")).stats}
+        assert "_worker_task" in functions
+        assert "_build_rows" in functions
+        
+        report = (tmp_path / "run.prof.txt").read_text(encoding='utf-8')
+        assert "Top 5 functions by own time" in report
+        assert "parse: 1 calls" in report
+        assert profiler.summary().startswith("Profile:")
+    
+    def test_without_profiler(self, tmp_path):
+        """Test that rows are streamed, not collected, when not profiling."""
+        metrics = RunMetrics("test")
+        
+        with CsvSink(tmp_path / "out.csv", ["id", "payload"]) as sink:
+            metrics.write_rows(sink, _build_rows(10))
+        
+        assert set(metrics.stage_seconds) == {"write"}
+        assert metrics.rows == 10
@@ -0,0 +1,82 @@
+"""
+Tests for the projection module.
+"""
+
+import pickle
+from pathlib import Path
+import sys
+
+import pytest
+
+# Add src to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from projection import DEFAULT_PROJECTION, Projection
+from records import FIELDNAMES, RecipientRecord
+
+
+class TestProjection:
+    """Test cases for the Projection class."""
+    
+    def setup_method(self):
+        """Set up test fixtures."""
+        self.batch_data = {
+            "id": "batch_1",
+            "name": "Batch",
+            "status": "completed",
+            "metadata": {"source": "crm"},
+            "recipients": [
+                {
+                    "id": "r1",
+                    "phone_number": "+100",
+                    "conversation_initiation_client_data": {
+                        "dynamic_variables": {"city": "Paris", "customer_name": "Ana"}
+                    },
+                    "tags": ["vip", "new"]
+                },
+                {
+                    "id": "r2",
+                    "conversation_initiation_client_data": None
+                }
+            ]
+        }
+    
+    def test_default_columns(self):
+        """Test the standard projection matches the recipients CSV layout."""
+        records = list(DEFAULT_PROJECTION.iter_records(self.batch_data))
+        
+        assert DEFAULT_PROJECTION.fieldnames == list(FIELDNAMES)
+        assert type(records[0]) is RecipientRecord
+        assert records[0]["batch_name"] == "Batch"
+        assert records[0]["recipient_id"] == "r1"
+        assert records[0]["city"] == "Paris"
+        assert records[1]["city"] == ""
+        assert records[1]["phone_number"] is None
+        assert records[0].batch is records[1].batch
+    
+    def test_selected_columns_and_paths(self):
+        """Test column selection, dynamic variables and nested paths in spec order."""
+        projection = Projection.parse(
+            "phone_number, var.customer_name, source=batch.metadata.source, recipient.tags.0, batch_id"
+        )
+        records = list(projection.iter_records(self.batch_data))
+        
+        assert projection.fieldnames == ["phone_number", "customer_name", "source", "0", "batch_id"]
+        assert projection.batch_keys == ("metadata", "id")
+        assert records[0].as_tuple() == ("+100", "Ana", "crm", "vip", "batch_1")
+        assert records[1].as_tuple() == (None, "", "crm", None, "batch_1")
+        assert dict(records[0])["source"] == "crm"
+    
+    def test_invalid_columns(self):
+        """Test unknown and duplicate columns are rejected."""
+        with pytest.raises(ValueError, match="Unknown column"):
+            Projection(["not_a_column"])
+        with pytest.raises(ValueError, match="Duplicate column"):
+            Projection(["city", "var.city"])
+    
+    def test_pickle(self):
+        """Test projections can be sent to worker processes."""
+        projection = pickle.loads(pickle.dumps(Projection(["batch_id", "var.city"])))
+        
+        record = projection.record(projection.header(self.batch_data), self.batch_data["recipients"][0])
+        assert record.as_tuple() == ("batch_1", "Paris")
@@ -0,0 +1,150 @@
+"""
+Tests for the rate limiter module.
+"""
+
+import threading
+import time
+from pathlib import Path
+import sys
+
+# Add src to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from rate_limiter import AdaptiveRateLimiter, RateLimiter, parse_retry_after
+
+
+class TestRateLimiter:
+    """Test cases for the RateLimiter class."""
+    
+    def test_burst_is_not_delayed(self):
+        """Test that requests within the burst are granted immediately."""
+        limiter = RateLimiter(rate=1, burst=3)
+        
+        assert [limiter.reserve() for _ in range(3)] == [0.0, 0.0, 0.0]
+        assert limiter.reserve() > 0
+    
+    def test_reserve_queues_callers(self):
+        """Test that each caller waits one interval longer than the previous one."""
+        limiter = RateLimiter(rate=10, burst=1)
+        
+        waits = [limiter.reserve() for _ in range(3)]
+        
+        assert waits[0] == 0.0
+        assert abs(waits[1] - 0.1) < 0.01
+        assert abs(waits[2] - 0.2) < 0.01
+    
+    def test_unlimited(self):
+        """Test that a zero rate disables limiting."""
+        limiter = RateLimiter.from_delay(0)
+        
+        assert limiter.rate is None
+        assert all(limiter.reserve() == 0.0 for _ in range(100))
+    
+    def test_from_delay(self):
+        """Test creating a limiter from a delay between requests."""
+        limiter = RateLimiter.from_delay(0.5, burst=2)
+        
+        assert limiter.rate == 2.0
+        assert limiter.burst == 2
+    
+    def test_acquire_shared_across_threads(self):
+        """Test that the global rate holds when several threads share a limiter."""
+        limiter = RateLimiter(rate=50, burst=1)
+        
+        def worker():
+            for _ in range(3):
+                limiter.acquire()
+        
+        start = time.monotonic()
+        threads = [threading.Thread(target=worker) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        
+        # 12 requests at 50/s with a burst of 1 take at least 11 intervals
+        assert time.monotonic() - start >= 11 / 50 - 0.01
+    
+    def test_pause_holds_back_requests(self):
+        """Test that a pause delays the next request."""
+        limiter = RateLimiter(rate=None)
+        limiter.pause(0.5)
+        
+        assert 0.4 < limiter.reserve() <= 0.5
+    
+    def test_pause_spaces_out_queued_requests(self):
+        """Test that requests queued during a pause are not released at once."""
+        limiter = RateLimiter(rate=10, burst=5)
+        limiter.pause(1)
+        
+        first, second = limiter.reserve(), limiter.reserve()
+        
+        assert first >= 1
+        assert abs((second - first) - 0.1) < 0.01
+
+
+class TestAdaptiveRateLimiter:
+    """Test cases for the AdaptiveRateLimiter class."""
+    
+    def test_throttle_cuts_rate(self):
+        """Test multiplicative decrease on 429."""
+        limiter = AdaptiveRateLimiter(rate=800, min_rate=100)
+        
+        limiter.on_throttled(0)
+        assert limiter.rate == 400
+        for _ in range(3):
+            time.sleep(0.02)
+            limiter.on_throttled(0)
+        assert limiter.rate == 100
+        assert limiter.throttled == 4
+    
+    def test_one_cut_per_congestion_window(self):
+        """Test that concurrent 429s cut the rate only once."""
+        limiter = AdaptiveRateLimiter(rate=8, min_rate=1)
+        barrier = threading.Barrier(8)
+        
+        def throttled():
+            barrier.wait()
+            limiter.on_throttled(0)
+        
+        threads = [threading.Thread(target=throttled) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        
+        assert limiter.rate == 4
+        assert limiter.throttled == 8
+    
+    def test_success_ramps_up_to_max_rate(self):
+        """Test additive increase while healthy."""
+        limiter = AdaptiveRateLimiter(rate=2, max_rate=4, increase=1)
+        
+        limiter.on_success()
+        assert limiter.rate == 2.5
+        for _ in range(100):
+            limiter.on_success()
+        assert limiter.rate == 4
+    
+    def test_retry_after_pauses(self):
+        """Test that Retry-After holds back the next request."""
+        limiter = AdaptiveRateLimiter(rate=100)
+        
+        limiter.on_throttled(2)
+        
+        assert limiter.reserve() >= 2
+
+
+class TestParseRetryAfter:
+    """Test cases for parse_retry_after."""
+    
+    def test_seconds(self):
+        """Test delay-seconds values."""
+        assert parse_retry_after("3") == 3.0
+        assert parse_retry_after(None) is None
+        assert parse_retry_after("soon") is None
+    
+    def test_http_date(self):
+        """Test HTTP-date values."""
+        assert parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT") == 0.0
+        assert 0 < parse_retry_after("Fri, 31 Dec 2100 23:59:59 GMT")
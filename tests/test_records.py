@@ -0,0 +1,49 @@
+"""
+Tests for the records module.
+"""
+
+from pathlib import Path
+import sys
+
+# Add src to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from records import FIELDNAMES, RecipientRecord
+from projection import DEFAULT_PROJECTION
+
+
+class TestRecipientRecord:
+    """Test cases for the RecipientRecord class."""
+    
+    def setup_method(self):
+        """Set up test fixtures."""
+        self.header = DEFAULT_PROJECTION.header({
+            "id": "batch_1",
+            "name": "Batch",
+            "status": "completed"
+        })
+        self.record = RecipientRecord(self.header, ("r1", "+100", "completed", 1, 2, "conv_1", "Paris"))
+    
+    def test_mapping_access(self):
+        """Test records can be read like row dictionaries."""
+        assert self.record["batch_id"] == "batch_1"
+        assert self.record["city"] == "Paris"
+        assert self.record["agent_id"] is None
+        assert self.record.get("missing", "x") == "x"
+        assert list(self.record) == list(FIELDNAMES)
+        assert dict(self.record)["recipient_status"] == "completed"
+    
+    def test_as_tuple_in_column_order(self):
+        """Test values come out in CSV column order."""
+        values = self.record.as_tuple()
+        
+        assert len(values) == len(FIELDNAMES)
+        assert values[FIELDNAMES.index("batch_name")] == "Batch"
+        assert values[FIELDNAMES.index("conversation_id")] == "conv_1"
+    
+    def test_records_share_header(self):
+        """Test batch fields are stored once per batch, not per record."""
+        other = RecipientRecord(self.header, ("r2",) + (None,) * 6)
+        
+        assert other.batch is self.record.batch
+        assert not hasattr(self.record, "__dict__")
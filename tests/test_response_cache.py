@@ -0,0 +1,111 @@
+"""
+Tests for the response cache module.
+"""
+
+import json
+import os
+import tempfile
+import time
+from pathlib import Path
+import sys
+
+# Add src to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from config import Config
+from response_cache import ResponseCache
+
+
+class TestResponseCache:
+    """Test cases for the ResponseCache class."""
+    
+    def test_put_and_get(self):
+        """Test storing and reading back a response."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            cache = ResponseCache(Path(temp_dir))
+            data = {"id": "batch_1", "status": "in_progress", "recipients": []}
+            
+            assert cache.get("batch_1") is None
+            cache.put("batch_1", data)
+            
+            assert cache.get("batch_1") == data
+            assert (cache.hits, cache.misses) == (1, 1)
+    
+    def test_active_batch_expires(self):
+        """Test that active batches go stale after the TTL."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            cache = ResponseCache(Path(temp_dir), ttl=0)
+            cache.put("batch_1", {"id": "batch_1", "status": "in_progress"})
+            time.sleep(0.01)
+            
+            assert cache.get("batch_1") is None
+    
+    def test_completed_batch_never_expires(self):
+        """Test that completed batches are cached forever."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            cache = ResponseCache(Path(temp_dir), ttl=0)
+            cache.put("batch_1", {"id": "batch_1", "status": "completed"})
+            time.sleep(0.01)
+            
+            assert cache.get("batch_1")["status"] == "completed"
+    
+    def test_refresh_ignores_entries(self):
+        """Test that refresh mode skips reads but still writes."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            ResponseCache(Path(temp_dir)).put("batch_1", {"status": "completed"})
+            cache = ResponseCache(Path(temp_dir), refresh=True)
+            
+            assert cache.get("batch_1") is None
+            cache.put("batch_1", {"status": "completed", "v": 2})
+            
+            assert ResponseCache(Path(temp_dir)).get("batch_1")["v"] == 2
+    
+    def test_eviction_removes_least_recently_used(self):
+        """Test that the cache stays under max_bytes."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            cache = ResponseCache(Path(temp_dir), max_bytes=250)
+            payload = "x" * 100
+            
+            cache.put("batch_1", {"status": "completed", "p": payload})
+            os.utime(cache._path("batch_1"), (1, 1))
+            cache.put("batch_2", {"status": "completed", "p": payload})
+            
+            assert cache.get("batch_1") is None
+            assert cache.get("batch_2") is not None
+            assert cache._size <= 250
+    
+    def test_unsafe_batch_id(self):
+        """Test that batch IDs are never used as raw paths."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            cache = ResponseCache(Path(temp_dir))
+            cache.put("../escape", {"status": "completed"})
+            
+            assert cache._path("../escape").parent == cache.cache_dir
+            assert cache.get("../escape") == {"status": "completed"}
+    
+    def test_accounts_do_not_share_entries(self):
+        """Test that entries are kept apart per API base URL and key."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            config = Config(api_key="key_a", api_base="https://a.example")
+            ResponseCache(Path(temp_dir), config=config).put("batch_1", {"status": "completed"})
+            
+            other_key = Config(api_key="key_b", api_base="https://a.example")
+            other_base = Config(api_key="key_a", api_base="https://b.example")
+            assert ResponseCache(Path(temp_dir), config=other_key).get("batch_1") is None
+            assert ResponseCache(Path(temp_dir), config=other_base).get("batch_1") is None
+            assert ResponseCache(Path(temp_dir), config=config).get("batch_1") is not None
+            assert not any("key_a" in path.name for path in Path(temp_dir).rglob("*"))
+    
+    def test_malformed_entry_is_a_miss(self):
+        """Test that entries with an unexpected layout are ignored."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            cache = ResponseCache(Path(temp_dir))
+            malformed = [
+                ["not", "an", "object"],
+                {"data": {"status": "completed"}},
+                {"data": {"status": "completed"}, "fetched_at": "yesterday"},
+            ]
+            for entry in malformed:
+                cache._path("batch_1").write_text(json.dumps(entry), encoding="utf-8")
+                assert cache.get("batch_1") is None
+            assert cache.misses == len(malformed)
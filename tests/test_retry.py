@@ -0,0 +1,155 @@
+"""
+Tests for the retry module.
+"""
+
+import threading
+import time
+from pathlib import Path
+from unittest.mock import MagicMock
+import sys
+
+import pytest
+import requests
+
+# Add src to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from rate_limiter import RateLimiter
+from retry import CircuitBreaker, RetryPolicy, send_with_retry
+
+
+def _response(status_code):
+    """Build a mocked response with the given status code."""
+    response = MagicMock(status_code=status_code, headers={})
+    if status_code >= 400:
+        response.raise_for_status.side_effect = requests.exceptions.HTTPError(
+            str(status_code), response=response
+        )
+    return response
+
+
+class TestRetryPolicy:
+    """Test cases for the RetryPolicy class."""
+    
+    def test_is_retryable(self):
+        """Test that only transient failures are retried."""
+        policy = RetryPolicy()
+        
+        assert policy.is_retryable(requests.exceptions.Timeout())
+        assert policy.is_retryable(requests.exceptions.ConnectionError())
+        assert policy.is_retryable(_response(503).raise_for_status.side_effect)
+        assert not policy.is_retryable(_response(404).raise_for_status.side_effect)
+        assert not policy.is_retryable(requests.exceptions.RequestException())
+    
+    def test_backoff_is_bounded(self):
+        """Test exponential growth with jitter and a cap."""
+        policy = RetryPolicy(base_delay=1, max_delay=5)
+        
+        assert all(0 <= policy.backoff(1) <= 1 for _ in range(50))
+        assert all(0 <= policy.backoff(3) <= 4 for _ in range(50))
+        assert all(0 <= policy.backoff(10) <= 5 for _ in range(50))
+
+
+class TestCircuitBreaker:
+    """Test cases for the CircuitBreaker class."""
+    
+    def test_opens_after_threshold_and_probes(self):
+        """Test that requests pause once the threshold is reached."""
+        breaker = CircuitBreaker(failure_threshold=2, reset_timeout=0.2)
+        
+        breaker.record_failure()
+        breaker.before_request()
+        breaker.record_failure()
+        assert breaker.opened == 1
+        
+        start = time.monotonic()
+        breaker.before_request()
+        assert time.monotonic() - start >= 0.15
+        
+        breaker.record_success()
+        start = time.monotonic()
+        breaker.before_request()
+        assert time.monotonic() - start < 0.05
+    
+    def test_only_one_probe_at_a_time(self):
+        """Test that other workers wait for the probe result."""
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0.05)
+        breaker.record_failure()
+        breaker.before_request()
+        released = threading.Event()
+        
+        def worker():
+            breaker.before_request()
+            released.set()
+        
+        thread = threading.Thread(target=worker)
+        thread.start()
+        assert not released.wait(0.03)
+        
+        breaker.record_success()
+        assert released.wait(1)
+        thread.join()
+    
+    def test_allow_does_not_block(self):
+        """Test the non-blocking check used by the asyncio engine."""
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0.2)
+        assert breaker.allow() == 0
+        
+        breaker.record_failure()
+        assert 0.15 < breaker.allow() <= 0.2
+        
+        time.sleep(0.2)
+        assert breaker.allow() == 0
+        assert breaker.allow() > 0
+        breaker.record_success()
+        assert breaker.allow() == 0
+
+
+class TestSendWithRetry:
+    """Test cases for send_with_retry."""
+    
+    def setup_method(self):
+        """Set up test fixtures."""
+        self.session = MagicMock()
+        self.limiter = RateLimiter(rate=None)
+        self.policy = RetryPolicy(max_retries=2, base_delay=0)
+    
+    def test_retries_transient_errors(self):
+        """Test that 5xx and timeouts are retried until success."""
+        ok = _response(200)
+        self.session.get.side_effect = [_response(503), requests.exceptions.Timeout(), ok]
+        
+        response = send_with_retry(self.session, "http://api/batch", self.limiter, self.policy)
+        
+        assert response is ok
+        assert self.policy.stats.retries == 2
+    
+    def test_gives_up_after_max_retries(self):
+        """Test that the last error is raised once retries run out."""
+        self.session.get.return_value = _response(502)
+        
+        with pytest.raises(requests.exceptions.HTTPError):
+            send_with_retry(self.session, "http://api/batch", self.limiter, self.policy)
+        
+        assert self.session.get.call_count == 3
+    
+    def test_does_not_retry_client_errors(self):
+        """Test that a 404 fails immediately."""
+        self.session.get.return_value = _response(404)
+        
+        with pytest.raises(requests.exceptions.HTTPError):
+            send_with_retry(self.session, "http://api/batch", self.limiter, self.policy)
+        
+        assert self.session.get.call_count == 1
+    
+    def test_requeues_rate_limited(self):
+        """Test that 429 responses are requeued without using retries."""
+        ok = _response(200)
+        self.session.get.side_effect = [_response(429), _response(429), _response(429), ok]
+        self.limiter.on_throttled = MagicMock()
+        
+        response = send_with_retry(self.session, "http://api/batch", self.limiter, self.policy)
+        
+        assert response is ok
+        assert self.policy.stats.requeues == 3
+        assert self.policy.stats.retries == 0
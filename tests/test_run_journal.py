@@ -0,0 +1,56 @@
+"""
+Tests for the run journal module.
+"""
+
+import tempfile
+from pathlib import Path
+import sys
+
+# Add src to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from run_journal import RunJournal
+
+
+class TestRunJournal:
+    """Test cases for the RunJournal class."""
+    
+    def test_record_and_load(self):
+        """Test that recorded batches are read back."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = Path(temp_dir) / "run.journal"
+            
+            with RunJournal(path).open() as journal:
+                journal.record_done("batch_1", 3, 120)
+                journal.record_failed("batch_2")
+            
+            journal = RunJournal(path).load()
+            
+            assert journal.completed == {"batch_1"}
+            assert journal.failed == {"batch_2"}
+            assert journal.last_offset == 120
+    
+    def test_resume_after_truncated_line(self):
+        """Test that a line cut short by a crash is ignored and does not corrupt new entries."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = Path(temp_dir) / "run.journal"
+            path.write_text('{"batch_id": "batch_1", "status": "done", "rows": 1, "offset": 50}\n'
+                            '{"batch_id": "batch_2", "sta')
+            
+            with RunJournal(path).open(resume=True) as journal:
+                assert journal.completed == {"batch_1"}
+                journal.record_done("batch_3", 1, 80)
+            
+            assert RunJournal(path).load().completed == {"batch_1", "batch_3"}
+    
+    def test_open_without_resume_starts_over(self):
+        """Test that a new run discards the previous journal."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = Path(temp_dir) / "run.journal"
+            
+            with RunJournal(path).open() as journal:
+                journal.record_done("batch_1", 1, 50)
+            with RunJournal(path).open() as journal:
+                assert journal.completed == set()
+            
+            assert RunJournal(path).load().completed == set()
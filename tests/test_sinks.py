@@ -0,0 +1,206 @@
+"""
+Tests for the sinks module.
+"""
+
+import csv
+import json
+import sqlite3
+import tempfile
+from pathlib import Path
+import sys
+
+# Add src to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from compression import open_file
+from records import FIELDNAMES
+from sinks import BATCH_COLUMNS, CsvSink, PartitionedSink, SqliteSink, open_sink
+
+
+class TestCsvSink:
+    """Test cases for the CsvSink class."""
+    
+    def test_write_rows(self):
+        """Test writing rows in several calls."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            output = Path(temp_dir) / "out.csv"
+            
+            with CsvSink(output, ["a", "b"]) as sink:
+                assert sink.write_rows([{"a": 1, "b": 2}]) == 1
+                assert sink.write_rows([{"a": 3}, {"b": 4}]) == 2
+            
+            assert sink.rows_written == 3
+            with open(output, newline='') as f:
+                rows = list(csv.DictReader(f))
+            
+            assert rows == [
+                {"a": "1", "b": "2"},
+                {"a": "3", "b": ""},
+                {"a": "", "b": "4"}
+            ]
+    
+    def test_header_written_without_rows(self):
+        """Test the fixed header is written even when no rows arrive."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            output = Path(temp_dir) / "out.csv"
+            
+            with CsvSink(output, ["a", "b"]):
+                pass
+            
+            assert output.read_text().splitlines() == ["a,b"]
+
+
+def _row(batch_id, recipient_id, status="completed", phone="+100"):
+    """Build a recipient row in the CSV layout."""
+    row = {column: "" for column in BATCH_COLUMNS}
+    row.update({
+        "batch_id": batch_id,
+        "batch_name": f"Batch {batch_id}",
+        "total_calls_dispatched": 2,
+        "recipient_id": recipient_id,
+        "phone_number": phone,
+        "recipient_status": status,
+        "recipient_created_at_unix": 1,
+        "recipient_updated_at_unix": 2,
+        "conversation_id": f"conv_{recipient_id}",
+        "city": "Jakarta"
+    })
+    return row
+
+
+class TestSqliteSink:
+    """Test cases for the SqliteSink class."""
+    
+    def test_write_rows_and_upsert(self):
+        """Test that writing the same recipients again updates them."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            db_file = Path(temp_dir) / "recipients.db"
+            
+            with SqliteSink(db_file, transaction_rows=2) as sink:
+                assert sink.write_rows([_row("b1", "r1"), _row("b1", "r2"), _row("b2", "r3")]) == 3
+            
+            with SqliteSink(db_file) as sink:
+                sink.write_rows([_row("b1", "r1", status="failed", phone="+200")])
+            
+            conn = sqlite3.connect(str(db_file))
+            try:
+                assert conn.execute("SELECT COUNT(*) FROM recipients").fetchone()[0] == 3
+                assert conn.execute("SELECT COUNT(*) FROM batches").fetchone()[0] == 2
+                row = conn.execute(
+                    "SELECT recipient_status, total_calls_dispatched, batch_name "
+                    "FROM batch_recipients WHERE phone_number = ?", ("+200",)
+                ).fetchone()
+                indexes = {name for (name,) in conn.execute(
+                    "SELECT name FROM sqlite_master WHERE type = 'index' AND tbl_name = 'recipients'"
+                )}
+            finally:
+                conn.close()
+            
+            assert row == ("failed", 2, "Batch b1")
+            assert {"idx_recipients_batch_id", "idx_recipients_phone_number",
+                    "idx_recipients_conversation_id", "idx_recipients_status"} <= indexes
+    
+    def test_rows_without_recipient_id_skipped(self):
+        """Test that rows without a recipient_id are not inserted again on every write."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            db_file = Path(temp_dir) / "recipients.db"
+            
+            for _ in range(2):
+                with SqliteSink(db_file) as sink:
+                    assert sink.write_rows([_row("b1", "r1"), _row("b1", ""), _row("b1", None)]) == 1
+                    assert sink.rows_skipped == 2
+            
+            conn = sqlite3.connect(str(db_file))
+            try:
+                assert conn.execute("SELECT COUNT(*) FROM recipients").fetchone()[0] == 1
+            finally:
+                conn.close()
+    
+    def test_open_sink_by_suffix(self):
+        """Test that the sink type follows the output file suffix."""
+        assert isinstance(open_sink(Path("out.sqlite"), list(FIELDNAMES)), SqliteSink)
+        assert isinstance(open_sink(Path("out.csv"), ["a"]), CsvSink)
+
+
+class TestPartitionedSink:
+    """Test cases for the PartitionedSink class."""
+    
+    def _read_parts(self, output_dir):
+        """Read the manifest and the rows of every part it lists."""
+        with open(output_dir / "manifest.json") as f:
+            manifest = json.load(f)
+        rows = {}
+        for part in manifest["parts"]:
+            with open_file(output_dir / part["path"], newline='') as f:
+                rows[part["path"]] = list(csv.DictReader(f))
+        return manifest, rows
+    
+    def test_roll_over_by_rows(self):
+        """Test that a new part starts every max_rows rows."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            output_dir = Path(temp_dir) / "out"
+            
+            with PartitionedSink(output_dir, ["a"], max_rows=2) as sink:
+                sink.write_rows([{"a": 1}, {"a": 2}, {"a": 3}])
+                sink.write_rows([{"a": 4}])
+            
+            manifest, rows = self._read_parts(output_dir)
+            
+            assert manifest["rows"] == 4
+            assert [(part["path"], part["rows"]) for part in manifest["parts"]] == [
+                ("part-00000.csv", 2), ("part-00001.csv", 2)
+            ]
+            assert rows["part-00001.csv"] == [{"a": "3"}, {"a": "4"}]
+    
+    def test_partition_by_created_date(self):
+        """Test splitting rows into one directory per UTC creation date."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            output_dir = Path(temp_dir) / "out"
+            day = 1700000000  # 2023-11-14 UTC
+            rows = [
+                {"batch_id": "b1", "created_at_unix": day},
+                {"batch_id": "b2", "created_at_unix": day + 86400},
+                {"batch_id": "b3", "created_at_unix": day}
+            ]
+            
+            with PartitionedSink(output_dir, ["batch_id", "created_at_unix"],
+                                 partition_by="created_date") as sink:
+                assert sink.write_rows(rows) == 3
+            
+            manifest, parts = self._read_parts(output_dir)
+            
+            assert {part["partition"]: part["rows"] for part in manifest["parts"]} == {
+                "2023-11-14": 2, "2023-11-15": 1
+            }
+            ids = [row["batch_id"] for row in parts["created_date=2023-11-14/part-00000.csv"]]
+            assert ids == ["b1", "b3"]
+    
+    def test_rewrite_replaces_previous_parts(self):
+        """Test that parts of a previous run are removed and checksums are stable."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            output_dir = Path(temp_dir) / "out"
+            rows = [{"agent_id": "x/1"}, {"agent_id": "y"}]
+            
+            with PartitionedSink(output_dir, ["agent_id"], partition_by="agent_id",
+                                 suffix=".csv.gz") as sink:
+                sink.write_rows(rows)
+            first, _ = self._read_parts(output_dir)
+            
+            with PartitionedSink(output_dir, ["agent_id"], partition_by="agent_id",
+                                 suffix=".csv.gz") as sink:
+                sink.write_rows(rows[1:])
+            second, _ = self._read_parts(output_dir)
+            
+            assert [part["path"] for part in first["parts"]] == [
+                "agent_id=x_1/part-00000.csv.gz", "agent_id=y/part-00000.csv.gz"
+            ]
+            assert not (output_dir / "agent_id=x_1" / "part-00000.csv.gz").exists()
+            assert second["parts"][0]["sha256"] == first["parts"][1]["sha256"]
+    
+    def test_open_sink_partitioned(self):
+        """Test that partitioning options select a partitioned sink."""
+        sink = open_sink(Path("out/recipients.csv.gz"), list(FIELDNAMES), partition_by="agent_id")
+        
+        assert isinstance(sink, PartitionedSink)
+        assert sink.output_dir == Path("out/recipients")
+        assert sink.suffix == ".csv.gz"
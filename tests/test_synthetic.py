@@ -0,0 +1,45 @@
+"""
+Tests for the synthetic module.
+"""
+
+import json
+import tempfile
+from pathlib import Path
+import sys
+
+# Add src to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from compression import open_file
+from synthetic import make_batch, make_workspace, write_batch
+
+
+class TestSynthetic:
+    """Test cases for the synthetic data generator."""
+    
+    def test_make_batch_is_deterministic(self):
+        """Test that the same seed gives the same batch and other seeds differ."""
+        batch = make_batch(50, seed=3)
+        
+        assert batch == make_batch(50, seed=3)
+        assert batch != make_batch(50, seed=4)
+        assert len(batch["recipients"]) == batch["total_calls_scheduled"] == 50
+        assert len({recipient["id"] for recipient in batch["recipients"]}) == 50
+    
+    def test_write_batch_matches_make_batch(self):
+        """Test that the streamed file holds the same batch as make_batch."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            output = Path(temp_dir) / "batch.json.gz"
+            write_batch(output, 20, batch_id="btcal_x", seed=1)
+            
+            with open_file(output) as f:
+                assert json.load(f) == make_batch(20, batch_id="btcal_x", seed=1)
+    
+    def test_make_workspace_lists_newest_first(self):
+        """Test the listing format and order."""
+        workspace = make_workspace(5)
+        created = [batch["created_at_unix"] for batch in workspace["batch_calls"]]
+        
+        assert workspace["has_more"] is False
+        assert created == sorted(created, reverse=True)
+        assert len({batch["id"] for batch in workspace["batch_calls"]}) == 5